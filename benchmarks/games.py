@@ -0,0 +1,37 @@
+from __future__ import annotations
+from random import seed, sample
+from tramopoly import Game, Action
+from tramopoly.backends import LiveBackend
+from tramopoly.data import getStaticData, getLiveActionData, setLiveActionData
+
+
+def buildGame(teams: int, claimed: float = 0.5, random_seed: int = 0, backend: LiveBackend | None = None) -> Game:
+    # every game built with the same settings ends up the same
+    seed(random_seed)
+    game = Game(backend=backend)
+    with game.transaction():
+        # teams, rewards and secrets as if a real game had just started
+        for colour in list(getStaticData("team_colours"))[:teams]:
+            game.addTeam(f"{colour.replace('_', ' ').title()} Team", colour)
+        game.assignRewards()
+        game.dealAllSecrets()
+        game.start()
+        # share out some of the stops (claiming deals out any rewards)
+        all_teams = game.all_teams
+        stops = sample(game.all_stops, int(len(game.all_stops) * claimed))
+        for i, stop in enumerate(stops):
+            stop.claim(all_teams[i % teams])
+        # lock in a line for anyone who can
+        for team in all_teams:
+            for line in team.claimable_lines[:1]:
+                line.claim(team.free_stops_on_line(line))
+    return game
+
+
+def returnToDeck(action: Action) -> None:
+    # undo a deal (or a reserve) so the same deck can be dealt from again
+    with action.game.transaction():
+        live_data = getLiveActionData(action.deck_id, action.game.id)
+        for key in ("dealt", "reserved", "owner"):
+            live_data.pop(key, None)
+        setLiveActionData(action.deck_id, live_data, action.game.id)
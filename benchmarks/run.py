@@ -0,0 +1,185 @@
+from __future__ import annotations
+from argparse import ArgumentParser
+from datetime import datetime
+from json import dump, load
+from pathlib import Path
+from platform import python_version
+from statistics import mean, median
+from subprocess import run, DEVNULL
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from typing import Any, Callable
+import sys
+
+# allow running as "python benchmarks/run.py" from anywhere
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from tramopoly import Game, Action, drawMap
+from tramopoly.backends import LiveBackend, JSONBackend, SQLiteBackend, MemoryBackend
+from tramopoly.card_images import drawCollection, CollectionStyle
+from tramopoly.line import enoughZonesCovered
+from benchmarks.games import buildGame, returnToDeck
+
+# how much slower than last time counts as a regression
+REGRESSION_RATIO = 1.25
+# half-typed and misspelt names, like the ones autocomplete gets
+SEARCH_TERMS = ["pic", "piccadily gardns", "st", "altrincam", "market st", "heaton", "xyzzy"]
+
+
+class OpenCounter:
+
+    def __init__(self) -> None:
+        self._counting: bool = False
+        self._opens: int = 0
+        # audit hooks see every file open (and can't be removed, so just switch it off when not needed)
+        sys.addaudithook(self._hook)
+
+    def _hook(self, event: str, args: tuple) -> None:
+        if self._counting and event == "open":
+            self._opens += 1
+
+    def start(self) -> None:
+        self._opens = 0
+        self._counting = True
+
+    def stop(self) -> int:
+        self._counting = False
+        return self._opens
+
+
+OPENS = OpenCounter()
+
+
+def measure(function: Callable[[], Any], repeat: int, reset: Callable[[Any], None] | None = None) -> dict[str, float]:
+    times = []
+    opens = 0
+    for i in range(repeat + 1):
+        OPENS.start()
+        start = perf_counter()
+        result = function()
+        times.append(perf_counter() - start)
+        opens += OPENS.stop()
+        # the first call pays for loading files, filling caches etc.
+        if i == 0:
+            cold, cold_opens = times.pop(), opens
+            opens = 0
+        # put things back how they were (untimed)
+        if reset:
+            reset(result)
+    return {
+        "cold_seconds": cold,
+        "cold_opens": cold_opens,
+        "min_seconds": min(times),
+        "median_seconds": median(times),
+        "mean_seconds": mean(times),
+        "opens_per_call": opens / repeat
+    }
+
+
+def getBenchmarks(game: Game) -> dict[str, tuple[Callable[[], Any], Callable[[Any], None] | None]]:
+    teams = game.all_teams
+    lines = game.all_lines
+    # the stops each team could put towards each line
+    candidates = [team.free_stops_on_line(line) for team in teams for line in lines]
+    # deal from the biggest zone deck
+    zone = max(game.all_zones, key=lambda zone: len(zone.deck))
+
+    def undeal(dealt: list[Action] | Action) -> None:
+        for action in dealt if isinstance(dealt, list) else [dealt]:
+            returnToDeck(action)
+
+    # each benchmark, and how to undo it (if needed)
+    return {
+        "Team.has_won": (lambda: [team.has_won for team in teams], None),
+        "Team.claimable_lines": (lambda: [team.claimable_lines for team in teams], None),
+        "Team.available_actions": (lambda: [team.available_actions for team in teams], None),
+        "Zone.dealAction": (lambda: zone.dealAction(teams[0]), undeal),
+        "Game.assignRewards": (game.assignRewards, None),
+        "Game.dealAllSecrets": (game.dealAllSecrets, None),
+        "drawMap": (lambda: [drawMap(game, team) for team in teams], None),
+        "drawCollection": (lambda: drawCollection(sorted(teams[0].claimed_stops)[:8], CollectionStyle.HORIZONTAL, teams[0]), None),
+        "enoughZonesCovered": (lambda: [enoughZonesCovered(stops) for stops in candidates if stops], None),
+        "Game.searchStops": (lambda: [game.searchStops(term) for term in SEARCH_TERMS], None)
+    }
+
+
+def runBenchmarks(team_counts: list[int], repeat: int, only: list[str] | None = None,
+                  backend: LiveBackend | None = None) -> list[dict[str, Any]]:
+    results = []
+    for teams in team_counts:
+        # a fresh game for each size so nothing carries over
+        game = buildGame(teams, backend=backend)
+        for name, (function, reset) in getBenchmarks(game).items():
+            if only and name not in only:
+                continue
+            result = {"name": name, "teams": teams, "repeat": repeat} | measure(function, repeat, reset)
+            results.append(result)
+            print(f"{name:<22} {teams:>2} teams  {result['median_seconds']*1000:9.3f}ms median  "
+                  f"{result['cold_seconds']*1000:9.3f}ms cold  {result['opens_per_call']:6.1f} opens/call")
+    return results
+
+
+def getRevision() -> str | None:
+    # which commit these numbers belong to (if this is a git checkout)
+    try:
+        output = run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, stdin=DEVNULL)
+    except OSError:
+        return None
+    return output.stdout.strip() or None
+
+
+def compare(results: list[dict[str, Any]], previous_path: Path) -> list[str]:
+    # anything noticeably slower (or opening more files) than the previous run
+    with open(previous_path) as file:
+        previous = {(result["name"], result["teams"]): result for result in load(file)["results"]}
+    regressions = []
+    for result in results:
+        old = previous.get((result["name"], result["teams"]))
+        if not old:
+            continue
+        ratio = result["median_seconds"] / old["median_seconds"] if old["median_seconds"] else 1
+        if ratio > REGRESSION_RATIO:
+            regressions.append(f"{result['name']} ({result['teams']} teams) is {ratio:.2f}x slower")
+        if result["opens_per_call"] > old["opens_per_call"]:
+            regressions.append(f"{result['name']} ({result['teams']} teams) opens {result['opens_per_call']:.1f} files per call (was {old['opens_per_call']:.1f})")
+    return regressions
+
+
+def main() -> int:
+    parser = ArgumentParser(description="Time core game queries and rendering.")
+    parser.add_argument("--teams", type=int, nargs="+", default=[2, 4, 8], help="team counts to build games with")
+    parser.add_argument("--repeat", type=int, default=20, help="timed calls per benchmark (after one cold call)")
+    parser.add_argument("--only", nargs="+", help="only run these benchmarks")
+    parser.add_argument("--backend", choices=["json", "sqlite", "memory"], default="json", help="where the synthetic games are stored")
+    parser.add_argument("--output", type=Path, help="write the results here as json")
+    parser.add_argument("--compare", type=Path, help="previous json results to check for regressions")
+    args = parser.parse_args()
+    # keep synthetic games out of the real live folder
+    with TemporaryDirectory() as directory:
+        backends = {"json": JSONBackend, "sqlite": SQLiteBackend}
+        backend = backends[args.backend](Path(directory)) if args.backend in backends else MemoryBackend()
+        results = runBenchmarks(args.teams, args.repeat, args.only, backend)
+        if isinstance(backend, SQLiteBackend):
+            backend.close()
+    report = {
+        "revision": getRevision(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": python_version(),
+        "backend": args.backend,
+        "results": results
+    }
+    if args.output:
+        with open(args.output, "w") as file:
+            dump(report, file, indent=4)
+    if args.compare:
+        regressions = compare(results, args.compare)
+        for regression in regressions:
+            print("REGRESSION:", regression)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,6 +8,13 @@ from game import start_game, reset_game, get_game_code, test
 from check import check, map
 from preview import preview
 from more import claim_line, clear_curse
+from tramopoly.card_images import ASSETS
+from tramopoly.rendering import startRenderPool
+from utils.monitor import LOOP_MONITOR
+from tramopoly.encoding import ENCODING_STATS
+from tramopoly.instrumentation import Trace, INSTRUMENTED
+from os import environ
+from pathlib import Path
 
 
 
@@ -39,9 +46,41 @@ async def check_start(message:Message):
         await message.reply(f"Game code: {get_game_code(message.guild)}")
     elif message.content == "!test":
         await test(message.guild)
+    elif message.content == "!stats":
+        await message.reply(LOOP_MONITOR.summary() + "\n" + ENCODING_STATS.summary())
 
 bot.add_listener(check_start, 'on_message')
 
 
+# keep track of anything holding up the event loop
+async def start_monitor():
+    LOOP_MONITOR.start()
+
+bot.add_listener(start_monitor, 'on_ready')
+
+
+# save a speedscope trace of the file reads/writes of every command (needs TRAMOPOLY_TRACE_IO=1 too)
+TRACE_DIRECTORY = environ.get("TRAMOPOLY_TRACE_DIR")
+traces: dict[int, Trace] = {}
+
+async def start_trace(ctx):
+    traces[ctx.interaction.id] = Trace(ctx.command.qualified_name).start()
+
+async def save_trace(ctx):
+    trace = traces.pop(ctx.interaction.id, None)
+    if trace:
+        trace.stop()
+        trace.save(Path(TRACE_DIRECTORY) / f"{ctx.command.qualified_name.replace(' ', '_')}-{ctx.interaction.id}.json")
+
+if TRACE_DIRECTORY and INSTRUMENTED:
+    bot.before_invoke(start_trace)
+    bot.after_invoke(save_trace)
+
+
+# get card fonts and icons ready before the first command
+ASSETS.preload()
+# start the card drawing processes (if there are any) before discord starts any threads
+startRenderPool()
+
 token = token()
 bot.run(token)
\ No newline at end of file
@@ -70,8 +70,13 @@ async def start(ctx: ApplicationContext | Interaction, stop_search_term: str, ch
         await ctx.response.defer()
     # save the selfie
     await submitSelfie(role_team, challenge, selfie)
-    # officially start the challenge
-    role_team.startChallenge(challenge)
+    # officially start the challenge (another command may have got there first)
+    async with live_game.lock():
+        with live_game.lock():
+            started = role_team.startChallenge(challenge)
+    if not started:
+        await complain(ctx, "Currently completing another challenge", f"You cannot start another challenge until you complete or veto {role_team.current_challenge.title}.")
+        return
     # create embed
     await sendMessage(ctx, None, embed_current_challenge(role_team),
                       view=grid(
@@ -130,10 +135,18 @@ async def complete(ctx: ApplicationContext | Interaction):
         return
     # now postpone
     await ctx.response.defer()
-    # complete the challenge
-    challenge = role_team.current_challenge
-    stop = challenge.location
-    result = role_team.completeChallenge()
+    async with live_game.lock():
+        # make sure it wasn't completed or vetoed whilst waiting (checked and changed in one go, complaining after)
+        with live_game.lock():
+            finished = role_team.in_veto or not role_team.in_challenge
+            if not finished:
+                # complete the challenge
+                challenge = role_team.current_challenge
+                stop = challenge.location
+                result = role_team.completeChallenge()
+    if finished:
+        await complain(ctx, "Not currently in a challenge", "This challenge has already been completed or vetoed.")
+        return
     # immediately send a message to the main channel INCLUDING SELFIE LOL
     await sendMessage(getUpdatesChannel(ctx.guild),
                       f"{mention(role_team)} just claimed {stop.name} by completing {
@@ -204,9 +217,17 @@ async def veto(ctx: ApplicationContext | Interaction):
         return
     # now postpone
     await ctx.response.defer()
-    # veto challenge
-    stop = role_team.current_challenge_location
-    role_team.vetoChallenge()
+    async with live_game.lock():
+        # make sure it wasn't completed or vetoed whilst waiting (checked and changed in one go, complaining after)
+        with live_game.lock():
+            finished = role_team.in_veto or not role_team.in_challenge
+            if not finished:
+                # veto challenge
+                stop = role_team.current_challenge_location
+                role_team.vetoChallenge()
+    if finished:
+        await complain(ctx, "Not currently in a challenge", "This challenge has already been completed or vetoed.")
+        return
     # show embed
     await sendMessage(ctx, None, embed_current_challenge(role_team), view=grid(
         vetoedChallengeRow(role_team)
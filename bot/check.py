@@ -58,7 +58,7 @@ async def line(ctx: ApplicationContext | Interaction, colour: str):
     # NOW delay
     await ctx.response.defer()
     observer = getObserver(ctx)
-    line = tramopoly.Line(colour, live_game)
+    line = live_game.getLineFromColour(colour)
     # create embed
     await sendMessage(ctx, None, embed_line(line, observer),
                       view=grid(
@@ -40,17 +40,17 @@ async def claim_line(ctx: ApplicationContext | Interaction, colour: str):
         return
     # give them a choice
     stop_choice = LineClaimChoice(role_team, line)
-    await sendMessage(ctx, f"Choose three stops to claim the {line.colour} line...", embed_line_claim_options(role_team, line), view=stop_choice)
+    await sendMessage(ctx, f"Choose three stops to claim the {line.colour} line (or confirm the ones already picked)...", embed_line_claim_options(role_team, line), view=stop_choice)
     # wait for them to make a choice
     await stop_choice.wait()
     await ctx.edit_original_response(view=stop_choice)
     # determine what they chose
     stops = stop_choice.chosen_stops
     if not stops:
-        await complain(stop_choice._dropdown._interaction, "No stops chosen", f"You didn't choose any stops.")
+        await complain(stop_choice.interaction or ctx, "No stops chosen", f"You didn't choose any stops.")
         return
     elif not line.is_valid_claim(stops):
-        await complain(stop_choice._dropdown._interaction, "Invalid stop choices", f"The stops you chose do not cover enough zones to claim the {line.colour} line.")
+        await complain(stop_choice.interaction or ctx, "Invalid stop choices", f"The stops you chose do not cover enough zones to claim the {line.colour} line.")
         return
     # now claim the line!
     line.claim(stops)
@@ -147,6 +147,22 @@ async def play_specific_action_card(ctx: ApplicationContext | Interaction, actio
         await end_game(ctx.guild)
 
 
+async def playLocked(card: Action, player: Team, guild: Guild, *args, replay: bool = False) -> bool | None:
+    # the choices above took a while, so check nothing else has happened to the card (or its target) since
+    async with card.game.lock():
+        # checked and played in one go (no awaiting in here, or someone else's changes could end up in this transaction)
+        with card.game.lock():
+            if card.owner != player or card.used != replay:
+                problem = "Action card already played", f"Your {card.title} card has already been played."
+            elif not card.playableSpecific(*args):
+                problem = "Action not possible", f"You can't play your {card.title} card like this any more."
+            else:
+                # None if it couldn't be played at all, otherwise whether it went through without a chance to counter
+                return card.play(*args)
+    await complain(guild.get_channel(channel_id(player)), *problem)
+    return None
+
+
 async def tryCounter(original_card: Action, card: Action, victim: Team, guild: Guild, *args: Card) -> bool:
     # tell playing team...\
     player = card.owner
@@ -161,7 +177,10 @@ async def tryCounter(original_card: Action, card: Action, victim: Team, guild: G
         # expire existing counter
         card.expireCounter()
         return False
-    success = counter.play(card)
+    success = await playLocked(counter, victim, guild, card)
+    if success is None:
+        card.expireCounter()
+        return False
     if success:
         return True
     # swap roles and try and counter the counter card!
@@ -186,7 +205,10 @@ async def tryReroute(curse: Action, victim: Team, guild: Guild) -> bool:
         # expire existing counter
         curse.expireCounter()
         return False
-    success = counter.play(curse)
+    success = await playLocked(counter, victim, guild, curse)
+    if success is None:
+        curse.expireCounter()
+        return False
     if success:
         return True
     # swap roles and try and counter the counter card!
@@ -214,7 +236,9 @@ async def playAnnouncement(card: Announcement, guild: Guild, victim: Team | None
             await complain(guild.get_channel(channel_id(player)), "No victim selected", "You didn't choose who to play this card against.")
             return
     # now make sure it hasn't been countered
-    success = card.play(victim)
+    success = await playLocked(card, player, guild, victim)
+    if success is None:
+        return
     if not success:
         countered = await tryCounter(card, card, victim, guild)
         if countered:
@@ -233,7 +257,8 @@ async def playAnnouncement(card: Announcement, guild: Guild, victim: Team | None
             ))
             return
         else:
-            card.play(victim)
+            if await playLocked(card, player, guild, victim, replay=True) is None:
+                return
     # DON'T INSTEAD
     await sendMessage(guild.get_channel(channel_id(player)), f"You successfully played your {card.title} card against {mention(victim, player)}.", embed_played_action(card, player), embed_available_actions(victim, player),
                       view=grid(
@@ -264,7 +289,9 @@ async def playTicketInspection(card: TicketInspection, guild: Guild, victim: Tea
             await complain(guild.get_channel(channel_id(player)), "No victim selected", "You didn't choose who to play this card against.")
             return
     # now make sure it hasn't been countered
-    success = card.play(victim)
+    success = await playLocked(card, player, guild, victim)
+    if success is None:
+        return
     if not success:
         countered = await tryCounter(card, card, victim, guild)
         if countered:
@@ -318,7 +345,9 @@ async def playClearCurse(card: ClearCurse, guild: Guild, victim: Team | None = N
         await complain(guild.get_channel(channel_id(player)), "Action not possible", f"You can't play this curse againt {mention(victim, player, False)} right now as they have {Special("IMMUNITY").name}.")
         return
     # now make sure it hasn't been countered
-    success = card.play(victim)
+    success = await playLocked(card, player, guild, victim)
+    if success is None:
+        return
     if not success:
         rerouted = await tryCounter(card, card, victim, guild)
         if rerouted:
@@ -337,7 +366,8 @@ async def playClearCurse(card: ClearCurse, guild: Guild, victim: Team | None = N
             ))
             return
         else:
-            card.play(victim)
+            if await playLocked(card, player, guild, victim, replay=True) is None:
+                return
     # DON'T INSTEAD
     await sendMessage(guild.get_channel(channel_id(player)), f"You successfully played your {card.title} curse against {mention(victim, player)}.", embed_played_action(card, player),
                       view=grid(
@@ -371,7 +401,9 @@ async def playOngoingCurse(card: OngoingCurse, guild: Guild, victim: Team | None
         await complain(guild.get_channel(channel_id(player)), "Action not possible", f"You can't play this curse againt {mention(victim, player, False)} right now as they have Curse Immunity.")
         return
     # now make sure it hasn't been countered
-    success = card.play(victim)
+    success = await playLocked(card, player, guild, victim)
+    if success is None:
+        return
     if not success:
         rerouted = await tryReroute(card, victim, guild)
         if rerouted:
@@ -391,7 +423,8 @@ async def playOngoingCurse(card: OngoingCurse, guild: Guild, victim: Team | None
             await notifyOngoingCurse(card, guild, player)
             return
         else:
-            card.play(victim)
+            if await playLocked(card, player, guild, victim, replay=True) is None:
+                return
     # DON'T INSTEAD
     await sendMessage(guild.get_channel(channel_id(player)), f"You successfully played your {card.title} curse against {mention(victim, player)}.", embed_played_action(card, player),
                       view=grid(
@@ -469,7 +502,9 @@ async def playInterchange(card: Interchange, guild: Guild, victim: Team | None =
             await complain(guild.get_channel(channel_id(player)), "No stop selected", f"You didn't choose which stop to take from {mention(victim, player, False)}.")
             return
     # now make sure it hasn't been countered
-    success = card.play(stop_to_take, stop_to_give)
+    success = await playLocked(card, player, guild, stop_to_take, stop_to_give)
+    if success is None:
+        return
     if not success:
         countered = await tryCounter(card, card, victim, guild, stop_to_take, stop_to_give)
         if countered:
@@ -492,7 +527,8 @@ async def playInterchange(card: Interchange, guild: Guild, victim: Team | None =
             return
         else:
             # replay the card (it will work this time)
-            card.play(stop_to_take, stop_to_give)
+            if await playLocked(card, player, guild, stop_to_take, stop_to_give, replay=True) is None:
+                return
     # DON'T INSTEAD
     await sendMessage(guild.get_channel(channel_id(player)), f"You successfully played your {card.title} card against {mention(victim, player)}.", embed_played_action(card, player, (stop_to_give, stop_to_take)),
                       view=grid(
@@ -541,7 +577,9 @@ async def playRailroaded(card: Railroaded, guild: Guild, victim: Team | None = N
             await complain(guild.get_channel(channel_id(player)), "No stop selected", f"You didn't choose which stop to steal from {mention(victim, player, False)}.")
             return
     # now make sure it hasn't been countered
-    success = card.play(stop_to_take)
+    success = await playLocked(card, player, guild, stop_to_take)
+    if success is None:
+        return
     if not success:
         countered = await tryCounter(card, card, victim, guild, stop_to_take)
         if countered:
@@ -564,7 +602,8 @@ async def playRailroaded(card: Railroaded, guild: Guild, victim: Team | None = N
             return
         else:
             # replay the card (it will work this time)
-            card.play(stop_to_take)
+            if await playLocked(card, player, guild, stop_to_take, replay=True) is None:
+                return
     # DON'T INSTEAD
     await sendMessage(guild.get_channel(channel_id(player)), f"You successfully played your {card.title} card against {mention(victim, player)}.", embed_played_action(card, player, stop_to_take),
                       view=grid(
@@ -613,7 +652,9 @@ async def playDerailment(card: Derailment, guild: Guild, victim: Team | None = N
             await complain(guild.get_channel(channel_id(player)), "No stop selected", f"You didn't choose which stop to unclaim from {mentionPossessive(victim, player, False)} hand.")
             return
     # now make sure it hasn't been countered (WON'T BE COUNTERED BY SAME TEAM)
-    success = card.play(stop_to_unclaim)
+    success = await playLocked(card, player, guild, stop_to_unclaim)
+    if success is None:
+        return
     if not success:
         countered = await tryCounter(card, card, victim, guild, stop_to_unclaim)
         if countered:
@@ -635,7 +676,8 @@ async def playDerailment(card: Derailment, guild: Guild, victim: Team | None = N
             return
         else:
             # replay the card (it will work this time)
-            card.play(stop_to_unclaim)
+            if await playLocked(card, player, guild, stop_to_unclaim, replay=True) is None:
+                return
     # DON'T INSTEAD (also allow to see challenges because yay :D our turn now)
     await sendMessage(guild.get_channel(channel_id(player)), f"You successfully played your {card.title} card against {mention(victim, player, capitalise=False)}.", embed_played_action(card, player, stop_to_unclaim),
                       view=grid(
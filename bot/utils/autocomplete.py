@@ -1,17 +1,19 @@
 from discord import AutocompleteContext
-from tramopoly import getAllStops, searchStop
+from tramopoly import searchStop, searchStops
 from discord.utils import basic_autocomplete, AutocompleteFunc
 from utils.data import team, game, getObserver
 
-STOP_NAMES = [stop.name for stop in getAllStops()]
+async def get_stop_names(ctx: AutocompleteContext) -> list[str]:
+    # best matches for what's been typed so far
+    return [stop.name for stop in searchStops(ctx.value or "")]
 
 async def get_unclaimed_stop_names(ctx: AutocompleteContext) -> list[str]:
     # check if we're even in a game
     local_game = game(ctx.interaction.guild)
     if not local_game:
         return []
-    # compile unclaimed stop names
-    return [stop.name for stop in local_game.unclaimed_stops] 
+    # best unclaimed matches for what's been typed so far
+    return [stop.name for stop in local_game.searchStops(ctx.value or "", unclaimed=True)]
 
 async def get_challenge_names(ctx: AutocompleteContext) -> list[str]:
     try:
@@ -50,8 +52,9 @@ async def get_uncleared_curse_names(ctx: AutocompleteContext) -> list[str]:
     # compile team names
     return [curse.title for curse in local_team.uncleared_curses]    
 
-stop_name = basic_autocomplete(STOP_NAMES)
-unclaimed_stop_name = basic_autocomplete(get_unclaimed_stop_names)
+# already ranked (and fuzzy), so not filtered again by basic_autocomplete
+stop_name = get_stop_names
+unclaimed_stop_name = get_unclaimed_stop_names
 challenge_name = basic_autocomplete(get_challenge_names)
 team_name = basic_autocomplete(get_team_names)
 other_team_name = basic_autocomplete(get_other_team_names)
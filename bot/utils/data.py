@@ -1,5 +1,6 @@
 from discord import Guild, TextChannel, Role, Interaction, Attachment, File
 from tramopoly import Game, Team, Challenge
+from tramopoly.data import DATA_ROOT
 from typing import Any
 from json import load
 from pathlib import Path
@@ -32,39 +33,36 @@ def team(channel_or_role: TextChannel | Role) -> Team | None:
     # now determine the type of argument
     if isinstance(channel_or_role, TextChannel) and id in guild_data["channels"]:
         # get it from the channel
-        return Team(guild_data["channels"][id], Game(guild_data["game"]))
+        return Game(guild_data["game"]).getTeamFromID(guild_data["channels"][id])
     elif isinstance(channel_or_role, Role) and id in guild_data["roles"]:
         # get it from the role
-        return Team(guild_data["roles"][id], Game(guild_data["game"]))
+        return Game(guild_data["game"]).getTeamFromID(guild_data["roles"][id])
     # no matching channel or role
     return None
 
 
 def role_id(team: Team) -> int:
-    # get guild data
-    guild_data = getGuildData(guild_id(team.game))
     # find a matching role
-    return next(int(id) for id in guild_data["roles"] if guild_data["roles"][id] == team.id)
+    return getGuildRegistry().roles[(team.game.id, team.id)]
 
 
 def channel_id(team: Team) -> int:
-    # get guild data
-    guild_data = getGuildData(guild_id(team.game))
-    # find a matching role
-    return next(int(id) for id in guild_data["channels"] if guild_data["channels"][id] == team.id)
+    # find a matching channel
+    return getGuildRegistry().channels[(team.game.id, team.id)]
 
 
-def guild_id(game: Game) -> Guild:
-    # load file
-    with open(LIBRARY / LIVE / "guilds.json") as source:
-        data = load(source)
+def guild_id(game: Game) -> int:
     # find a matching guild
-    return next(int(id) for id in data if data[id]["game"] == game.id)
+    return getGuildRegistry().guilds[game.id]
 
 
 LIBRARY = Path(__file__).parent.parent
 LIVE = "live"
 STATIC = "static"
+BOT = "bot"
+
+# guild settings and selfies move out alongside the live games (TRAMOPOLY_DATA_DIR)
+LIVE_ROOT = DATA_ROOT / BOT if DATA_ROOT else LIBRARY / LIVE
 
 
 def token() -> str:
@@ -73,16 +71,65 @@ def token() -> str:
     return token
 
 
+class GuildRegistry:
+
+    def __init__(self, data: dict[str, dict[str, Any]], stamp: tuple[int, int]) -> None:
+        # when the file was last changed (and how big it was), to tell when to reload it
+        self._stamp: tuple[int, int] = stamp
+        self._data: dict[str, dict[str, Any]] = data
+        # the other way round: game -> guild, and (game, team) -> channel and role
+        self._guilds: dict[str, int] = {}
+        self._channels: dict[tuple[str, str], int] = {}
+        self._roles: dict[tuple[str, str], int] = {}
+        for id, guild_data in data.items():
+            game_id = guild_data["game"]
+            # the first guild wins if a game is somehow in more than one
+            self._guilds.setdefault(game_id, int(id))
+            for channel, team_id in guild_data.get("channels", {}).items():
+                self._channels.setdefault((game_id, team_id), int(channel))
+            for role, team_id in guild_data.get("roles", {}).items():
+                self._roles.setdefault((game_id, team_id), int(role))
+
+    @property
+    def stamp(self) -> tuple[int, int]:
+        return self._stamp
+
+    @property
+    def guilds(self) -> dict[str, int]:
+        return self._guilds
+
+    @property
+    def channels(self) -> dict[tuple[str, str], int]:
+        return self._channels
+
+    @property
+    def roles(self) -> dict[tuple[str, str], int]:
+        return self._roles
+
+    def get(self, guild_id: str) -> dict[str, Any]:
+        # use default value if needed
+        return self._data.get(guild_id, {})
+
+
+# guilds.json as of the last time it changed
+_REGISTRY: GuildRegistry | None = None
+
+
+def getGuildRegistry() -> GuildRegistry:
+    global _REGISTRY
+    path = LIVE_ROOT / "guilds.json"
+    # only read the file again if it's been edited since
+    info = path.stat()
+    stamp = (info.st_mtime_ns, info.st_size)
+    if _REGISTRY is None or _REGISTRY.stamp != stamp:
+        with open(path) as source:
+            _REGISTRY = GuildRegistry(load(source), stamp)
+    return _REGISTRY
+
+
 def getGuildData(guild: Guild | int) -> dict[str, dict[str, Any]]:
-    # load file
     guild_id = str(guild.id if isinstance(guild, Guild) else guild)
-    with open(LIBRARY / LIVE / "guilds.json") as source:
-        data = load(source)
-    # use default value if needed
-    if guild_id in data:
-        return data[guild_id]
-    else:
-        return {}
+    return getGuildRegistry().get(guild_id)
 
 
 def getUpdatesChannel(guild: Guild) -> TextChannel:
@@ -133,28 +180,32 @@ def countdownTo(timestamp: datetime) -> str:
 def exactTime(timestamp: datetime) -> str:
     return f"<t:{str(int(timestamp.timestamp()))}:T>"
 
+def getSelfieDirectory(game: Game) -> Path:
+    return LIVE_ROOT / game.id
+
+
 async def submitSelfie(team: Team, challenge: Challenge, selfie: Attachment):
     suffix = Path(selfie.filename).suffix
     #make sure it exists!
-    (LIBRARY / LIVE / team.game.id).mkdir(exist_ok=True)
+    getSelfieDirectory(team.game).mkdir(parents=True, exist_ok=True)
     # maintain image extension
-    path = LIBRARY / LIVE / team.game.id/ f"{challenge.id}-{team.id}{suffix}"
+    path = getSelfieDirectory(team.game) / f"{challenge.id}-{team.id}{suffix}"
     # save selfie
     await selfie.save(path)
 
 def deleteSelfies(game: Game):
     #make sure it exists!
-    if not (LIBRARY / LIVE / game.id).exists():
+    if not getSelfieDirectory(game).exists():
         return
-    for file in (LIBRARY / LIVE / game.id).iterdir():
+    for file in getSelfieDirectory(game).iterdir():
         file.unlink()
-    (LIBRARY / LIVE / game.id).rmdir()
+    getSelfieDirectory(game).rmdir()
     # maintain image extension
 
 def getSelfie(team: Team, challenge: Challenge) -> File:
     filename = getSelfieFilename(team, challenge)
-    return File(LIBRARY / LIVE / team.game.id / filename, filename)
+    return File(getSelfieDirectory(team.game) / filename, filename)
 
 def getSelfieFilename(team: Team, challenge: Challenge) -> str:
-    path = LIBRARY / LIVE / team.game.id
+    path = getSelfieDirectory(team.game)
     return next(p for p in path.iterdir() if p.name.split('.')[0] == f"{challenge.id}-{team.id}").name
\ No newline at end of file
@@ -1,9 +1,18 @@
-from tramopoly import Stop, Team, Line, Action, Special, Game, drawMap, ActionType, Card, Challenge, Zone
-from tramopoly.card_images import IconType, drawCollection, CollectionStyle
+from tramopoly import Stop, Team, Line, Action, Special, Game, ActionType, Card, Challenge, Zone
+from tramopoly.card_images import IconType, CollectionStyle
+from tramopoly.map_images import prepareMap
+from tramopoly.rendering import prepareCollection, prepareLineCollection
 from tramopoly.data import getIconData, getTeamColour, getActionTypeData
+from tramopoly.encoding import encodeImage, getProfile
 from discord import Embed, EmbedField, File
 from utils.data import getEmojiCode, mention, mentionPossessive, countdownTo, getSelfie, getSelfieFilename, exactTime
+from utils.monitor import LOOP_MONITOR
+from asyncio import Semaphore, gather, get_running_loop
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from os import environ
+from time import perf_counter
+from typing import Callable
 from PIL.Image import Image
 from io import BytesIO
 
@@ -32,7 +41,7 @@ def embed_stop(stop: Stop, observer: Team | None = None) -> tuple[Embed, list[Fi
             colour=int(colour, 16),
             image="attachment://"+filename
         ),
-        [getFile(stop.full_image(observer), filename)]
+        [PendingFile(prepareCollection(stop.full_cards, CollectionStyle.HORIZONTAL, observer), filename)]
     )
 
 
@@ -54,7 +63,7 @@ def embed_line(line: Line, observer: Team | None = None) -> tuple[Embed, list[Fi
             title=f"{mention(line.owner, observer, True, False)} own the {
                 line.colour} line."
         ),
-        [getFile(line.image(observer), filename)]
+        [PendingFile(prepareCollection(sorted(line.locked_stops), CollectionStyle.STACKED, observer), filename)]
     )
 
 
@@ -134,7 +143,7 @@ def embed_action(action: Action) -> tuple[Embed, list[File]]:
             colour=int(getActionTypeData(action.type)["colour"], 16),
             image="attachment://"+filename
         ),
-        [getFile(action.image(), filename)]
+        [PendingFile(prepareCollection([action], CollectionStyle.HORIZONTAL), filename)]
     )
 
 
@@ -150,8 +159,7 @@ def embed_played_action(action: Action, observer: Team | None = None, args: tupl
             colour=int(getActionTypeData(action.type)["colour"], 16),
             image="attachment://"+filename
         ),
-        [getFile(drawCollection(
-            all_cards, CollectionStyle.HORIZONTAL, observer), filename)]
+        [PendingFile(prepareCollection(all_cards, CollectionStyle.HORIZONTAL, observer), filename)]
     )
 
 
@@ -163,20 +171,20 @@ def embed_special(special: Special) -> tuple[Embed, list[File]]:
             colour=int(getIconData(IconType.SPECIAL_ABILITY)["colour"], 16),
             image="attachment://"+filename
         ),
-        [getFile(special.image(), filename)]
+        [PendingFile(prepareCollection([special], CollectionStyle.HORIZONTAL), filename)]
     )
 
 
 def embed_map(game: Game | None = None,  observer: Team | None = None) -> tuple[Embed, list[File]]:
     # create file
-    filename = getFilename()
+    filename = getFilename("map")
     # all observer nonsense is handled by library
     return (
         Embed(
             colour=int(GRAY, 16),
             image="attachment://"+filename
         ),
-        [getFile(drawMap(game, observer), filename)]
+        [PendingFile(prepareMap(game, observer), filename, "map")]
     )
 
 
@@ -190,8 +198,7 @@ def embed_line_claim_options(team: Team, line: Line) -> tuple[Embed, list[File]]
             colour=int(line.hex_colour, 16),
             image="attachment://"+filename
         ),
-        [getFile(drawCollection(team.free_stops_on_line(line),
-                 CollectionStyle.HORIZONTAL, team), filename)]
+        [PendingFile(prepareCollection(team.free_stops_on_line(line), CollectionStyle.HORIZONTAL, team), filename)]
     )
 
 
@@ -206,7 +213,7 @@ def embed_unlocked_stops(team: Team, observer: Team | None = None) -> tuple[Embe
                 colour=int(getTeamColour(team.colour), 16),
                 image="attachment://"+filename
             ),
-            [getFile(team.unlocked_stops_image(observer), filename)]
+            [PendingFile(prepareCollection(sorted(team.claimed_unlocked_stops), CollectionStyle.HORIZONTAL, observer), filename)]
         )
     else:
         return (
@@ -230,7 +237,7 @@ def embed_locked_lines(team: Team, observer: Team | None = None) -> tuple[Embed,
                 colour=int(getTeamColour(team.colour), 16),
                 image="attachment://"+filename
             ),
-            [getFile(team.locked_lines_image(observer), filename)]
+            [PendingFile(prepareLineCollection(sorted(team.claimed_lines), observer), filename)]
         )
     else:
         return (
@@ -253,8 +260,7 @@ def embed_discarded_secrets(team: Team, discarded_secrets: list[Stop], observer:
             colour=int(getTeamColour(team.colour), 16),
             image="attachment://"+filename
         ),
-        [getFile(drawCollection(discarded_secrets,
-                 CollectionStyle.HORIZONTAL, observer), filename)]
+        [PendingFile(prepareCollection(discarded_secrets, CollectionStyle.HORIZONTAL, observer), filename)]
     )
 
 
@@ -269,7 +275,7 @@ def embed_available_actions(team: Team, observer: Team | None = None) -> tuple[E
                 colour=int(getTeamColour(team.colour), 16),
                 image="attachment://"+filename
             ),
-            [getFile(team.available_actions_image(), filename)]
+            [PendingFile(prepareCollection(sorted(team.available_actions), CollectionStyle.HORIZONTAL, team), filename)]
         )
     else:
         return (
@@ -289,7 +295,7 @@ def embed_available_starting_actions(team: Team) -> tuple[Embed, list[File]]:
             colour=int(getIconData(IconType.REWARD)["colour"], 16),
             image="attachment://"+filename
         ),
-        [getFile(team.available_starting_actions_image(), filename)]
+        [PendingFile(prepareCollection(sorted(team.available_starting_actions), CollectionStyle.HORIZONTAL, team), filename)]
     )
 
 
@@ -300,7 +306,7 @@ def embed_available_curses(team: Team) -> tuple[Embed, list[File]]:
             colour=int(getActionTypeData(ActionType.CURSE)["colour"], 16),
             image="attachment://"+filename
         ),
-        [getFile(team.available_curses_image(), filename)]
+        [PendingFile(prepareCollection(sorted(team.available_curses), CollectionStyle.HORIZONTAL, team), filename)]
     )
 
 
@@ -312,7 +318,7 @@ def embed_zone_options(team: Team, action_code: str) -> tuple[Embed, list[File]]
                 Action(action_code).type)["colour"], 16),
             image="attachment://"+filename
         ),
-        [getFile(drawCollection(team.getActionsByCode(action_code), CollectionStyle.HORIZONTAL, team), filename)]
+        [PendingFile(prepareCollection(team.getActionsByCode(action_code), CollectionStyle.HORIZONTAL, team), filename)]
     )
 
 
@@ -323,7 +329,7 @@ def embed_counter_options(team: Team, action: Action) -> tuple[Embed, list[File]
             colour=int(getIconData(IconType.REWARD)["colour"], 16),
             image="attachment://"+filename
         ),
-        [getFile(team.counter_options_image(action), filename)]
+        [PendingFile(prepareCollection(sorted(team.counter_options(action)), CollectionStyle.HORIZONTAL, team), filename)]
     )
 
 
@@ -338,7 +344,7 @@ def embed_secrets(team: Team) -> tuple[Embed, list[File]]:
                     team, team, True, False)} secret cards",
                 image="attachment://"+filename
             ),
-            [getFile(team.secrets_image(), filename)]
+            [PendingFile(prepareCollection(sorted(team.secrets), CollectionStyle.HORIZONTAL, team), filename)]
         )
     else:
         return (
@@ -362,7 +368,7 @@ def embed_revealed_secrets(team: Team, observer: Team | None = None) -> tuple[Em
                     team, observer, True, False)} revealed secret cards",
                 image="attachment://"+filename
             ),
-            [getFile(team.revealed_secrets_image(), filename)]
+            [PendingFile(prepareCollection(sorted(team.revealed_secrets), CollectionStyle.HORIZONTAL), filename)]
         )
     else:
         return (
@@ -386,7 +392,7 @@ def embed_unrevealed_secrets(team: Team) -> tuple[Embed, list[File]]:
                     team, team, True, False)} unrevealed secret cards",
                 image="attachment://"+filename
             ),
-            [getFile(team.unrevealed_secrets_image(), filename)]
+            [PendingFile(prepareCollection(sorted(team.unrevealed_secrets), CollectionStyle.HORIZONTAL, team), filename)]
         )
     else:
         return (
@@ -411,7 +417,7 @@ def embed_curses(team: Team, observer: Team | None = None) -> tuple[Embed, list[
                 colour=int(getActionTypeData(ActionType.CURSE)["colour"], 16),
                 image="attachment://"+filename
             ),
-            [getFile(team.current_curses_image(), filename)]
+            [PendingFile(prepareCollection(sorted(team.ongoing_curses + team.uncleared_curses), CollectionStyle.HORIZONTAL), filename)]
         )
     else:
         return (
@@ -436,7 +442,7 @@ def embed_abilities(team: Team, observer: Team | None = None) -> tuple[Embed, li
                            ["colour"], 16),
                 image="attachment://"+filename
             ),
-            [getFile(team.special_abilities_image(), filename)]
+            [PendingFile(prepareCollection(sorted(team.special_abilities), CollectionStyle.HORIZONTAL), filename)]
         )
     else:
         return (
@@ -486,7 +492,7 @@ def embed_claim(stop: Stop, rewards: list[Card] | Card | None, observer: Team |
             colour=int(getTeamColour(stop.owner.colour), 16),
             image="attachment://"+filename
         ),
-        [getFile(drawCollection(cards, CollectionStyle.HORIZONTAL, observer), filename)]
+        [PendingFile(prepareCollection(cards, CollectionStyle.HORIZONTAL, observer), filename)]
     )
 
 
@@ -499,16 +505,59 @@ def embed_deck(zone: Zone) -> tuple[Embed, list[File]]:
             image="attachment://"+filename,
             title=f"Zone {zone.number} deck"
         ),
-        [getFile(drawCollection(zone.start_deck, CollectionStyle.HORIZONTAL), filename)]
+        [PendingFile(prepareCollection(zone.start_deck, CollectionStyle.HORIZONTAL), filename)]
     )
 
 
-def getFilename() -> str:
-    return str(datetime.now().timestamp()) + ".png"
+def getFilename(profile: str = "card") -> str:
+    # extension depends on how this kind of image is encoded
+    return str(datetime.now().timestamp()) + "." + getProfile(profile).extension
+
+
+def getFile(image: Image, filename: str, profile: str = "card", mobile: bool = False) -> File:
+    return File(BytesIO(encodeImage(image, profile, mobile)), filename)
+
+
+# threads used to draw and encode attachments, and how many can be waiting on them at once
+RENDER_THREADS = int(environ.get("TRAMOPOLY_RENDER_THREADS", 2))
+RENDER_QUEUE = int(environ.get("TRAMOPOLY_RENDER_QUEUE", 8))
+RENDER_EXECUTOR = ThreadPoolExecutor(RENDER_THREADS, thread_name_prefix="render")
+# created on first use so it belongs to the running event loop
+_RENDER_SLOTS: Semaphore | None = None
+
+
+class PendingFile:
+
+    def __init__(self, draw: Callable[[], Image], filename: str, profile: str = "card") -> None:
+        # everything about the game has already been read, this only draws pixels
+        self._draw: Callable[[], Image] = draw
+        self._filename: str = filename
+        # how to encode it
+        self._profile: str = profile
+
+    @property
+    def filename(self) -> str:
+        return self._filename
+
+    def file(self, mobile: bool = False) -> File:
+        return getFile(self._draw(), self._filename, self._profile, mobile)
+
+
+async def renderFile(pending: PendingFile | File, mobile: bool = False) -> File:
+    global _RENDER_SLOTS
+    # selfies and the like are already files
+    if not isinstance(pending, PendingFile):
+        return pending
+    if _RENDER_SLOTS is None:
+        _RENDER_SLOTS = Semaphore(RENDER_QUEUE)
+    queued = perf_counter()
+    async with _RENDER_SLOTS:
+        started = perf_counter()
+        file = await get_running_loop().run_in_executor(RENDER_EXECUTOR, pending.file, mobile)
+        LOOP_MONITOR.recordRender(started - queued, perf_counter() - started)
+    return file
 
 
-def getFile(image: Image, filename: str) -> File:
-    bytes = BytesIO()
-    image.save(bytes, "PNG")
-    bytes.seek(0)
-    return File(bytes, filename)
+async def resolveFiles(files: list[File | PendingFile], mobile: bool = False) -> list[File]:
+    # draw every attachment at the same time without holding up the event loop
+    return list(await gather(*[renderFile(file, mobile) for file in files]))
@@ -0,0 +1,66 @@
+from asyncio import create_task, sleep, Task
+from time import perf_counter
+
+# how often to check on the event loop, and how late counts as blocked (seconds)
+INTERVAL = 0.1
+THRESHOLD = 0.05
+
+
+class LoopMonitor:
+
+    def __init__(self, interval: float = INTERVAL, threshold: float = THRESHOLD) -> None:
+        self._interval: float = interval
+        self._threshold: float = threshold
+        self._task: Task | None = None
+        # time the event loop couldn't run anything else
+        self._stalls: int = 0
+        self._blocked: float = 0
+        self._longest: float = 0
+        # images drawn off the event loop
+        self._renders: int = 0
+        self._render_wait: float = 0
+        self._render_time: float = 0
+        self._longest_render: float = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if not self.running:
+            self._task = create_task(self._watch())
+
+    async def _watch(self) -> None:
+        while True:
+            # anything past the interval is time something else held the loop up
+            start = perf_counter()
+            await sleep(self._interval)
+            lag = perf_counter() - start - self._interval
+            if lag > self._threshold:
+                self._stalls += 1
+                self._blocked += lag
+                self._longest = max(self._longest, lag)
+
+    def recordRender(self, wait: float, time: float) -> None:
+        self._renders += 1
+        self._render_wait += wait
+        self._render_time += time
+        self._longest_render = max(self._longest_render, time)
+
+    @property
+    def stats(self) -> dict[str, float]:
+        return {
+            "stalls": self._stalls,
+            "blocked_seconds": round(self._blocked, 3),
+            "longest_stall_seconds": round(self._longest, 3),
+            "renders": self._renders,
+            "average_render_wait_seconds": round(self._render_wait / self._renders, 3) if self._renders else 0,
+            "average_render_seconds": round(self._render_time / self._renders, 3) if self._renders else 0,
+            "longest_render_seconds": round(self._longest_render, 3)
+        }
+
+    def summary(self) -> str:
+        return "\n".join(f"{name.replace('_', ' ')}: {value}" for name, value in self.stats.items())
+
+
+LOOP_MONITOR = LoopMonitor()
@@ -1,7 +1,7 @@
-from discord import Embed, Interaction, File, TextChannel, MISSING, Message
+from discord import Embed, Interaction, File, TextChannel, MISSING, Message, Member
 from discord.interactions import Interaction as Interaction2
 from discord.ui import View
-from utils.embeds import embed_complaint
+from utils.embeds import embed_complaint, resolveFiles, PendingFile
 
 async def complain(ctx: Interaction | TextChannel | Message, title: str, message: str):
     # defer as ephermal
@@ -10,7 +10,14 @@ async def complain(ctx: Interaction | TextChannel | Message, title: str, message
     # create error colour and send
     await sendMessage(ctx, None, embed_complaint(title, message))
 
-async def sendMessage(ctx: Interaction | TextChannel | Message, content: str = None, *embeds: tuple[Embed, list[File]], view:View = MISSING) -> Message | None:
+def isOnMobile(ctx: Interaction | TextChannel | Message) -> bool:
+    # only members have a status (and nobody asked if it's just a channel)
+    if isinstance(ctx, TextChannel):
+        return False
+    user = ctx.author if isinstance(ctx, Message) else ctx.user
+    return isinstance(user, Member) and user.is_on_mobile()
+
+async def sendMessage(ctx: Interaction | TextChannel | Message, content: str = None, *embeds: tuple[Embed, list[File | PendingFile]], view:View = MISSING) -> Message | None:
     # defer as non ephermal
     if (isinstance(ctx, Interaction) or isinstance(ctx, Interaction2)) and not ctx.response.is_done():
         await ctx.response.defer()
@@ -20,6 +27,8 @@ async def sendMessage(ctx: Interaction | TextChannel | Message, content: str = N
     for item in embeds:
         all_embeds.append(item[0])
         files.extend(item[1])
+    # draw any images off the event loop
+    files = await resolveFiles(files, isOnMobile(ctx))
     # send the embed!
     if isinstance(ctx, TextChannel):
         return await ctx.send(
@@ -1,6 +1,6 @@
-from discord import Interaction
+from discord import ButtonStyle, Interaction
 from tramopoly import Action, Game, Team, Stop, Line, Zone, ActionType
-from discord.ui import Select, View
+from discord.ui import Button, Select, View
 from random import choice, sample
 
 DEFAULT = "-"
@@ -30,7 +30,7 @@ class ActionDropdown(Select):
 
     def chosen_action(self, game: Game) -> Action | None:
         if self.values and not self.values[0] == DEFAULT:
-            return Action.loadLive(self.values[0], game)
+            return game.getActionFromDeckID(self.values[0])
 
     async def callback(self, interaction: Interaction):
         await interaction.response.defer()
@@ -40,7 +40,7 @@ class ActionDropdown(Select):
 
 class StopDropdown(Select):
 
-    def __init__(self, parent: View, options: list[Stop], min_count: int = 0, max_count: int = 0, default_label=None, default_description="") -> None:
+    def __init__(self, parent: View, options: list[Stop], min_count: int = 0, max_count: int = 0, default_label=None, default_description="", selected: list[Stop] | None = None) -> None:
         super().__init__(placeholder=f"Choose stop{'s' if max_count != 1 else ''}...", min_values=min_count, max_values=max_count if max_count >= 1 else len(options))
         self._parent = parent
         for option in options:
@@ -48,7 +48,8 @@ class StopDropdown(Select):
                 label=option.name,
                 value=option.code,
                 description=f"Zone {option.zone_string}",
-                emoji="📌"
+                emoji="📌",
+                default=selected is not None and option in selected
             )
         if default_label:
             self.add_option(
@@ -60,12 +61,12 @@ class StopDropdown(Select):
 
     def chosen_stops(self, game: Game) -> list[Stop]:
         if self.values and not self.values[0] == DEFAULT:
-            return [Stop(code, game) for code in self.values]
+            return [game.getStopFromCode(code) for code in self.values]
         return []
 
     def chosen_stop(self, game: Game) -> Stop | None:
         if self.values and not self.values[0] == DEFAULT:
-            return Stop(self.values[0], game)
+            return game.getStopFromCode(self.values[0])
 
     # your first choice will literally just be taken
     async def callback(self, interaction: Interaction):
@@ -117,7 +118,7 @@ class ZoneDropdown(Select):
 
     def chosen_zone(self, game: Game) -> Zone | None:
         if self.values and not self.values[0] == DEFAULT:
-            return Zone(int(self.values[0]), game)
+            return game.getZoneFromNumber(int(self.values[0]))
 
     async def callback(self, interaction: Interaction):
         await interaction.response.defer()
@@ -125,6 +126,17 @@ class ZoneDropdown(Select):
         self._parent.update()
 
 
+class ConfirmButton(Button):
+
+    def __init__(self, parent: View, label: str) -> None:
+        super().__init__(style=ButtonStyle.success, label=label, emoji="✅")
+        self._parent = parent
+
+    async def callback(self, interaction: Interaction):
+        await interaction.response.defer()
+        self._parent.confirm(interaction)
+
+
 # VIEWS
 
 class RewardChoice(View):
@@ -169,11 +181,19 @@ class MulliganChoice(View):
 class LineClaimChoice(View):
 
     def __init__(self, team: Team, line: Line):
+        options = team.free_stops_on_line(line)
+        # start with a valid claim already picked (topped up to three stops)
+        selected = line.best_claim(team) or []
+        selected += [stop for stop in options if stop not in selected][:3 - len(selected)]
         self._dropdown = StopDropdown(
-            self, team.free_stops_on_line(line), 3, 3)
+            self, options, 3, 3, selected=selected)
         self._game = team.game
+        # discord says nothing if the picked stops are left as they are, so they have to be confirmed instead
+        self._selected = selected
+        self._confirmed = False
+        self._interaction: Interaction | None = None
         # use 2 minute timer
-        super().__init__(self._dropdown, timeout=120, disable_on_timeout=True)
+        super().__init__(self._dropdown, ConfirmButton(self, "Claim with these stops"), timeout=120, disable_on_timeout=True)
 
     def update(self) -> None:
         # stop if actually finished
@@ -181,9 +201,21 @@ class LineClaimChoice(View):
             self.disable_all_items()
             self.stop()
 
+    def confirm(self, interaction: Interaction) -> None:
+        self._confirmed = True
+        self._interaction = interaction
+        self.disable_all_items()
+        self.stop()
+
     @property
     def chosen_stops(self) -> list[Stop]:
-        return self._dropdown.chosen_stops(self._game)
+        # whatever was picked, otherwise the stops picked to start with (if confirmed)
+        return self._dropdown.chosen_stops(self._game) or (self._selected if self._confirmed else [])
+
+    @property
+    def interaction(self) -> Interaction | None:
+        # whichever was used last to answer
+        return self._interaction or self._dropdown._interaction
 
 
 class ActionChoice(View):
@@ -33,6 +33,8 @@ TYPE_ORDER = {
 
 class Action(Card):
 
+    __slots__ = ("_code", "_deck_id", "_game", "_force_zone")
+
     def __init__(self, code: str, deck_id: str | None = None, game: Game | None = None) -> None:
         # set code
         self._code: str = code
@@ -56,40 +58,43 @@ class Action(Card):
 
     # actual action function (including removing it from owner)
     def play(self, victim: Team) -> bool:
-        # make sure there isn't currently a counter
-        if self.has_expired_counter:
-            return True
-        # load data
-        live_data = getLiveActionData(self._deck_id, self._game._id)
-        # remove it from this team
-        live_data["used"] = True
-        # save data
-        setLiveActionData(self._deck_id, live_data, self._game._id)
-        # now check if it can be countered
-        if len(victim.counter_options(self)) > 0:  # may be unsuccessful
-            # set up pending counter (client may decide when to force play)
-            setLivePendingCounter(
-                self._deck_id,
-                {
-                    "victim": victim.id,
-                    "expired": False
-                },
-                self._game._id
-            )
-            return False
-        else:  # successful
-            return True
+        with self._game.transaction():
+            # make sure there isn't currently a counter
+            if self.has_expired_counter:
+                return True
+            # load data
+            live_data = getLiveActionData(self._deck_id, self._game._id)
+            # remove it from this team
+            live_data["used"] = True
+            # save data
+            setLiveActionData(self._deck_id, live_data, self._game._id)
+            # now check if it can be countered
+            if len(victim.counter_options(self)) > 0:  # may be unsuccessful
+                # set up pending counter (client may decide when to force play)
+                setLivePendingCounter(
+                    self._deck_id,
+                    {
+                        "victim": victim.id,
+                        "expired": False
+                    },
+                    self._game._id
+                )
+                return False
+            else:  # successful
+                return True
 
     def counter(self, counter: Action):
-        live_data = getLivePendingCounter(self._deck_id, self._game._id)
-        live_data["expired"] = True
-        live_data["countered_by"] = counter._deck_id
-        setLivePendingCounter(self._deck_id, live_data, self._game._id)
+        with self._game.transaction():
+            live_data = getLivePendingCounter(self._deck_id, self._game._id)
+            live_data["expired"] = True
+            live_data["countered_by"] = counter._deck_id
+            setLivePendingCounter(self._deck_id, live_data, self._game._id)
 
     def expireCounter(self):
-        live_data = getLivePendingCounter(self._deck_id, self._game._id)
-        live_data["expired"] = True
-        setLivePendingCounter(self._deck_id, live_data, self._game._id)
+        with self._game.transaction():
+            live_data = getLivePendingCounter(self._deck_id, self._game._id)
+            live_data["expired"] = True
+            setLivePendingCounter(self._deck_id, live_data, self._game._id)
 
     @property
     def code(self) -> str:
@@ -118,8 +123,7 @@ class Action(Card):
 
     @property
     def zone(self) -> Zone:
-        from .zone import Zone
-        return Zone(getLiveActionData(self._deck_id, self._game._id)["zone"], self._game)
+        return self._game.getZoneFromNumber(getLiveActionData(self._deck_id, self._game._id)["zone"])
 
     @property
     def dealt(self) -> bool:
@@ -157,14 +161,18 @@ class Action(Card):
         live_data = getLiveActionData(self._deck_id, self._game._id)
         # use default value of no owner
         if "owner" in live_data:
-            return Team(live_data["owner"], self._game)
+            return self._game.getTeamFromID(live_data["owner"])
         else:
             return None
 
+    @property
+    def icon_name(self) -> str:
+        return getActionTypeData(self.type.value)["icon"] if self.type == ActionType.CURSE else getStaticActionData(self._code)["icon"]
+
     @property
     def icon(self) -> Image:
         from .card_images import loadIcon
-        return loadIcon(getActionTypeData(self.type.value)["icon"] if self.type == ActionType.CURSE else getStaticActionData(self._code)["icon"])
+        return loadIcon(self.icon_name)
 
     @property
     def emoji(self) -> str:
@@ -175,7 +183,7 @@ class Action(Card):
         counter = getLivePendingCounter(self._deck_id, self._game._id)
         # combine with other counter
         if counter and "countered_by" in counter:
-            return [self] + Action.loadLive(counter["countered_by"], self._game).counter_chain
+            return [self] + self._game.getActionFromDeckID(counter["countered_by"]).counter_chain
         else:
             return [self]
 
@@ -204,40 +212,44 @@ class Action(Card):
         return zones
 
     def deal(self, team: Team):
-        # load data
-        live_data = getLiveActionData(self._deck_id, self._game._id)
-        # set owner
-        live_data["dealt"] = True
-        live_data["owner"] = team.id
-        # save live data
-        setLiveActionData(self._deck_id, live_data, self._game._id)
+        with self._game.transaction():
+            # load data
+            live_data = getLiveActionData(self._deck_id, self._game._id)
+            # set owner
+            live_data["dealt"] = True
+            live_data["owner"] = team.id
+            # save live data
+            setLiveActionData(self._deck_id, live_data, self._game._id)
 
     def reserve(self, team: Team):
-        # load data
-        live_data = getLiveActionData(self._deck_id, self._game._id)
-        # set 'owner'
-        live_data["reserved"] = True
-        live_data["owner"] = team.id
-        # save live data
-        setLiveActionData(self._deck_id, live_data, self._game._id)
+        with self._game.transaction():
+            # load data
+            live_data = getLiveActionData(self._deck_id, self._game._id)
+            # set 'owner'
+            live_data["reserved"] = True
+            live_data["owner"] = team.id
+            # save live data
+            setLiveActionData(self._deck_id, live_data, self._game._id)
 
     def unreserve(self):
-        # load data
-        live_data = getLiveActionData(self._deck_id, self._game._id)
-        # remove owner
-        del live_data["reserved"]
-        del live_data["owner"]
-        # save live data
-        setLiveActionData(self._deck_id, live_data, self._game._id)
+        with self._game.transaction():
+            # load data
+            live_data = getLiveActionData(self._deck_id, self._game._id)
+            # remove owner
+            del live_data["reserved"]
+            del live_data["owner"]
+            # save live data
+            setLiveActionData(self._deck_id, live_data, self._game._id)
 
     def choose(self):
-        # load data
-        live_data = getLiveActionData(self._deck_id, self._game._id)
-        # owner has already been set when reserved
-        del live_data["reserved"]
-        live_data["dealt"] = True
-        # save live data
-        setLiveActionData(self._deck_id, live_data, self._game._id)
+        with self._game.transaction():
+            # load data
+            live_data = getLiveActionData(self._deck_id, self._game._id)
+            # owner has already been set when reserved
+            del live_data["reserved"]
+            live_data["dealt"] = True
+            # save live data
+            setLiveActionData(self._deck_id, live_data, self._game._id)
 
     # all types of action don't need inheritance to make this
     def image(self, *args) -> Image:
@@ -308,6 +320,10 @@ class Action(Card):
         else:
             return self._code == value._code
 
+    def __hash__(self) -> int:
+        # deck ids are only ever for one code, so this matches __eq__ either way
+        return hash(self._code)
+
     def __lt__(self, other: object) -> bool:
         if not other or not isinstance(other, Action):
             return super().__lt__(other)
@@ -333,6 +349,8 @@ class Action(Card):
 
 class Announcement(Action):
 
+    __slots__ = ()
+
     def __init__(self, deck_id: str | None = None, game: Game | None = None) -> None:
         super().__init__("ANNOUNCEMENT", deck_id, game)
 
@@ -343,18 +361,24 @@ class Announcement(Action):
         return self.playableTeam(victim)
 
     def play(self, victim: Team) -> bool:
-        # check if coutnerable
-        if not super().play(victim):
-            return False  # give a chance to be countered
-        # now actually do the action (EXTERNAL)
-        return True
+        with self._game.transaction():
+            # check if coutnerable
+            if not super().play(victim):
+                return False  # give a chance to be countered
+            # now actually do the action (EXTERNAL)
+            return True
 
     def __eq__(self, value: object) -> bool:
         return super().__eq__(value)
 
+    def __hash__(self) -> int:
+        return super().__hash__()
+
 
 class TicketInspection(Action):
 
+    __slots__ = ()
+
     def __init__(self, deck_id: str | None = None, game: Game | None = None) -> None:
         super().__init__("TICKETINSPECTION", deck_id, game)
 
@@ -365,24 +389,32 @@ class TicketInspection(Action):
         return self.playableTeam(victim)
 
     def play(self, victim: Team) -> bool:
-        # check if counterable
-        if not super().play(victim):
-            return False  # give a chance to be countered
-        # now actually do the action (EXTERNAL) - need secret choice
-        return True
+        with self._game.transaction():
+            # check if counterable
+            if not super().play(victim):
+                return False  # give a chance to be countered
+            # now actually do the action (EXTERNAL) - need secret choice
+            return True
 
     def __eq__(self, value: object) -> bool:
         return super().__eq__(value)
 
+    def __hash__(self) -> int:
+        return super().__hash__()
+
 
 class Curse(Action):
 
+    __slots__ = ()
+
     def __init__(self, code: str, deck_id: str | None = None, game: Game | None = None) -> None:
         super().__init__(code, deck_id, game)
 
 
 class ClearCurse(Curse):
 
+    __slots__ = ()
+
     def __init__(self, code: str, deck_id: str | None = None, game: Game | None = None) -> None:
         super().__init__(code, deck_id, game)
 
@@ -395,19 +427,25 @@ class ClearCurse(Curse):
         return self.playableTeam(victim)
 
     def play(self, victim: Team, rerouted: bool = False) -> bool:
-        # check if counterable
-        if not rerouted and not super().play(victim):
-            return False  # give a chance to be countered
-        # now actually do the action. ADD THIS CURSE TO THE TEAM
-        victim.addClearCurse(self)
-        return True
+        with self._game.transaction():
+            # check if counterable
+            if not rerouted and not super().play(victim):
+                return False  # give a chance to be countered
+            # now actually do the action. ADD THIS CURSE TO THE TEAM
+            victim.addClearCurse(self)
+            return True
 
     def __eq__(self, value: object) -> bool:
         return super().__eq__(value)
 
+    def __hash__(self) -> int:
+        return super().__hash__()
+
 
 class OngoingCurse(Curse):
 
+    __slots__ = ()
+
     def __init__(self, code: str, deck_id: str | None = None, game: Game | None = None) -> None:
         super().__init__(code, deck_id, game)
 
@@ -420,12 +458,13 @@ class OngoingCurse(Curse):
         return self.playableTeam(victim)
 
     def play(self, victim: Team, rerouted: bool = False) -> bool:
-        # check if counterable
-        if not rerouted and not super().play(victim):
-            return False  # give a chance to be countered
-        # now actually do the action. ADD THIS CURSE TO THE TEAM
-        victim.addOngoingCurse(self)
-        return True
+        with self._game.transaction():
+            # check if counterable
+            if not rerouted and not super().play(victim):
+                return False  # give a chance to be countered
+            # now actually do the action. ADD THIS CURSE TO THE TEAM
+            victim.addOngoingCurse(self)
+            return True
 
     def getEndTime(self) -> datetime:
         # get data
@@ -434,9 +473,14 @@ class OngoingCurse(Curse):
     def __eq__(self, value: object) -> bool:
         return super().__eq__(value)
 
+    def __hash__(self) -> int:
+        return super().__hash__()
+
 
 class Interchange(Action):
 
+    __slots__ = ()
+
     def __init__(self, deck_id: str | None = None, game: Game | None = None) -> None:
         super().__init__("INTERCHANGE", deck_id, game)
 
@@ -453,21 +497,27 @@ class Interchange(Action):
             return stop_to_take.owner and stop_to_take.owner != self.owner and len(self.owner.claimed_unlocked_stops) >= 1
 
     def play(self, stop_to_take: Stop, stop_to_give: Stop) -> bool:
-        # check if counterable
-        if not super().play(stop_to_take.owner):
-            return False  # give a chance to be countered
-        # now actually do the action. swap owners
-        victim = stop_to_take.owner
-        stop_to_take.claim(stop_to_give.owner)
-        stop_to_give.claim(victim)
-        return True
+        with self._game.transaction():
+            # check if counterable
+            if not super().play(stop_to_take.owner):
+                return False  # give a chance to be countered
+            # now actually do the action. swap owners
+            victim = stop_to_take.owner
+            stop_to_take.claim(stop_to_give.owner)
+            stop_to_give.claim(victim)
+            return True
 
     def __eq__(self, value: object) -> bool:
         return super().__eq__(value)
 
+    def __hash__(self) -> int:
+        return super().__hash__()
+
 
 class Railroaded(Action):
 
+    __slots__ = ()
+
     def __init__(self, deck_id: str | None = None, game: Game | None = None) -> None:
         super().__init__("RAILROADED", deck_id, game)
 
@@ -481,20 +531,26 @@ class Railroaded(Action):
         return stop_to_take.owner and stop_to_take.owner != self.owner and not stop_to_take.locked
 
     def play(self, stop_to_take: Stop) -> bool:
-        thief = self.owner
-        # check if counterable
-        if not super().play(stop_to_take.owner):
-            return False  # give a chance to be countered
-        # now actually do the action. steal the stop!
-        stop_to_take.claim(thief)
-        return True
+        with self._game.transaction():
+            thief = self.owner
+            # check if counterable
+            if not super().play(stop_to_take.owner):
+                return False  # give a chance to be countered
+            # now actually do the action. steal the stop!
+            stop_to_take.claim(thief)
+            return True
 
     def __eq__(self, value: object) -> bool:
         return super().__eq__(value)
 
+    def __hash__(self) -> int:
+        return super().__hash__()
+
 
 class Derailment(Action):
 
+    __slots__ = ()
+
     def __init__(self, deck_id: str | None = None, game: Game | None = None) -> None:
         super().__init__("DERAILMENT", deck_id, game)
 
@@ -507,19 +563,25 @@ class Derailment(Action):
         return bool(stop_to_unclaim.owner)
 
     def play(self, stop_to_unclaim: Stop) -> bool:
-        # check if counterable
-        if not super().play(stop_to_unclaim.owner):
-            return False  # give a chance to be countered
-        # now actually do the action. unclaim the stop!
-        stop_to_unclaim.unclaim()
-        return True
+        with self._game.transaction():
+            # check if counterable
+            if not super().play(stop_to_unclaim.owner):
+                return False  # give a chance to be countered
+            # now actually do the action. unclaim the stop!
+            stop_to_unclaim.unclaim()
+            return True
 
     def __eq__(self, value: object) -> bool:
         return super().__eq__(value)
 
+    def __hash__(self) -> int:
+        return super().__hash__()
+
 
 class Cancelled(Action):
 
+    __slots__ = ()
+
     def __init__(self, deck_id: str | None = None, game: Game | None = None) -> None:
         super().__init__("CANCELLED", deck_id, game)
 
@@ -531,20 +593,26 @@ class Cancelled(Action):
         return action.owner != self.owner and action.type != ActionType.CURSE and action.zone <= self.zone
 
     def play(self, action: Action) -> bool:
-        # check if counterable
-        if not super().play(action.owner):
-            # give a chance to be countered (YES I KNOW IT'S CRAZY)
-            return False
-        # now actually do the action. counter it!
-        action.counter(self)
-        return True
+        with self._game.transaction():
+            # check if counterable
+            if not super().play(action.owner):
+                # give a chance to be countered (YES I KNOW IT'S CRAZY)
+                return False
+            # now actually do the action. counter it!
+            action.counter(self)
+            return True
 
     def __eq__(self, value: object) -> bool:
         return super().__eq__(value)
 
+    def __hash__(self) -> int:
+        return super().__hash__()
+
 
 class Rerouted(Action):
 
+    __slots__ = ()
+
     def __init__(self, deck_id: str | None = None, game: Game | None = None) -> None:
         super().__init__("REROUTED", deck_id, game)
 
@@ -556,16 +624,20 @@ class Rerouted(Action):
         return action.owner != self.owner and action.type == ActionType.CURSE
 
     def play(self, curse: Action):
-        # check if counterable
-        if not super().play(curse.owner):
-            # give a chance to be countered (YES I KNOW IT'S CRAZY LOLLL)
-            return False
-        # now actually do the action. counter it!
-        curse.counter(self)
-        # play the curse onto the owner of it!
-        curse.play(curse.owner, rerouted=True)
-        # yes, it was successful
-        return True
+        with self._game.transaction():
+            # check if counterable
+            if not super().play(curse.owner):
+                # give a chance to be countered (YES I KNOW IT'S CRAZY LOLLL)
+                return False
+            # now actually do the action. counter it!
+            curse.counter(self)
+            # play the curse onto the owner of it!
+            curse.play(curse.owner, rerouted=True)
+            # yes, it was successful
+            return True
 
     def __eq__(self, value: object) -> bool:
         return super().__eq__(value)
+
+    def __hash__(self) -> int:
+        return super().__hash__()
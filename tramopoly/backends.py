@@ -0,0 +1,412 @@
+from __future__ import annotations
+from abc import ABC, abstractmethod
+from copy import deepcopy
+from json import load, dump, loads, dumps, JSONDecodeError
+from os import fsync, replace
+from pathlib import Path
+from shutil import copy2, rmtree
+from tempfile import NamedTemporaryFile
+from time import time_ns
+from typing import Any
+import sqlite3
+from .instrumentation import instrumented
+
+# every live file kept for a game (without .json)
+SECTIONS = ("stops", "teams", "deck", "counters", "game")
+
+DATA = "data"
+DATABASE = "live.db"
+SNAPSHOTS = "snapshots"
+LOCK = ".lock"
+
+
+class LiveBackend(ABC):
+
+    # set by backends that can answer owner/zone queries without a full scan
+    indexed = False
+    # whether other processes can see the same games (and so need locking out)
+    shared = True
+
+    def __init__(self, root: Path) -> None:
+        # folder holding one directory per game
+        self._root: Path = Path(root)
+
+    @property
+    def root(self) -> Path:
+        return self._root
+
+    def gameIDs(self) -> list[str]:
+        # use names of directories in live folder
+        if not self._root.exists():
+            return []
+        return [path.stem for path in self._root.iterdir() if path.is_dir()]
+
+    def lockPath(self, game_id: str) -> Path:
+        return self._root / game_id / DATA / LOCK
+
+    # something that changes whenever another process saves this section (None if unknown)
+    def version(self, game_id: str, section: str) -> Any:
+        return None
+
+    @abstractmethod
+    def create(self, game_id: str) -> bool:
+        ...
+
+    def delete(self, game_id: str) -> None:
+        # remove every trace of this game
+        rmtree(self._root / game_id, ignore_errors=True)
+
+    @abstractmethod
+    def load(self, game_id: str, section: str) -> dict[str, Any]:
+        ...
+
+    # changes maps each section to its full data and the keys that changed (None if all of them)
+    @abstractmethod
+    def save(self, game_id: str, changes: dict[str, tuple[dict[str, Any], set[str] | None]]) -> None:
+        ...
+
+    # backends without an index have to look through the whole section (indexed ones do better)
+    def selectStopCodesByOwner(self, game_id: str, team_id: str, locked: bool | None = None) -> list[str]:
+        return [code for code, data in self.load(game_id, "stops").items()
+                if data.get("owner") == team_id and data.get("claimed", False)
+                and (locked is None or data.get("locked", False) == locked)]
+
+    def selectUndealtDeckIDs(self, game_id: str, zone_number: int) -> list[str]:
+        return [id for id, data in self.load(game_id, "deck").items()
+                if data.get("zone") == zone_number and not data.get("dealt", False) and not data.get("reserved", False)]
+
+
+class JSONBackend(LiveBackend):
+
+    def __init__(self, root: Path, snapshots: int = 0) -> None:
+        super().__init__(root)
+        # how many previous versions of each game to keep (0 to disable)
+        self._snapshots: int = snapshots
+
+    def create(self, game_id: str) -> bool:
+        try:
+            (self._root / game_id / DATA).mkdir(parents=True)
+            for section in SECTIONS:
+                self._write(game_id, section, emptySection(section))
+            return True
+        except FileExistsError:
+            # id already taken
+            return False
+
+    @instrumented("disk", "read", 2)
+    def load(self, game_id: str, section: str) -> dict[str, Any]:
+        try:
+            with open(self._path(game_id, section)) as source:
+                return load(source)
+        except JSONDecodeError:
+            # fall back to the last good copy if there is one
+            if not self.recover(game_id, section):
+                raise
+            with open(self._path(game_id, section)) as source:
+                return load(source)
+
+    @instrumented("disk", "write")
+    def save(self, game_id: str, changes: dict[str, tuple[dict[str, Any], set[str] | None]]) -> None:
+        # json files can only be rewritten whole
+        for section, (data, _) in changes.items():
+            self._write(game_id, section, data)
+        # keep a copy of the game as it is now
+        if self._snapshots > 0:
+            self.snapshot(game_id)
+
+    def snapshot(self, game_id: str) -> Path:
+        directory = self._root / game_id / DATA / SNAPSHOTS / str(time_ns())
+        directory.mkdir(parents=True)
+        for section in SECTIONS:
+            source = self._path(game_id, section)
+            copy2(source, directory / source.name)
+        # only keep the newest ones
+        for old in self.snapshots(game_id)[self._snapshots:]:
+            rmtree(old, ignore_errors=True)
+        return directory
+
+    def snapshots(self, game_id: str) -> list[Path]:
+        # newest first
+        directory = self._root / game_id / DATA / SNAPSHOTS
+        if not directory.exists():
+            return []
+        return sorted((path for path in directory.iterdir() if path.name.isnumeric()),
+                      key=lambda path: int(path.name), reverse=True)
+
+    def readable(self, game_id: str, section: str) -> bool:
+        # check the file is there and parses
+        try:
+            with open(self._path(game_id, section)) as source:
+                load(source)
+            return True
+        except (OSError, JSONDecodeError):
+            return False
+
+    def recover(self, game_id: str, section: str) -> bool:
+        # find the newest snapshot where this file still parses
+        for directory in self.snapshots(game_id):
+            try:
+                with open(directory / (section + ".json")) as source:
+                    data = load(source)
+            except (OSError, JSONDecodeError):
+                continue
+            self._write(game_id, section, data)
+            return True
+        return False
+
+    def version(self, game_id: str, section: str) -> Any:
+        try:
+            return self._path(game_id, section).stat().st_mtime_ns
+        except OSError:
+            return None
+
+    def _path(self, game_id: str, section: str) -> Path:
+        return self._root / game_id / DATA / (section + ".json")
+
+    def _write(self, game_id: str, section: str, data: dict[str, Any]) -> None:
+        path = self._path(game_id, section)
+        # unique name so separate writers never share a temporary file
+        with NamedTemporaryFile('w', dir=path.parent, prefix=path.name + ".", suffix=".tmp", delete=False) as source:
+            # game data has always been stored compactly
+            dump(data, source, indent=None if section == "game" else 4)
+            # make sure it has actually reached the disk
+            source.flush()
+            fsync(source.fileno())
+        # swap it in so the file is never seen half-written
+        replace(source.name, path)
+
+
+class SQLiteBackend(LiveBackend):
+
+    indexed = True
+
+    def __init__(self, root: Path) -> None:
+        super().__init__(root)
+        # one open connection per game
+        self._connections: dict[str, sqlite3.Connection] = {}
+
+    def gameIDs(self) -> list[str]:
+        return [game_id for game_id in super().gameIDs() if (self._root / game_id / DATA / DATABASE).exists()]
+
+    def create(self, game_id: str) -> bool:
+        try:
+            (self._root / game_id / DATA).mkdir(parents=True)
+            connection = self._connect(game_id)
+            with connection:
+                connection.execute("INSERT INTO game (id, data) VALUES (0, ?)",
+                                   (dumps(emptySection("game")),))
+            return True
+        except (FileExistsError, sqlite3.IntegrityError):
+            # id already taken
+            return False
+
+    @instrumented("disk", "read", 2)
+    def load(self, game_id: str, section: str) -> dict[str, Any]:
+        connection = self._connect(game_id)
+        if section == "game":
+            row = connection.execute("SELECT data FROM game WHERE id = 0").fetchone()
+            return loads(row[0]) if row else emptySection(section)
+        # rebuild the dictionary from each row
+        return {key: loads(data) for key, data in connection.execute(f"SELECT {KEYS[section]}, data FROM {section}")}
+
+    @instrumented("disk", "write")
+    def save(self, game_id: str, changes: dict[str, tuple[dict[str, Any], set[str] | None]]) -> None:
+        connection = self._connect(game_id)
+        # everything is committed together
+        with connection:
+            for section, (data, keys) in changes.items():
+                if section == "game":
+                    connection.execute("INSERT OR REPLACE INTO game (id, data) VALUES (0, ?)", (dumps(data),))
+                    continue
+                # whole section was replaced
+                if keys is None:
+                    connection.execute(f"DELETE FROM {section}")
+                    keys = set(data.keys())
+                # remove deleted entries then write the rest in their original order
+                for key in keys.difference(data):
+                    connection.execute(f"DELETE FROM {section} WHERE {KEYS[section]} = ?", (key,))
+                connection.executemany(UPSERTS[section], [rowValues(section, key, data[key]) for key in data if key in keys])
+
+    def version(self, game_id: str, section: str) -> Any:
+        # changes whenever another connection commits
+        return self._connect(game_id).execute("PRAGMA data_version").fetchone()[0]
+
+    def selectStopCodesByOwner(self, game_id: str, team_id: str, locked: bool | None = None) -> list[str]:
+        connection = self._connect(game_id)
+        if locked is None:
+            rows = connection.execute("SELECT code FROM stops WHERE owner = ? AND claimed = 1 ORDER BY rowid", (team_id,))
+        else:
+            rows = connection.execute("SELECT code FROM stops WHERE owner = ? AND claimed = 1 AND locked = ? ORDER BY rowid",
+                                      (team_id, int(locked)))
+        return [row[0] for row in rows]
+
+    def selectUndealtDeckIDs(self, game_id: str, zone_number: int) -> list[str]:
+        connection = self._connect(game_id)
+        rows = connection.execute("SELECT id FROM deck WHERE zone = ? AND dealt = 0 AND reserved = 0 ORDER BY rowid",
+                                  (zone_number,))
+        return [row[0] for row in rows]
+
+    def delete(self, game_id: str) -> None:
+        # the database has to be closed before it can go
+        if game_id in self._connections:
+            self._connections.pop(game_id).close()
+        super().delete(game_id)
+
+    def close(self) -> None:
+        for connection in self._connections.values():
+            connection.close()
+        self._connections.clear()
+
+    def _connect(self, game_id: str) -> sqlite3.Connection:
+        if game_id not in self._connections:
+            connection = sqlite3.connect(self._root / game_id / DATA / DATABASE, check_same_thread=False)
+            # let readers carry on while a write is happening
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(SCHEMA)
+            self._connections[game_id] = connection
+        return self._connections[game_id]
+
+
+class MemoryBackend(LiveBackend):
+
+    shared = False
+
+    def __init__(self) -> None:
+        # nothing is ever written to disk
+        super().__init__(Path())
+        # game id -> section -> saved data
+        self._games: dict[str, dict[str, dict[str, Any]]] = {}
+        # goes up every time a section is saved
+        self._versions: dict[tuple[str, str], int] = {}
+
+    def gameIDs(self) -> list[str]:
+        return list(self._games)
+
+    def version(self, game_id: str, section: str) -> Any:
+        return self._versions.get((game_id, section), 0)
+
+    def create(self, game_id: str) -> bool:
+        if game_id in self._games:
+            return False
+        self._games[game_id] = {section: emptySection(section) for section in SECTIONS}
+        return True
+
+    def delete(self, game_id: str) -> None:
+        self._games.pop(game_id, None)
+        for section in SECTIONS:
+            self._versions.pop((game_id, section), None)
+
+    def load(self, game_id: str, section: str) -> dict[str, Any]:
+        # hand out a copy so unsaved changes can still be thrown away
+        return deepcopy(self._games[game_id][section])
+
+    def save(self, game_id: str, changes: dict[str, tuple[dict[str, Any], set[str] | None]]) -> None:
+        for section, (data, keys) in changes.items():
+            saved = self._games[game_id][section]
+            # whole section was replaced
+            if keys is None:
+                saved.clear()
+                keys = set(data.keys())
+            # only copy the entries that changed
+            for key in keys:
+                if key in data:
+                    saved[key] = deepcopy(data[key])
+                else:
+                    saved.pop(key, None)
+            self._versions[(game_id, section)] = self.version(game_id, section) + 1
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS stops (
+    code TEXT PRIMARY KEY,
+    owner TEXT,
+    zone INTEGER,
+    claimed INTEGER NOT NULL DEFAULT 0,
+    locked INTEGER NOT NULL DEFAULT 0,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS stops_owner ON stops (owner, claimed, locked);
+CREATE INDEX IF NOT EXISTS stops_zone ON stops (zone);
+CREATE TABLE IF NOT EXISTS teams (
+    id TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS deck (
+    id TEXT PRIMARY KEY,
+    zone INTEGER,
+    owner TEXT,
+    dealt INTEGER NOT NULL DEFAULT 0,
+    reserved INTEGER NOT NULL DEFAULT 0,
+    used INTEGER NOT NULL DEFAULT 0,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS deck_zone ON deck (zone, dealt, reserved);
+CREATE INDEX IF NOT EXISTS deck_owner ON deck (owner);
+CREATE TABLE IF NOT EXISTS counters (
+    id TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS game (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    data TEXT NOT NULL
+);
+"""
+
+# primary key of each table
+KEYS = {
+    "stops": "code",
+    "teams": "id",
+    "deck": "id",
+    "counters": "id"
+}
+
+COLUMNS = {
+    "stops": ("code", "owner", "zone", "claimed", "locked", "data"),
+    "teams": ("id", "data"),
+    "deck": ("id", "zone", "owner", "dealt", "reserved", "used", "data"),
+    "counters": ("id", "data")
+}
+
+
+# update rows in place so they keep their position
+UPSERTS = {
+    section: f"INSERT INTO {section} VALUES ({', '.join('?' * len(columns))}) "
+             f"ON CONFLICT ({KEYS[section]}) DO UPDATE SET "
+             + ", ".join(f"{column} = excluded.{column}" for column in columns[1:])
+    for section, columns in COLUMNS.items()
+}
+
+
+def rowValues(section: str, key: str, data: dict[str, Any]) -> tuple:
+    # pull out the indexed columns alongside the full json
+    if section == "stops":
+        from .data import getStaticData
+        # rewards can be placed on stops outside the static list
+        static_data = getStaticData("stops").get(key)
+        return (key, data.get("owner"), static_data["inner_zone"] if static_data else None,
+                int(bool(data.get("claimed"))), int(bool(data.get("locked"))), dumps(data))
+    elif section == "deck":
+        return (key, data.get("zone"), data.get("owner"), int(bool(data.get("dealt"))),
+                int(bool(data.get("reserved"))), int(bool(data.get("used"))), dumps(data))
+    else:
+        return (key, dumps(data))
+
+
+def emptySection(section: str) -> dict[str, Any]:
+    # what a brand new game starts with
+    return {"in_progress": False} if section == "game" else {}
+
+
+def migrateJSONToSQLite(directory: Path) -> Path:
+    # directory is a live/<id>/data folder
+    directory = Path(directory)
+    game_id = directory.parent.name
+    json_backend = JSONBackend(directory.parent.parent)
+    sqlite_backend = SQLiteBackend(directory.parent.parent)
+    # copy every section across in one commit
+    sqlite_backend.save(game_id, {section: (json_backend.load(game_id, section), None)
+                                  for section in SECTIONS})
+    sqlite_backend.close()
+    return directory / DATABASE
+
@@ -2,6 +2,8 @@ from PIL.Image import Image
 
 class Card():
 
+    __slots__ = ()
+
     # base method to be overriden by stops and action cards
     def image(self, *args) -> Image:
         pass
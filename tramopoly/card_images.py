@@ -4,9 +4,12 @@ from pathlib import Path  # for map
 from PIL import Image, ImageDraw, ImageFont
 from math import ceil, sin, degrees
 import random
+from collections import OrderedDict
 from enum import Enum
+from os import environ
+from threading import Lock
 from .data import getIconData, getColour, loadIcon, getActionTypeData, getTeamColour
-from typing import TYPE_CHECKING
+from typing import Callable, Hashable, TYPE_CHECKING
 if TYPE_CHECKING:
     from .stop import Stop
     from .team import Team
@@ -60,12 +63,113 @@ SLIGHT_GRAY = (245, 245, 245)
 WHITE_ICON = Image.new("RGB", (ICON_SIZE, ICON_SIZE), WHITE)
 BLACK_ICON = Image.new("RGB", (ICON_SIZE, ICON_SIZE), BLACK)
 
-TITLE_FONT = ImageFont.truetype(
-    LIBRARY / STATIC / FONTS / "bold.ttf", int(0.26*HEADER_HEIGHT)
-)
-
-FOOTER_FONT = ImageFont.truetype(
-    LIBRARY / STATIC / FONTS / "bold.ttf", int(0.6*CHIP_HEIGHT))
+CHIP_FONT_SIZE = int(0.5*CHIP_HEIGHT)
+CHIP_TEXT_WIDTH = WIDTH - SPACE*4 - ICON_SIZE - CHIP_SPACE*6
+BODY_FONT_SIZE = int(0.5*CHIP_HEIGHT)
+BODY_TEXT_WIDTH = WIDTH - SPACE*5
+
+
+class AssetPool:
+
+    def __init__(self) -> None:
+        # fonts by (face, size)
+        self._fonts: dict[tuple[str, int], ImageFont.FreeTypeFont] = {}
+        # icons by (name, size), where no size means as loaded from disk
+        self._icons: dict[tuple[str, int | None], Image.Image] = {}
+        # best font sizes already worked out
+        self._fits: dict[tuple, int] = {}
+        # something to measure text with
+        self._draw: ImageDraw.ImageDraw = ImageDraw.Draw(Image.new("RGBA", (1, 1)))
+        self._lock: Lock = Lock()
+
+    def font(self, face: str, size: int) -> ImageFont.FreeTypeFont:
+        key = (face, size)
+        if key not in self._fonts:
+            with self._lock:
+                if key not in self._fonts:
+                    self._fonts[key] = ImageFont.truetype(LIBRARY / STATIC / FONTS / (face + ".ttf"), size)
+        return self._fonts[key]
+
+    def icon(self, name: str, size: int | None = None) -> Image.Image:
+        # shared between every card, so only ever paste it (never draw on it)
+        key = (name, size)
+        if key not in self._icons:
+            if size is None:
+                icon = loadIcon(name)
+                icon.load()
+            else:
+                icon = self.icon(name).resize((size, size))
+            with self._lock:
+                self._icons.setdefault(key, icon)
+        return self._icons[key]
+
+    def fitWidth(self, text: str, face: str, size: int, width: int) -> int:
+        # biggest font size (up to the given one) that fits on one line
+        key = ("width", text, face, size, width)
+        if key not in self._fits:
+            self._fits[key] = self._bestSize(
+                size, lambda font: self._draw.textlength(text, font) <= width, face)
+        return self._fits[key]
+
+    def fitBlock(self, text: str, face: str, size: int, width: int, height: int) -> int:
+        # biggest font size (up to the given one) where the wrapped text fits in the height
+        key = ("block", text, face, size, width, height)
+        if key not in self._fits:
+            self._fits[key] = self._bestSize(
+                size, lambda font: self.blockHeight(text, font, width) <= height, face)
+        return self._fits[key]
+
+    def blockHeight(self, text: str, font: ImageFont.FreeTypeFont, width: int) -> int:
+        wrapped = wrapText(text, width, font, self._draw)
+        return self._draw.multiline_textbbox((0, 0), wrapped, font, spacing=HALF_SPACE)[3]
+
+    def _bestSize(self, size: int, fits: Callable[[ImageFont.FreeTypeFont], bool], face: str) -> int:
+        # most text fits first time
+        if fits(self.font(face, size)):
+            return size
+        # binary search for the biggest size that fits (never below 1)
+        low, high = 1, size - 1
+        best = 1
+        while low <= high:
+            middle = (low + high) // 2
+            if fits(self.font(face, middle)):
+                best = middle
+                low = middle + 1
+            else:
+                high = middle - 1
+        return best
+
+    def preload(self) -> None:
+        from .data import getStaticData
+        # every chip icon at chip size
+        for data in getStaticData("icons").values():
+            for name in data["icon"]:
+                self.icon(name, ICON_SIZE)
+        # every chip string that doesn't depend on the game
+        for data in getStaticData("challenges").values():
+            self.fitWidth(data["title"], "regular", CHIP_FONT_SIZE, CHIP_TEXT_WIDTH)
+        for data in getStaticData("special_abilities").values():
+            self.fitWidth(data["name"], "regular", CHIP_FONT_SIZE, CHIP_TEXT_WIDTH)
+
+    @property
+    def memory(self) -> dict[str, int]:
+        # font faces are held once per font object
+        faces = {face for face, _ in self._fonts}
+        face_bytes = {face: (LIBRARY / STATIC / FONTS / (face + ".ttf")).stat().st_size for face in faces}
+        return {
+            "fonts": len(self._fonts),
+            "font_bytes": sum(face_bytes[face] for face, _ in self._fonts),
+            "icons": len(self._icons),
+            "icon_bytes": sum(imageSize(icon) for icon in self._icons.values()),
+            "fits": len(self._fits)
+        }
+
+
+ASSETS = AssetPool()
+
+TITLE_FONT = ASSETS.font("bold", int(0.26*HEADER_HEIGHT))
+
+FOOTER_FONT = ASSETS.font("bold", int(0.6*CHIP_HEIGHT))
 
 MAX_ROW = 4
 MAX_ROTATION = 0.08
@@ -92,7 +196,191 @@ class CollectionStyle(Enum):
     STACKED = 2
 
 
+class ImageCache:
+
+    def __init__(self, budget: int) -> None:
+        # most memory (in bytes) the cached images may take up
+        self._budget: int = budget
+        # least recently used first, along with the version each was drawn from
+        self._images: OrderedDict[Hashable, tuple[Hashable, Image.Image]] = OrderedDict()
+        self._size: int = 0
+        self._hits: int = 0
+        self._misses: int = 0
+        self._evictions: int = 0
+        self._lock: Lock = Lock()
+
+    @property
+    def budget(self) -> int:
+        return self._budget
+
+    @budget.setter
+    def budget(self, budget: int) -> None:
+        with self._lock:
+            self._budget = budget
+            self._evict()
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @property
+    def hits(self) -> int:
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        return self._misses
+
+    @property
+    def evictions(self) -> int:
+        return self._evictions
+
+    @property
+    def stats(self) -> dict[str, int]:
+        return {
+            "images": len(self._images),
+            "size": self._size,
+            "budget": self._budget,
+            "hits": self._hits,
+            "misses": self._misses,
+            "evictions": self._evictions
+        }
+
+    def get(self, key: Hashable, render: Callable[[], Image.Image], version: Hashable = None) -> Image.Image:
+        image = self.lookup(key, version)
+        if image is not None:
+            return image
+        # render outside the lock so other cards aren't held up
+        image = render()
+        self.put(key, image, version)
+        return image.copy()
+
+    def lookup(self, key: Hashable, version: Hashable = None) -> Image.Image | None:
+        with self._lock:
+            cached = self._images.get(key)
+            # only use it if it was drawn from the same state
+            if cached is not None and cached[0] == version:
+                self._images.move_to_end(key)
+                self._hits += 1
+                # hand out a copy so nobody can draw over the cached one
+                return cached[1].copy()
+            self._misses += 1
+            return None
+
+    def put(self, key: Hashable, image: Image.Image, version: Hashable = None) -> None:
+        size = imageSize(image)
+        with self._lock:
+            # always forget the old one, even if the new one is too big to keep
+            if key in self._images:
+                self._size -= imageSize(self._images.pop(key)[1])
+            # never cache anything that could never fit
+            if size > self._budget:
+                return
+            self._images[key] = (version, image)
+            self._size += size
+            self._evict()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._images.clear()
+            self._size = 0
+            self._hits = 0
+            self._misses = 0
+            self._evictions = 0
+
+    def _evict(self) -> None:
+        # drop least recently used images until back under budget
+        while self._size > self._budget and self._images:
+            _, (_, image) = self._images.popitem(last=False)
+            self._size -= imageSize(image)
+            self._evictions += 1
+
+
+def imageSize(image: Image.Image) -> int:
+    # uncompressed size in memory
+    return image.width * image.height * len(image.getbands())
+
+
+# rendered cards (each is about 3.5MB), budget in megabytes
+CARD_CACHE = ImageCache(int(environ.get("TRAMOPOLY_CARD_CACHE_MB", 128)) * 1024 * 1024)
+
+
+def getStopState(stop: Stop, observer: Team | None = None) -> tuple:
+    # everything that changes how a stop card looks
+    secret = bool(observer) and stop in observer.secrets
+    if not stop._game:
+        return (stop.code, secret)
+    special = stop.special.name if stop.special else None
+    if stop.claimed:
+        owner = stop.owner
+        claim = (owner == observer, owner.colour, owner.name,
+                 stop.locked_line.colour if stop.locked else None)
+    else:
+        claim = (None, stop.has_reward)
+    return (stop.code, secret, special, claim)
+
+
+def getActionZoneText(action: Action) -> str:
+    # check if live otherwise give all zones available
+    if action._game:
+        return "ZONE " + str(action.zone.number)
+    elif action._force_zone:
+        return "ZONE " + str(action._force_zone)
+    else:
+        # all possible zones you could get this card from
+        return "ZONE " + '/'.join([str(zone.number)
+                                  for zone in action.possible_zones])
+
+
+def getCardKey(card: Card, observer: Team | None = None) -> tuple:
+    from .stop import Stop
+    from .action import Action
+    # everything needed to draw a card without looking at the live game
+    if isinstance(card, Stop):
+        return ("stop",) + getStopState(card, observer)
+    elif isinstance(card, Action):
+        # action cards only differ by which zone they're from
+        return ("action", card.code, getActionZoneText(card))
+    else:
+        # special abilities never change
+        return ("special", card.code)
+
+
+def renderCard(key: tuple) -> Image.Image:
+    from .action import Action
+    from .special import Special
+    # draw straight from a card key (safe to run in another process)
+    if key[0] == "stop":
+        return renderStop(key[1:])
+    elif key[0] == "action":
+        return renderAction(Action.load(key[1]), key[2])
+    else:
+        return renderSpecialAbility(Special(key[1]))
+
+
 def drawStop(stop: Stop, observer: Team | None = None) -> Image.Image:
+    # only draw each look of each stop once
+    key = getCardKey(stop, observer)
+    return CARD_CACHE.get(key, lambda: renderCard(key))
+
+
+def drawAction(action: Action) -> Image.Image:
+    key = getCardKey(action)
+    return CARD_CACHE.get(key, lambda: renderCard(key))
+
+
+def drawSpecialAbility(special: Special) -> Image.Image:
+    key = getCardKey(special)
+    return CARD_CACHE.get(key, lambda: renderCard(key))
+
+
+def renderStop(state: tuple) -> Image.Image:
+    from .stop import Stop
+    from .line import Line
+    # unpack the stop state (only the code and secret if not in a game)
+    code, secret = state[0], state[1]
+    special, claim = state[2:] if len(state) > 2 else (None, None)
+    stop = Stop(code)
     # ok draw things
     card = getCardBase()
     # create draw
@@ -101,7 +389,7 @@ def drawStop(stop: Stop, observer: Team | None = None) -> Image.Image:
     draw.circle((int(0.5*WIDTH), HEIGHT+SPACE*10),  SPACE*20, SHADING)
     # add outline
     drawOutline(draw, getColour(getIconData(IconType.SECRET)["colour"])
-                if observer and stop in observer.secrets else BORDER)
+                if secret else BORDER)
     # remove center bit for zone
     zone_text = "ZONE " + stop.zone_string
     addFooter(draw, zone_text, SHADING)
@@ -145,37 +433,38 @@ def drawStop(stop: Stop, observer: Team | None = None) -> Image.Image:
         index = addChip(draw, index, IconType.CHALLENGE,
                         challenges[challenge_index].title, challenge_index)
     # check for special ability
-    if stop._game and stop.special:
+    if special:
         index = addChip(draw, index, IconType.SPECIAL_ABILITY,
-                        stop.special.name)
+                        special)
 
     # only do the next bit if the stop is linked to a game
-    if stop._game:
+    if claim:
         # check if claimed
-        if stop.claimed:
-            if stop.owner == observer:
+        if claim[0] is not None:
+            yours, owner_colour, owner_name, locked_colour = claim
+            if yours:
                 # you own this stop
                 index = addChip(draw, index, IconType.CLAIMED_YOU,
-                                "You own this stop", colour=getColour(getTeamColour(stop.owner.colour)))
+                                "You own this stop", colour=getColour(getTeamColour(owner_colour)))
                 # you've locked it into a line
-                if stop.locked:
+                if locked_colour:
                     index = addChip(draw, index, IconType.LOCKED_YOU,
-                                    f"Locked into {stop.locked_line.colour} line", colour=stop.locked_line.rgb_colour)
+                                    f"Locked into {locked_colour} line", colour=Line(locked_colour).rgb_colour)
             else:
                 # another team owns this stop
                 index = addChip(draw, index, IconType.CLAIMED_OTHER,
-                                f"Claimed by {stop.owner.name}...", colour=getColour(getTeamColour(stop.owner.colour)))
+                                f"Claimed by {owner_name}...", colour=getColour(getTeamColour(owner_colour)))
                 # another team's locked it into a line
-                if stop.locked:
+                if locked_colour:
                     index = addChip(draw, index, IconType.LOCKED_OTHER,
-                                    f"Locked into {stop.locked_line.colour} line", colour=stop.locked_line.rgb_colour)
+                                    f"Locked into {locked_colour} line", colour=Line(locked_colour).rgb_colour)
         else:
             # reward card available!
-            if stop.has_reward:
+            if claim[1]:
                 index = addChip(draw, index, IconType.REWARD,
                                 "Action card available!")
         # check if secret
-        if observer and stop in observer.secrets:
+        if secret:
             index = addChip(draw, index, IconType.SECRET,
                             "Your secret card!")
     # remove corners
@@ -184,7 +473,7 @@ def drawStop(stop: Stop, observer: Team | None = None) -> Image.Image:
     return card
 
 
-def drawAction(action: Action) -> Image.Image:
+def renderAction(action: Action, zone_text: str) -> Image.Image:
     # ok draw things
     card = getCardBase()
     # create draw
@@ -195,15 +484,6 @@ def drawAction(action: Action) -> Image.Image:
                    getColour(type_data["colour"]))
     # add outline
     drawOutline(draw)
-    # check if live otherwise give all zones available
-    if action._game:
-        zone_text = "ZONE " + str(action.zone.number)
-    elif action._force_zone:
-        zone_text = "ZONE " + str(action._force_zone)
-    else:
-        # all possible zones you could get this card from
-        zone_text = "ZONE " + '/'.join([str(zone.number)
-                                       for zone in action.possible_zones])
     addFooter(draw, zone_text, WHITE)
     # add tagline
     addTagline(draw, action.tagline)
@@ -218,7 +498,7 @@ def drawAction(action: Action) -> Image.Image:
         (0, 0), wrapped_title, TITLE_FONT, spacing=HALF_SPACE)[3]
     total_height = height + ACTION_ICON_SIZE + SPACE
     # now put it all together
-    icon = action.icon.resize((ACTION_ICON_SIZE, ACTION_ICON_SIZE))
+    icon = ASSETS.icon(action.icon_name, ACTION_ICON_SIZE)
     card.paste(icon, (int(0.5*WIDTH - 0.5*ACTION_ICON_SIZE),
                int(HEXAGON_CENTER - 0.5*total_height)), icon)
     draw.multiline_text((int(0.5*WIDTH), int(HEXAGON_CENTER - 0.5*total_height + ACTION_ICON_SIZE + HALF_SPACE)),
@@ -230,19 +510,10 @@ def drawAction(action: Action) -> Image.Image:
     elif action.code.startswith("CURSE-ONGOING"):
         rules = rules + " The victims of this curse may continue in the game whilst its effects are ongoing."
     # make sure the font size is ok!
-    size = 0.5*CHIP_HEIGHT
-    font = ImageFont.FreeTypeFont(
-        LIBRARY / STATIC / FONTS / "regular.ttf", size)
-    wrapped_rules = wrapText(rules, WIDTH - SPACE*5, font, draw)
-    height = draw.multiline_textbbox(
-        (0, 0), wrapped_rules, font, spacing=HALF_SPACE)[3]
-    while SPACE + SHADED_HEIGHT + height > HEIGHT - SPACE*3:
-        size -= 1
-        font = ImageFont.FreeTypeFont(
-            LIBRARY / STATIC / FONTS / "regular.ttf", size)
-        wrapped_rules = wrapText(rules, WIDTH - SPACE*5, font, draw)
-        height = draw.multiline_textbbox(
-            (0, 0), wrapped_rules, font, spacing=HALF_SPACE)[3]
+    size = ASSETS.fitBlock(rules, "regular", BODY_FONT_SIZE, BODY_TEXT_WIDTH,
+                           HEIGHT - SPACE*3 - SPACE - SHADED_HEIGHT)
+    font = ASSETS.font("regular", size)
+    wrapped_rules = wrapText(rules, BODY_TEXT_WIDTH, font, draw)
     draw.multiline_text((SPACE*2 + HALF_SPACE, SHADED_HEIGHT + SPACE),
                         wrapped_rules, BLACK, font, "la", HALF_SPACE)
     # remove corners
@@ -251,7 +522,7 @@ def drawAction(action: Action) -> Image.Image:
     return card
 
 
-def drawSpecialAbility(special: Special) -> Image.Image:
+def renderSpecialAbility(special: Special) -> Image.Image:
     # ok draw things
     card = getCardBase(getColour(getIconData(IconType.SPECIAL_ABILITY)["colour"]))
     # create draw
@@ -272,8 +543,7 @@ def drawSpecialAbility(special: Special) -> Image.Image:
         (0, 0), wrapped_name, TITLE_FONT, spacing=HALF_SPACE)[3]
     total_height = height + ACTION_ICON_SIZE + SPACE + HALF_SPACE
     # now put it all together
-    icon = loadIcon(special.icon_name).resize(
-        (ACTION_ICON_SIZE, ACTION_ICON_SIZE))
+    icon = ASSETS.icon(special.icon_name, ACTION_ICON_SIZE)
     card.paste(icon, (int(0.5*WIDTH - 0.5*ACTION_ICON_SIZE),
                       int(SPACE*5 + 0.5*SPECIAL_GRAPHIC.height - 0.5*total_height)), icon)
     draw.multiline_text((int(0.5*WIDTH), int(SPACE*5 + 0.5*SPECIAL_GRAPHIC.height - 0.5*total_height + ACTION_ICON_SIZE + SPACE + HALF_SPACE)),
@@ -281,20 +551,10 @@ def drawSpecialAbility(special: Special) -> Image.Image:
     # add the description
     description = special.description
     # make sure the font size is ok!
-    size = 0.5*CHIP_HEIGHT
-    font = ImageFont.FreeTypeFont(
-        LIBRARY / STATIC / FONTS / "regular.ttf", size)
-    wrapped_description = wrapText(description, WIDTH - SPACE*5, font, draw)
-    height = draw.multiline_textbbox(
-        (0, 0), wrapped_description, font, spacing=HALF_SPACE)[3]
-    while SPACE*6 + SPECIAL_GRAPHIC.height + height > HEIGHT - SPACE*3:
-        size -= 1
-        font = ImageFont.FreeTypeFont(
-            LIBRARY / STATIC / FONTS / "regular.ttf", size)
-        wrapped_description = wrapText(
-            description, WIDTH - SPACE*5, font, draw)
-        height = draw.multiline_textbbox(
-            (0, 0), wrapped_description, font, spacing=HALF_SPACE)[3]
+    size = ASSETS.fitBlock(description, "regular", BODY_FONT_SIZE, BODY_TEXT_WIDTH,
+                           HEIGHT - SPACE*3 - SPACE*6 - SPECIAL_GRAPHIC.height)
+    font = ASSETS.font("regular", size)
+    wrapped_description = wrapText(description, BODY_TEXT_WIDTH, font, draw)
     draw.multiline_text((int(0.5*WIDTH), SPACE*6 + SPECIAL_GRAPHIC.height),
                         wrapped_description, BLACK, font, "ma", HALF_SPACE)
     # remove corners
@@ -323,19 +583,11 @@ def addChip(draw: ImageDraw.ImageDraw, index: int,  type: IconType, content: str
     draw.rounded_rectangle((left, top, right, bottom),
                            int(0.5*CHIP_HEIGHT), colour)
     # add icon
-    icon = loadIcon(data["icon"][challenge_index]
-                    ).resize((ICON_SIZE, ICON_SIZE))
+    icon = ASSETS.icon(data["icon"][challenge_index], ICON_SIZE)
     # draw on icon
     draw._image.paste(WHITE_ICON if use_white else BLACK_ICON, (left + CHIP_SPACE*2, top+CHIP_SPACE), icon)
-    # create font
-    size = int(0.5*CHIP_HEIGHT)
-    font = ImageFont.FreeTypeFont(
-        LIBRARY / STATIC / FONTS / "regular.ttf", size)
-    # make sure font is correct size
-    while draw.textlength(content, font) > WIDTH - SPACE*4 - ICON_SIZE - CHIP_SPACE*6:
-        size -= 1
-        font = ImageFont.FreeTypeFont(
-            LIBRARY / STATIC / FONTS / "regular.ttf", size)
+    # create font (making sure it's the correct size)
+    font = ASSETS.font("regular", ASSETS.fitWidth(content, "regular", CHIP_FONT_SIZE, CHIP_TEXT_WIDTH))
     # add content text
     draw.text((left+ICON_SIZE+CHIP_SPACE*4, top + int(0.6*CHIP_HEIGHT)),
               content, WHITE if use_white else BLACK, font, "lm")
@@ -422,22 +674,28 @@ def addTagline(draw: ImageDraw.ImageDraw, text: str):
 def drawCollection(cards: list[Card], style: CollectionStyle, observer: Team | None = None) -> Image.Image:
     if len(cards) == 1:
         return cards[0].image(observer)
+    return composeCollection([card.image(observer) for card in cards], style)
+
+
+def composeCollection(images: list[Image.Image], style: CollectionStyle) -> Image.Image:
+    if len(images) == 1:
+        return images[0]
     # set up image size
     if style == CollectionStyle.HORIZONTAL:
-        rows = ceil(len(cards) / float(MAX_ROW))
-        columns = len(cards) if rows == 1 else MAX_ROW
+        rows = ceil(len(images) / float(MAX_ROW))
+        columns = len(images) if rows == 1 else MAX_ROW
         collection = Image.new("RGBA", (columns*WIDTH + 2*COLLECTION_SPACING,
                                         rows*HEIGHT + 2*COLLECTION_SPACING), (0, 0, 0, 0))
     elif style == CollectionStyle.STACKED:
         collection = Image.new("RGBA", (WIDTH + 2*COLLECTION_SPACING,
-                                        HEIGHT + VISIBLE_HEIGHT*(len(cards)-1) + 2*COLLECTION_SPACING), (0, 0, 0, 0))
+                                        HEIGHT + VISIBLE_HEIGHT*(len(images)-1) + 2*COLLECTION_SPACING), (0, 0, 0, 0))
     # add each card on one by one
-    for i, card in enumerate(cards):
+    for i, image in enumerate(images):
         # get its image (randomly rotated)
         angle = random.uniform(0, MAX_ROTATION)
         if i % 2 == 0:
             angle = -angle
-        card_image = card.image(observer).rotate(
+        card_image = image.rotate(
             degrees(angle), expand=True)
         # paste it onto the image
         if style == CollectionStyle.HORIZONTAL:
@@ -457,18 +715,22 @@ def drawLineCollection(lines: list[Line], observer: Team | None = None) -> Image
     # just draw a single line if required
     if len(lines) == 1:
         return drawCollection(sorted(lines[0].locked_stops), CollectionStyle.STACKED, observer)
+    return composeLineCollection([[stop.image(observer) for stop in sorted(line.locked_stops)] for line in lines])
+
+
+def composeLineCollection(columns: list[list[Image.Image]]) -> Image.Image:
     # create big image
-    collection = Image.new("RGBA", (len(lines)*(WIDTH+COLLECTION_SPACING) + COLLECTION_SPACING, HEIGHT + VISIBLE_HEIGHT*2 + 2*COLLECTION_SPACING), (0,0,0,0))
+    collection = Image.new("RGBA", (len(columns)*(WIDTH+COLLECTION_SPACING) + COLLECTION_SPACING, HEIGHT + VISIBLE_HEIGHT*2 + 2*COLLECTION_SPACING), (0,0,0,0))
     c = 0
-    for i, line in enumerate(lines):
+    for i, column in enumerate(columns):
         # add each card on one by one
-        for j, stop in enumerate(sorted(line.locked_stops)):
+        for j, image in enumerate(column):
             # get its image (randomly rotated)
             angle = random.uniform(0, MAX_ROTATION)
             if c % 2 == 0:
                 angle = -angle
             c += 1
-            card_image = stop.image(observer).rotate(
+            card_image = image.rotate(
                 degrees(angle), expand=True)
             # paste it onto the image
             coordinates = (COLLECTION_SPACING + int(0.5*WIDTH) + i*(COLLECTION_SPACING + WIDTH),
@@ -0,0 +1,88 @@
+from __future__ import annotations
+from itertools import combinations
+from typing import Any, Mapping
+from .data import getStaticData, getAllStopCodes, getAllZoneNumbers
+from .topology import getTopology
+
+# different zones (or sections) a line claim has to cover
+ZONES_TO_CLAIM = 3
+
+# the line that can be claimed by section with the special ability
+SECTION_LINE = "orange"
+SECTION_ABILITY = "CLAIMORANGE"
+
+# best claim for each (line, stops, by section), cleared if the static data is reloaded
+_SOLUTIONS: dict[tuple[str | None, frozenset[str], bool], tuple[str, ...] | None] = {}
+_SOURCE: Mapping[str, Any] | None = None
+
+
+def getClaimUnits(code: str, sections: bool = False) -> tuple[tuple[str, ...], int]:
+    # which zones (or sections) this stop could count as, and how many of them at once
+    topology = getTopology()
+    # junctions count as a section either side of them at the same time
+    if sections and code in topology.junctions:
+        return topology.junctions[code], len(topology.junctions[code])
+    zone = getStaticData("stops")[code]["inner_zone"]
+    suffix = topology.parents[code] if sections else ""
+    # border stops can be either side (but only one of them)
+    if code in topology.border_stops:
+        return tuple(str(number) + suffix for number in (zone, zone + 1) if number in getAllZoneNumbers()), 1
+    return (str(zone) + suffix,), 1
+
+
+def matchUnits(codes: list[str], sections: bool = False) -> dict[str, str]:
+    # bipartite matching of stops to zones (each stop used up to its capacity, each zone once)
+    slots = []
+    for code in codes:
+        units, capacity = getClaimUnits(code, sections)
+        slots.extend([(code, units)] * capacity)
+    matched: dict[str, int] = {}
+
+    def augment(slot: int, seen: set[str]) -> bool:
+        # take a free zone, or move whoever has it on to another one
+        for unit in slots[slot][1]:
+            if unit not in seen:
+                seen.add(unit)
+                if unit not in matched or augment(matched[unit], seen):
+                    matched[unit] = slot
+                    return True
+        return False
+
+    for slot in range(len(slots)):
+        augment(slot, set())
+    return {unit: slots[slot][0] for unit, slot in matched.items()}
+
+
+def findClaim(codes: frozenset[str], sections: bool = False, colour: str | None = None) -> tuple[str, ...] | None:
+    global _SOURCE
+    # forget everything if the static data has been reloaded since
+    stops = getStaticData("stops")
+    if _SOURCE is not stops:
+        _SOLUTIONS.clear()
+        _SOURCE = stops
+    key = (colour, codes, sections)
+    if key not in _SOLUTIONS:
+        _SOLUTIONS[key] = solveClaim(codes, sections)
+    return _SOLUTIONS[key]
+
+
+def solveClaim(codes: frozenset[str], sections: bool = False) -> tuple[str, ...] | None:
+    # keep map order so the same stops always give the same answer
+    ordered = [code for code in getAllStopCodes() if code in codes]
+    # give up straight away if even every stop together isn't enough
+    if len(matchUnits(ordered, sections)) < ZONES_TO_CLAIM:
+        return None
+    # stops that could count as the same zones are interchangeable, so only try a few of each
+    candidates = []
+    alike: dict[tuple[tuple[str, ...], int], int] = {}
+    for code in ordered:
+        kind = getClaimUnits(code, sections)
+        alike[kind] = alike.get(kind, 0) + 1
+        if alike[kind] <= ZONES_TO_CLAIM:
+            candidates.append(code)
+    # fewest stops that still cover enough (never more than one per zone needed)
+    for size in range(1, ZONES_TO_CLAIM + 1):
+        for chosen in combinations(candidates, size):
+            if len(matchUnits(list(chosen), sections)) >= ZONES_TO_CLAIM:
+                return chosen
+    return None
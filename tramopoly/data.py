@@ -1,7 +1,13 @@
 from pathlib import Path
 from PIL import Image
-from json import load, dump
-from typing import Any
+from json import load
+from types import MappingProxyType
+from typing import Any, Mapping, Sequence
+from os import environ
+from .live import LiveState
+from .deck import ZoneDeck
+from .backends import LiveBackend, JSONBackend, SQLiteBackend, MemoryBackend, SECTIONS
+from .instrumentation import instrumented
 
 LIBRARY = Path(__file__).parent
 
@@ -14,69 +20,84 @@ FONTS = "fonts"
 
 ### STATIC ###
 
+# every static file is loaded once into here, keyed by file name
+_STATIC_DATA: Mapping[str, Any] = MappingProxyType({})
 
-def getStaticLineData(colour: str) -> dict[str, Any]:
-    # open static file
-    with open(LIBRARY / STATIC / DATA / "lines.json") as source:
-        lines = load(source)
-    # find correct stop
-    return lines[colour]
+
+def freeze(value: Any) -> Any:
+    # make nested json data read-only all the way down
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    elif isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    else:
+        return value
 
 
-def getStaticStopData(code: str) -> dict[str, Any]:
-    # open static file
-    with open(LIBRARY / STATIC / DATA / "stops.json") as source:
-        stops = load(source)
-    # find correct stop
-    return stops[code]
+def copyData(value: Any) -> Any:
+    # copy nested live json data all the way down, so changes only count once they're set
+    if isinstance(value, dict):
+        return {key: copyData(item) for key, item in value.items()}
+    elif isinstance(value, list):
+        return [copyData(item) for item in value]
+    else:
+        return value
+
+
+@instrumented("static", "load")
+def reloadStaticData() -> None:
+    global _STATIC_DATA
+    # parse every file in the static data folder
+    loaded = {}
+    for path in sorted((LIBRARY / STATIC / DATA).glob("*.json")):
+        with open(path) as source:
+            loaded[path.stem] = freeze(load(source))
+    # swap in all at once so readers never see a half-loaded registry
+    _STATIC_DATA = MappingProxyType(loaded)
+
 
+@instrumented("static", "read", 0)
+def getStaticData(name: str) -> Any:
+    # load everything on first use
+    if not _STATIC_DATA:
+        reloadStaticData()
+    # return read-only view of this file
+    return _STATIC_DATA[name]
 
-def getStaticActionData(code: str) -> dict[str, Any]:
-    # open static file
-    with open(LIBRARY / STATIC / DATA / "actions.json") as source:
-        actions = load(source)
+
+def getStaticLineData(colour: str) -> Mapping[str, Any]:
+    # find correct line
+    return getStaticData("lines")[colour]
+
+
+def getStaticStopData(code: str) -> Mapping[str, Any]:
     # find correct stop
-    return actions[code]
+    return getStaticData("stops")[code]
+
+
+def getStaticActionData(code: str) -> Mapping[str, Any]:
+    # find correct action
+    return getStaticData("actions")[code]
 
 
 def getAllStopCodes() -> list[str]:
-    # open static file
-    with open(LIBRARY / STATIC / DATA / "stops.json") as source:
-        stops = load(source)
     # return all stop codes
-    return list(stops.keys())
+    return list(getStaticData("stops").keys())
 
 
 def getAllLineColours() -> list[str]:
-    # open static file
-    with open(LIBRARY / STATIC / DATA / "lines.json") as source:
-        lines = load(source)
     # return all line colours
-    return list(lines.keys())
-
-
-def getStaticLineData(colour: str) -> dict[str, Any]:
-    # open static file
-    with open(LIBRARY / STATIC / DATA / "lines.json") as source:
-        lines = load(source)
-    # find correct stop
-    return lines[colour]
+    return list(getStaticData("lines").keys())
 
 
-def getStaticSpecialAbilityData(code: str) -> dict[str, Any]:
-    # open static file
-    with open(LIBRARY / STATIC / DATA / "special_abilities.json") as source:
-        abilities = load(source)
+def getStaticSpecialAbilityData(code: str) -> Mapping[str, Any]:
     # find correct ability
-    return abilities[code]
+    return getStaticData("special_abilities")[code]
 
 
 def getAllSpecialAbilityCodes() -> list[str]:
-    # open static file
-    with open(LIBRARY / STATIC / DATA / "special_abilities.json") as source:
-        abilities = load(source)
     # return just the codes
-    return list(abilities.keys())
+    return list(getStaticData("special_abilities").keys())
 
 
 def getAllZoneNumbers() -> list[int]:
@@ -84,213 +105,303 @@ def getAllZoneNumbers() -> list[int]:
     return [number for number in range(1, 5)]
 
 
-def getSearchDict() -> dict[str, str]:
-    # open static file
-    with open(LIBRARY / STATIC / DATA / "search.json") as source:
-        search_dict = load(source)
+def getSearchDict() -> Mapping[str, str]:
     # return entire dictionary
-    return search_dict
+    return getStaticData("search")
 
 
-def getChallengeData(id: str) -> dict[str, Any]:
-    # open static file
-    with open(LIBRARY / STATIC / DATA / "challenges.json") as source:
-        challenges = load(source)
-    # find correct stop
-    return challenges[id]
+def getChallengeData(id: str) -> Mapping[str, Any]:
+    # find correct challenge
+    return getStaticData("challenges")[id]
 
 
-def getIconData(type: str) -> dict[str, Any]:
+def getIconData(type: str) -> Mapping[str, Any]:
     if hasattr(type, 'value'):
         type = str(type.value)
-    # open static file
-    with open(LIBRARY / STATIC / DATA / "icons.json") as source:
-        icons = load(source)
     # choose correct chip
-    return icons[type]
+    return getStaticData("icons")[type]
 
 
-def getActionTypeData(type: str) -> dict[str, Any]:
+def getActionTypeData(type: str) -> Mapping[str, Any]:
     if hasattr(type, 'value'):
         type = str(type.value)
-    # open static file
-    with open(LIBRARY / STATIC / DATA / "action_types.json") as source:
-        types = load(source)
     # choose correct action type
-    return types[type]
+    return getStaticData("action_types")[type]
 
 
-def getMapData() -> dict[str, Any]:
-    # open static file
-    with open(LIBRARY / STATIC / DATA / "map.json") as source:
-        map = load(source)
+def getMapData() -> Mapping[str, Any]:
     # return entire dictionary
-    return map
+    return getStaticData("map")
 
 
-def getStartDeckData(zone_number: int) -> list[str]:
-    # open static file
-    with open(LIBRARY / STATIC / DATA / "start_decks.json") as source:
-        decks = load(source)
+def getStartDeckData(zone_number: int) -> Sequence[str]:
     # return just this zone's starting deck
-    return decks[str(zone_number)]
+    return getStaticData("start_decks")[str(zone_number)]
 
 
-def getRewardPlacementData() -> list[dict[str, Any]]:
-    # open static file
-    with open(LIBRARY / STATIC / DATA / "rewards.json") as source:
-        placements = load(source)
+def getRewardPlacementData() -> Sequence[Mapping[str, Any]]:
     # return entire list of placements
-    return placements
+    return getStaticData("rewards")
 
 ### LIVE ###
 
+# every game's live files are held in memory once loaded
+_LIVE_STATES: dict[str, LiveState] = {}
+
+
+# everything that changes can be kept outside the package (e.g. on tmpfs), leaving it read-only
+DATA_ROOT: Path | None = Path(environ["TRAMOPOLY_DATA_DIR"]) if environ.get("TRAMOPOLY_DATA_DIR") else None
+# how live games are stored by default
+BACKEND: str = environ.get("TRAMOPOLY_BACKEND", "json")
+
+
+def getLiveRoot() -> Path:
+    # folder holding one directory per game
+    return DATA_ROOT / LIVE if DATA_ROOT else LIBRARY / LIVE
+
+
+def createLiveBackend(name: str, root: Path | str | None = None) -> LiveBackend:
+    root = Path(root) if root is not None else getLiveRoot()
+    # choose how live games are stored
+    if name == "json":
+        return JSONBackend(root, int(environ.get("TRAMOPOLY_SNAPSHOTS", 0)))
+    elif name == "sqlite":
+        return SQLiteBackend(root)
+    elif name == "memory":
+        return MemoryBackend()
+    else:
+        raise ValueError(f"Unknown live backend: {name}")
+
+
+_LIVE_BACKEND: LiveBackend = createLiveBackend(BACKEND)
+
+# backends for games kept in other folders, one per folder
+_ROOT_BACKENDS: dict[Path, LiveBackend] = {}
+
+
+def getLiveBackendAt(root: Path | str) -> LiveBackend:
+    root = Path(root)
+    # the default backend may already be using this folder
+    if _LIVE_BACKEND.shared and _LIVE_BACKEND.root == root:
+        return _LIVE_BACKEND
+    # same kind of storage as the default (files if that's in memory)
+    if root not in _ROOT_BACKENDS:
+        _ROOT_BACKENDS[root] = createLiveBackend(BACKEND if BACKEND != "memory" else "json", root)
+    return _ROOT_BACKENDS[root]
+
+
+# also lock games against other processes sharing the same live folder
+_PROCESS_LOCK: bool = environ.get("TRAMOPOLY_PROCESS_LOCK", "0") not in ("", "0")
+
+
+def forgetLiveState(game_id: str, save: bool = True) -> None:
+    from .snapshot import forgetSnapshot
+    from .matrix import forgetStateMatrix
+    # the next state starts counting revisions again, so anything cached against the old one has to go too
+    state = _LIVE_STATES.pop(game_id, None)
+    if state and save:
+        state.flush()
+    forgetSnapshot(game_id)
+    forgetStateMatrix(game_id)
+
+
+def setProcessLocking(enabled: bool) -> None:
+    global _PROCESS_LOCK
+    _PROCESS_LOCK = enabled
+    # pick the new setting up next time each game is used
+    for game_id in list(_LIVE_STATES):
+        forgetLiveState(game_id)
+
+
+def getLiveBackend() -> LiveBackend:
+    return _LIVE_BACKEND
+
+
+def setLiveBackend(backend: LiveBackend) -> None:
+    global _LIVE_BACKEND
+    # save anything pending before switching over
+    for game_id in list(_LIVE_STATES):
+        forgetLiveState(game_id)
+    _LIVE_BACKEND = backend
+
+
+# games stored somewhere other than the default backend (e.g. in memory)
+_GAME_BACKENDS: dict[str, LiveBackend] = {}
+
+
+def getGameBackend(game_id: str) -> LiveBackend:
+    # where this game is stored
+    return _GAME_BACKENDS.get(game_id, _LIVE_BACKEND)
+
+
+def setGameBackend(game_id: str, backend: LiveBackend | None) -> None:
+    # nothing to do if it's already there
+    if getGameBackend(game_id) is (backend or _LIVE_BACKEND):
+        return
+    # save anything pending to wherever the game was before
+    forgetLiveState(game_id)
+    # None goes back to the default backend
+    if backend is None or backend is _LIVE_BACKEND:
+        _GAME_BACKENDS.pop(game_id, None)
+    else:
+        _GAME_BACKENDS[game_id] = backend
+
+
+def getLiveState(game_id: str) -> LiveState:
+    # create the in-memory state the first time this game is used
+    if game_id not in _LIVE_STATES:
+        backend = getGameBackend(game_id)
+        _LIVE_STATES[game_id] = LiveState(game_id, backend, _PROCESS_LOCK and backend.shared)
+    return _LIVE_STATES[game_id]
+
 
 def getLiveStopData(code: str, game_id: str) -> dict[str, Any]:
-    # open live file
-    with open(LIBRARY / LIVE / game_id / DATA / "stops.json") as source:
-        stops = load(source)
+    stops = getLiveState(game_id).get("stops")
     # find correct stop
     if code in stops:
-        return stops[code]
+        return copyData(stops[code])
     # or use default
     else:
         return {}
 
 
 def setLiveStopData(code: str, data: dict[str, Any], game_id: str) -> None:
-    # open live file
-    with open(LIBRARY / LIVE / game_id / DATA / "stops.json") as source:
-        stops = load(source)
     # set this stop's new data
-    stops[code] = data
-    # save live file
-    with open(LIBRARY / LIVE / game_id / DATA / "stops.json", 'w') as source:
-        dump(stops, source, indent=4)
+    getLiveState(game_id).set("stops", code, data)
+
+
+def getClaimedStopCodes(team_id: str, game_id: str, locked: bool | None = None) -> list[str]:
+    # all stops owned by this team (optionally only locked/unlocked ones)
+    return getLiveState(game_id).stopCodesByOwner(team_id, locked)
 
 
 def getAllTeamIDs(game_id: str) -> list[str]:
-    # open live file
-    with open(LIBRARY / LIVE / game_id / DATA / "teams.json") as source:
-        teams = load(source)
     # return all team IDs
-    return list(teams.keys())
+    return list(getLiveState(game_id).get("teams").keys())
 
 
 def getLiveTeamData(id: str, game_id: str) -> dict[str, Any]:
-    # open live file
-    with open(LIBRARY / LIVE / game_id / DATA / "teams.json") as source:
-        teams = load(source)
-    # find correct stop
+    teams = getLiveState(game_id).get("teams")
+    # find correct team
     if id in teams:
-        return teams[id]
+        return copyData(teams[id])
     # or use default
     else:
         return {}
 
 
 def setLiveTeamData(id: str, data: dict[str, Any], game_id: str) -> None:
-    # open live file
-    with open(LIBRARY / LIVE / game_id / DATA / "teams.json") as source:
-        teams = load(source)
     # set this team's new data
-    teams[id] = data
-    # save live file
-    with open(LIBRARY / LIVE / game_id / DATA / "teams.json", 'w') as source:
-        dump(teams, source, indent=4)
+    getLiveState(game_id).set("teams", id, data)
 
 
 def getLivePendingCounter(action_id: str, game_id: str) -> dict[str, Any]:
-    # open live file
-    with open(LIBRARY / LIVE / game_id / DATA / "counters.json") as source:
-        counters = load(source)
+    counters = getLiveState(game_id).get("counters")
     # find correct card
     if action_id in counters:
-        return counters[action_id]
+        return copyData(counters[action_id])
     else:
         return {}
 
 
 def setLivePendingCounter(action_id: str, data: dict[str, Any], game_id: str) -> None:
-    # open live file
-    with open(LIBRARY / LIVE / game_id / DATA / "counters.json") as source:
-        counters = load(source)
     # add new data
-    counters[action_id] = data
-    # save live file
-    with open(LIBRARY / LIVE / game_id / DATA / "counters.json", 'w') as source:
-        dump(counters, source, indent=4)
+    getLiveState(game_id).set("counters", action_id, data)
 
 
 def getLiveDeckData(game_id: str) -> dict[str, Any]:
-    # open live file
-    with open(LIBRARY / LIVE / game_id / DATA / "deck.json") as source:
-        deck = load(source)
     # return entire dictionary
-    return deck
+    return copyData(getLiveState(game_id).get("deck"))
 
 
 def setLiveDeckData(data: dict[str, Any], game_id: str) -> None:
-    # open live file and save new data
-    with open(LIBRARY / LIVE / game_id / DATA / "deck.json", 'w') as source:
-        dump(data, source, indent=4)
+    # replace the whole deck
+    getLiveState(game_id).replace("deck", data)
+
+
+def getUndealtDeckIDs(zone_number: int, game_id: str) -> list[str]:
+    # cards in this zone's deck that nobody holds yet
+    return getLiveState(game_id).undealtDeckIDs(zone_number)
+
+
+def getZoneDeck(zone_number: int, game_id: str) -> ZoneDeck:
+    # this zone's cards split into undealt, reserved and dealt piles
+    return getLiveState(game_id).deckIndex().zone(zone_number)
+
+
+def getHeldDeckIDs(team_id: str, pile: str, game_id: str) -> list[str]:
+    # cards in this team's hand, reserved for them or already used (in deck order)
+    return getLiveState(game_id).deckIndex().held(team_id, pile)
 
 
 def getLiveActionData(id: str, game_id: str) -> dict[str, Any]:
-    # open live file
-    with open(LIBRARY / LIVE / game_id / DATA / "deck.json") as source:
-        deck = load(source)
     # find correct action
-    return deck[id]
+    return copyData(getLiveState(game_id).get("deck")[id])
 
 
 def setLiveActionData(id: str, data: dict[str, Any], game_id: str) -> None:
-    # open live file
-    with open(LIBRARY / LIVE / game_id / DATA / "deck.json") as source:
-        deck = load(source)
     # set this action's new data
-    deck[id] = data
-    # save live file
-    with open(LIBRARY / LIVE / game_id / DATA / "deck.json", 'w') as source:
-        dump(deck, source, indent=4)
+    getLiveState(game_id).set("deck", id, data)
 
 
 def getLiveGameData(game_id: int) -> dict[str, Any]:
-    # open live file
-    with open(LIBRARY / LIVE / game_id / DATA / "game.json") as source:
-        data = load(source)
     # return entire dictionary
-    return data
+    return copyData(getLiveState(game_id).get("game"))
 
 def setLiveGameData(game_id: int, data: dict[str, Any]) -> None:
-    # open live file
-    with open(LIBRARY / LIVE / game_id / DATA / "game.json", 'w') as source:
-        dump(data, source)
+    # replace game data
+    getLiveState(game_id).replace("game", data)
 
 def resetLiveGameData(game_id: int) -> None:
-    (LIBRARY / LIVE / game_id / DATA / "stops.json").write_text("{}")
-    (LIBRARY / LIVE / game_id / DATA / "deck.json").write_text("{}")
-    (LIBRARY / LIVE / game_id / DATA / "counters.json").write_text("{}")
-    (LIBRARY / LIVE / game_id / DATA / "game.json").write_text('{"in_progress": false}')
+    state = getLiveState(game_id)
+    # clear everything in a single write
+    with state.transaction():
+        state.replace("stops", {})
+        state.replace("deck", {})
+        state.replace("counters", {})
+        state.replace("game", {"in_progress": False})
     # teams are reset separately
 
 
-def getAllGameIDs() -> list[str]:
-    # use names of directories in live folder
-    return [path.stem for path in (LIBRARY / LIVE).iterdir()]
+def recoverLiveData(game_id: str) -> list[str]:
+    backend = getGameBackend(game_id)
+    # only json files can be left half-written
+    if not isinstance(backend, JSONBackend):
+        return []
+    state = getLiveState(game_id)
+    recovered = []
+    for section in SECTIONS:
+        if backend.readable(game_id, section):
+            continue
+        # anything already in memory is newer than any snapshot
+        if state.loaded(section):
+            state.replace(section, state.get(section))
+            recovered.append(section)
+        # otherwise go back to the latest good snapshot
+        elif backend.recover(game_id, section):
+            recovered.append(section)
+    return recovered
+
 
+def getAllGameIDs(backend: LiveBackend | None = None) -> list[str]:
+    # ask the storage backend (ids have to be unique across every backend in use, since games are found by id)
+    game_ids = _LIVE_BACKEND.gameIDs() + list(_GAME_BACKENDS)
+    if backend is not None and backend is not _LIVE_BACKEND:
+        game_ids += backend.gameIDs()
+    return game_ids
 
-def createNewGameDirectory(id: str) -> bool:
-    try:
-        (LIBRARY / LIVE / id / DATA).mkdir(parents=True)
-        (LIBRARY / LIVE / id / DATA / "stops.json").write_text("{}")
-        (LIBRARY / LIVE / id / DATA / "teams.json").write_text("{}")
-        (LIBRARY / LIVE / id / DATA / "deck.json").write_text("{}")
-        (LIBRARY / LIVE / id / DATA / "counters.json").write_text("{}")
-        (LIBRARY / LIVE / id / DATA / "game.json").write_text('{"in_progress": false}')
-        return True
-    except:
-        return False
+
+def createNewGameDirectory(id: str, backend: LiveBackend | None = None) -> bool:
+    # set up empty live files (somewhere other than the default backend if given)
+    setGameBackend(id, backend)
+    return getGameBackend(id).create(id)
+
+
+def deleteLiveGame(game_id: str) -> None:
+    # throw away the game and anything cached about it (the id may be used again)
+    forgetLiveState(game_id, False)
+    getGameBackend(game_id).delete(game_id)
+    _GAME_BACKENDS.pop(game_id, None)
 
 
 def getColour(colour: str) -> tuple[int, int, int]:
@@ -299,11 +410,8 @@ def getColour(colour: str) -> tuple[int, int, int]:
 
 
 def getTeamColour(colour: str) -> str:
-    # open static file
-    with open(LIBRARY / STATIC / DATA / "team_colours.json") as source:
-        colours = load(source)
-    # return all line colours
-    return colours[colour]
+    # return this team colour as hex
+    return getStaticData("team_colours")[colour]
 
 
 def loadIcon(code: str) -> Image.Image:
@@ -0,0 +1,163 @@
+from __future__ import annotations
+from random import randrange
+from typing import Any, Iterable, Iterator
+
+# which pile a card is in
+UNDEALT = "undealt"
+RESERVED = "reserved"
+DEALT = "dealt"
+# and where it is for whoever holds it (reserved is shared with the above)
+HAND = "hand"
+USED = "used"
+
+
+class Pool:
+
+    __slots__ = ("_ids", "_positions")
+
+    def __init__(self) -> None:
+        # deck ids in no particular order, and where each one is in that list
+        self._ids: list[str] = []
+        self._positions: dict[str, int] = {}
+
+    def add(self, id: str) -> None:
+        if id not in self._positions:
+            self._positions[id] = len(self._ids)
+            self._ids.append(id)
+
+    def remove(self, id: str) -> None:
+        # swap the last card into the gap so nothing else has to move
+        position = self._positions.pop(id)
+        last = self._ids.pop()
+        if position < len(self._ids):
+            self._ids[position] = last
+            self._positions[last] = position
+
+    def choice(self) -> str:
+        if not self._ids:
+            raise IndexError("Cannot choose from an empty pool")
+        return self._ids[randrange(len(self._ids))]
+
+    def sample(self, count: int) -> list[str]:
+        if count > len(self._ids):
+            raise ValueError("Sample larger than pool")
+        # pick positions without replacement (only ever a couple, so just retry on repeats)
+        chosen: dict[int, str] = {}
+        while len(chosen) < count:
+            position = randrange(len(self._ids))
+            chosen.setdefault(position, self._ids[position])
+        return list(chosen.values())
+
+    def __contains__(self, id: object) -> bool:
+        return id in self._positions
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._ids)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+
+class ZoneDeck:
+
+    __slots__ = ("_pools",)
+
+    def __init__(self) -> None:
+        self._pools: dict[str, Pool] = {UNDEALT: Pool(), RESERVED: Pool(), DEALT: Pool()}
+
+    @property
+    def undealt(self) -> Pool:
+        return self._pools[UNDEALT]
+
+    @property
+    def reserved(self) -> Pool:
+        return self._pools[RESERVED]
+
+    @property
+    def dealt(self) -> Pool:
+        return self._pools[DEALT]
+
+    def pool(self, status: str) -> Pool:
+        return self._pools[status]
+
+
+class DeckIndex:
+
+    def __init__(self, deck: dict[str, Any]) -> None:
+        # remember which loaded deck this was built from so it can tell when it's been swapped out
+        self._source: dict[str, Any] = deck
+        self._zones: dict[int, ZoneDeck] = {}
+        # (zone, pile) of every card
+        self._places: dict[str, tuple[int, str]] = {}
+        # each team's hand, reserved and used cards, and (team, pile) of every card someone holds
+        self._owners: dict[str, dict[str, Pool]] = {}
+        self._holders: dict[str, tuple[str, str]] = {}
+        # deck order, so cards held can be listed in the same order as before
+        self._order: dict[str, int] = {}
+        for id, data in deck.items():
+            self.update(id, data)
+
+    @property
+    def source(self) -> dict[str, Any]:
+        return self._source
+
+    def zone(self, zone_number: int) -> ZoneDeck:
+        if zone_number not in self._zones:
+            self._zones[zone_number] = ZoneDeck()
+        return self._zones[zone_number]
+
+    def owner(self, team_id: str) -> dict[str, Pool]:
+        if team_id not in self._owners:
+            self._owners[team_id] = {HAND: Pool(), RESERVED: Pool(), USED: Pool()}
+        return self._owners[team_id]
+
+    def ordered(self, ids: Iterable[str]) -> list[str]:
+        # pools are kept in no particular order, so put them back in deck order
+        return sorted(ids, key=self._order.__getitem__)
+
+    def held(self, team_id: str, pile: str) -> list[str]:
+        # only as much work as the team has cards
+        return self.ordered(self.owner(team_id)[pile])
+
+    def update(self, id: str, data: dict[str, Any] | None) -> None:
+        self._order.setdefault(id, len(self._order))
+        # move a card to the pile it now belongs in (None if it's gone)
+        place = (data["zone"], getStatus(data)) if data is not None else None
+        old = self._places.get(id)
+        if old != place:
+            if old is not None:
+                self.zone(old[0]).pool(old[1]).remove(id)
+                del self._places[id]
+            if place is not None:
+                self.zone(place[0]).pool(place[1]).add(id)
+                self._places[id] = place
+        # and between whoever holds it
+        holder = getHolder(data) if data is not None else None
+        old = self._holders.get(id)
+        if old != holder:
+            if old is not None:
+                self.owner(old[0])[old[1]].remove(id)
+                del self._holders[id]
+            if holder is not None:
+                self.owner(holder[0])[holder[1]].add(id)
+                self._holders[id] = holder
+
+
+def getStatus(data: dict[str, Any]) -> str:
+    # reserved cards count as reserved even once dealt
+    if data.get("reserved", False):
+        return RESERVED
+    elif data.get("dealt", False):
+        return DEALT
+    return UNDEALT
+
+
+def getHolder(data: dict[str, Any]) -> tuple[str, str] | None:
+    # nobody has it yet
+    if "owner" not in data:
+        return None
+    if data.get("reserved", False):
+        return data["owner"], RESERVED
+    elif data.get("dealt", False):
+        return data["owner"], USED if data.get("used", False) else HAND
+    return None
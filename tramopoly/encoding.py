@@ -0,0 +1,163 @@
+from __future__ import annotations
+from enum import Enum
+from io import BytesIO
+from os import environ
+from threading import Lock
+from time import perf_counter
+from PIL import Image
+from PIL.Image import Resampling
+
+
+class ImageFormat(Enum):
+    PNG = "png"
+    WEBP = "webp"
+    JPEG = "jpeg"
+
+
+# formats that can't store transparency get flattened onto this
+FLATTEN_BACKGROUND = (255, 255, 255)
+
+# width to scale images down to for people on their phones (0 sends everyone full size)
+MOBILE_WIDTH = int(environ.get("TRAMOPOLY_MOBILE_WIDTH", 0))
+
+
+class EncodingProfile:
+
+    def __init__(self, name: str, format: ImageFormat = ImageFormat.PNG, compress_level: int = 6,
+                 quality: int = 85, colours: int = 0, max_width: int = 0) -> None:
+        self._name: str = name
+        self._format: ImageFormat = format
+        # png only, 0 (fastest) to 9 (smallest)
+        self._compress_level: int = compress_level
+        # webp and jpeg only
+        self._quality: int = quality
+        # reduce to a palette of this many colours first (0 keeps every colour)
+        self._colours: int = colours
+        # scale down anything wider than this (0 keeps full size)
+        self._max_width: int = max_width
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def format(self) -> ImageFormat:
+        return self._format
+
+    @property
+    def extension(self) -> str:
+        return "jpg" if self._format == ImageFormat.JPEG else self._format.value
+
+    @property
+    def compress_level(self) -> int:
+        return self._compress_level
+
+    @property
+    def quality(self) -> int:
+        return self._quality
+
+    @property
+    def colours(self) -> int:
+        return self._colours
+
+    @property
+    def max_width(self) -> int:
+        return self._max_width
+
+    def scaled(self, max_width: int) -> EncodingProfile:
+        # same settings, just smaller (and never bigger than already set)
+        width = min(max_width, self._max_width) if self._max_width else max_width
+        return EncodingProfile(self._name, self._format, self._compress_level, self._quality, self._colours, width)
+
+    def prepare(self, image: Image.Image) -> Image.Image:
+        # shrink
+        if self._max_width and image.width > self._max_width:
+            height = round(image.height * self._max_width / image.width)
+            image = image.resize((self._max_width, height), Resampling.LANCZOS)
+        # jpeg has no transparency
+        if self._format == ImageFormat.JPEG and image.mode != "RGB":
+            background = Image.new("RGB", image.size, FLATTEN_BACKGROUND)
+            background.paste(image, mask=image.getchannel("A") if "A" in image.getbands() else None)
+            image = background
+        # palettes only help png
+        elif self._colours and self._format == ImageFormat.PNG:
+            image = image.quantize(self._colours, method=Image.Quantize.FASTOCTREE)
+        return image
+
+    def encode(self, image: Image.Image) -> bytes:
+        start = perf_counter()
+        image = self.prepare(image)
+        bytes = BytesIO()
+        if self._format == ImageFormat.PNG:
+            image.save(bytes, "PNG", compress_level=self._compress_level)
+        elif self._format == ImageFormat.WEBP:
+            image.save(bytes, "WEBP", quality=self._quality)
+        else:
+            image.save(bytes, "JPEG", quality=self._quality)
+        data = bytes.getvalue()
+        # keep track of how long this took and how big it came out
+        ENCODING_STATS.record(self, perf_counter() - start, len(data))
+        return data
+
+
+class EncodingStats:
+
+    def __init__(self) -> None:
+        self._lock: Lock = Lock()
+        # (profile, format) -> [count, seconds, bytes]
+        self._totals: dict[tuple[str, str], list[float]] = {}
+
+    def record(self, profile: EncodingProfile, seconds: float, size: int) -> None:
+        key = (profile.name, profile.extension)
+        with self._lock:
+            totals = self._totals.setdefault(key, [0, 0, 0])
+            totals[0] += 1
+            totals[1] += seconds
+            totals[2] += size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._totals.clear()
+
+    @property
+    def averages(self) -> dict[tuple[str, str], tuple[int, float, int]]:
+        # count, average seconds and average bytes of each
+        with self._lock:
+            return {key: (int(count), seconds / count, int(size / count))
+                    for key, (count, seconds, size) in self._totals.items()}
+
+    def summary(self) -> str:
+        return "\n".join(f"{name} ({extension}): {count} encoded, {seconds*1000:.0f}ms, {size/1024:.0f}KB average"
+                         for (name, extension), (count, seconds, size) in self.averages.items())
+
+
+ENCODING_STATS = EncodingStats()
+
+
+def loadProfile(name: str, format: ImageFormat = ImageFormat.PNG) -> EncodingProfile:
+    # e.g. TRAMOPOLY_MAP_FORMAT=webp, TRAMOPOLY_CARD_COLOURS=256
+    prefix = f"TRAMOPOLY_{name.upper()}_"
+    return EncodingProfile(
+        name,
+        ImageFormat(environ.get(prefix + "FORMAT", format.value).lower()),
+        int(environ.get(prefix + "PNG_LEVEL", 6)),
+        int(environ.get(prefix + "QUALITY", 85)),
+        int(environ.get(prefix + "COLOURS", 0)),
+        int(environ.get(prefix + "MAX_WIDTH", 0))
+    )
+
+
+# cards and collections of cards, and the map
+PROFILES: dict[str, EncodingProfile] = {
+    "card": loadProfile("card"),
+    "map": loadProfile("map")
+}
+
+
+def getProfile(name: str) -> EncodingProfile:
+    return PROFILES[name]
+
+
+def encodeImage(image: Image.Image, profile: str = "card", mobile: bool = False) -> bytes:
+    encoding = getProfile(profile)
+    return (encoding.scaled(MOBILE_WIDTH) if mobile and MOBILE_WIDTH else encoding).encode(image)
@@ -1,52 +1,76 @@
 from __future__ import annotations
 from string import ascii_uppercase
-from .data import getAllGameIDs, createNewGameDirectory, getSearchDict, getAllStopCodes, getAllLineColours, getAllZoneNumbers, getAllTeamIDs, getLiveDeckData, getRewardPlacementData, getAllSpecialAbilityCodes, clean, getLiveGameData, setLiveGameData, resetLiveGameData
+from .data import getAllGameIDs, createNewGameDirectory, getGameBackend, setGameBackend, getLiveBackendAt, deleteLiveGame, getAllStopCodes, getAllLineColours, getAllZoneNumbers, getAllTeamIDs, getLiveDeckData, getRewardPlacementData, getAllSpecialAbilityCodes, clean, getLiveGameData, setLiveGameData, resetLiveGameData, getLiveState
+from contextlib import AbstractContextManager
 from random import choice, sample, choices
 from PIL.Image import Image
-from typing import TYPE_CHECKING
+from typing import Iterable, TYPE_CHECKING
 from datetime import datetime, timedelta
 if TYPE_CHECKING:
-    from .stop import Stop
+    from pathlib import Path
+    from .stop import Stop, Challenge
     from .line import Line
     from .team import Team
     from .zone import Zone
     from .special import Special
     from .action import Action
     from .map_images import drawMap
+    from .live import LiveState, GameLock
+    from .backends import LiveBackend
+    from .snapshot import GameSnapshot
 
 
 class Game:
 
-    def __init__(self, id: str | None = None) -> None:
+    __slots__ = ("_id", "_stops", "_teams", "_lines", "_zones", "_specials", "_actions", "_challenges")
+
+    def __init__(self, id: str | None = None, backend: LiveBackend | None = None, root: Path | str | None = None) -> None:
+        # keep this game's live files in a folder of its own choosing
+        if backend is None and root is not None:
+            backend = getLiveBackendAt(root)
+        # one shared object per stop/team/line/etc. in this game
+        self._stops: dict[str, Stop] = {}
+        self._teams: dict[str, Team] = {}
+        self._lines: dict[str, Line] = {}
+        self._zones: dict[int, Zone] = {}
+        self._specials: dict[str, Special] = {}
+        self._actions: dict[str, Action] = {}
+        self._challenges: dict[str, Challenge] = {}
         if id == None:
             # generate new game id
             id = randomGameID()
-            existing_game_ids = getAllGameIDs()
+            existing_game_ids = getAllGameIDs(backend)
             while id in existing_game_ids:
                 id = randomGameID()
-            # create directory
-            createNewGameDirectory(id)
+            # create directory (or wherever this game is being kept)
+            createNewGameDirectory(id, backend)
             # initialise zone decks
             self._id = id
-            for zone in self.all_zones:
-                zone.createDeck()
+            with self.transaction():
+                for zone in self.all_zones:
+                    zone.createDeck()
         else:
             # capitalise id
             self._id = id.upper()
+            # only needed the first time for games not in the default backend
+            if backend is not None:
+                setGameBackend(self._id, backend)
 
     @property
     def id(self) -> str:
         return self._id
 
+    @property
+    def backend(self) -> LiveBackend:
+        return getGameBackend(self._id)
+
     @property
     def all_teams(self) -> list[Team]:
-        from .team import Team
-        return [Team(id, self) for id in getAllTeamIDs(self._id)]
+        return [self.getTeamFromID(id) for id in getAllTeamIDs(self._id)]
 
     @property
     def all_stops(self) -> list[Stop]:
-        from .stop import Stop
-        return [Stop(code, self) for code in getAllStopCodes()]
+        return [self.getStopFromCode(code) for code in getAllStopCodes()]
 
     @property
     def claimed_stops(self) -> list[Stop]:
@@ -62,8 +86,7 @@ class Game:
 
     @property
     def all_lines(self) -> list[Line]:
-        from .line import Line
-        return [Line(colour, self) for colour in getAllLineColours()]
+        return [self.getLineFromColour(colour) for colour in getAllLineColours()]
 
     @property
     def claimed_lines(self) -> list[Line]:
@@ -71,13 +94,11 @@ class Game:
 
     @property
     def all_zones(self) -> list[Zone]:
-        from .zone import Zone
-        return [Zone(number, self) for number in getAllZoneNumbers()]
+        return [self.getZoneFromNumber(number) for number in getAllZoneNumbers()]
 
     @property
     def all_actions(self) -> list[Action]:
-        from .action import Action
-        return [Action.loadLive(deck_id, self) for deck_id in getLiveDeckData(self._id)]
+        return [self.getActionFromDeckID(deck_id) for deck_id in getLiveDeckData(self._id)]
 
     @property
     def in_progress(self) -> bool:
@@ -86,16 +107,17 @@ class Game:
     @property
     def game_over(self) -> bool:
         # check if any team has won
-        finished = any(team.has_won for team in self.all_teams)
+        finished = self.snapshot().game_over
         # end the game officially
         if finished and self.in_progress:
-            # load live data
-            live_data = getLiveGameData(self._id)
-            # set end...
-            live_data["in_progress"] = False
-            live_data["end_time"] = datetime.now().timestamp()
-            # save data
-            setLiveGameData(self._id, live_data)
+            with self.transaction():
+                # load live data
+                live_data = getLiveGameData(self._id)
+                # set end...
+                live_data["in_progress"] = False
+                live_data["end_time"] = datetime.now().timestamp()
+                # save data
+                setLiveGameData(self._id, live_data)
         return finished
 
     @property
@@ -110,55 +132,105 @@ class Game:
     @property
     def winner(self) -> Team:
         # check if any team has won and return that team
-        return next(team for team in self.all_teams if team.has_won)    
+        return self.snapshot().winner
+
+    def transaction(self) -> AbstractContextManager[LiveState]:
+        # group changes together so each live file is only written once (and hold the game lock)
+        return getLiveState(self._id).transaction()
+
+    def lock(self) -> GameLock:
+        # use "with" from threads or "async with" from coroutines
+        return getLiveState(self._id).lock
+
+    def snapshot(self) -> GameSnapshot:
+        from .snapshot import getSnapshot
+        # read-only view of the whole game at this moment (reused until something changes)
+        return getSnapshot(self)
 
     def map(self, observer: Team | None = None) -> Image:
         from .map_images import drawMap
         return drawMap(self, observer)
 
     def start(self) -> None:
-        # do mulligan
-        self.doMulligan()
-        # load live data
-        live_data = getLiveGameData(self._id)
-        # set start...
-        live_data["in_progress"] = True
-        live_data["start_time"] = datetime.now().timestamp()
-        # save data
-        setLiveGameData(self._id, live_data)
+        with self.transaction():
+            # do mulligan
+            self.doMulligan()
+            # load live data
+            live_data = getLiveGameData(self._id)
+            # set start...
+            live_data["in_progress"] = True
+            live_data["start_time"] = datetime.now().timestamp()
+            # save data
+            setLiveGameData(self._id, live_data)
+
+    def delete(self) -> None:
+        # remove the game completely (e.g. once a simulated game is finished with)
+        deleteLiveGame(self._id)
 
     def reset(self) -> None:
-        # unclaim everything!
-        resetLiveGameData(self._id)
-        for zone in self.all_zones:
-            zone.createDeck()
-        for team in self.all_teams:
-            team.reset()
+        with self.transaction():
+            # unclaim everything!
+            resetLiveGameData(self._id)
+            for zone in self.all_zones:
+                zone.createDeck()
+            for team in self.all_teams:
+                team.reset()
 
 
     def searchStop(self, search_term: str) -> Stop | None:
         stop = searchStop(search_term)
         if not stop:
             return None
-        # link the stop to this game
-        stop._game = self
-        return stop
+        # use this game's copy of the stop
+        return self.getStopFromCode(stop.code)
+
+    def searchStops(self, search_term: str, limit: int | None = None, unclaimed: bool = False) -> list[Stop]:
+        codes = [stop.code for stop in self.unclaimed_stops] if unclaimed else None
+        return [self.getStopFromCode(stop.code) for stop in searchStops(search_term, limit, codes)]
 
     def getStopFromCode(self, code: str) -> Stop:
         from .stop import Stop
-        return Stop(code, self)
+        # reuse the same object every time
+        if code not in self._stops:
+            self._stops[code] = Stop(code, self)
+        return self._stops[code]
 
     def getTeamFromID(self, id: str) -> Team:
         from .team import Team
-        return Team(id, self)
+        if id not in self._teams:
+            self._teams[id] = Team(id, self)
+        return self._teams[id]
 
     def getZoneFromNumber(self, number: int) -> Zone:
         from .zone import Zone
-        return Zone(number, self)
+        if number not in self._zones:
+            self._zones[number] = Zone(number, self)
+        return self._zones[number]
 
     def getLineFromColour(self, colour: str) -> Line:
         from .line import Line
-        return Line(colour, self)
+        if colour not in self._lines:
+            self._lines[colour] = Line(colour, self)
+        return self._lines[colour]
+
+    def getSpecialFromCode(self, code: str) -> Special:
+        from .special import Special
+        if code not in self._specials:
+            self._specials[code] = Special(code, self)
+        return self._specials[code]
+
+    def getActionFromDeckID(self, deck_id: str) -> Action:
+        from .action import Action
+        # the card type never changes, so this is safe to keep
+        if deck_id not in self._actions:
+            self._actions[deck_id] = Action.loadLive(deck_id, self)
+        return self._actions[deck_id]
+
+    def getChallengeFromID(self, id: str) -> Challenge:
+        from .stop import Challenge
+        if id not in self._challenges:
+            self._challenges[id] = Challenge(id, self)
+        return self._challenges[id]
 
     def getTeamFromName(self, name: str) -> Team | None:
         search_term_clean = clean(name)
@@ -175,58 +247,61 @@ class Game:
         return Team.new(self, name, colour)
 
     def dealSecret(self, team: Team, zone: Zone, exclude: Stop | None = None) -> Stop:
-        all_secrets = []
-        for other_team in self.all_teams:
-            all_secrets.extend(other_team.retained_secrets)
-        # get available stops
-        available = [
-            stop for stop in zone.stops_exclude_inner if not stop in all_secrets and not stop == exclude]
-        # choose a random one
-        chosen_stop = choice(available)
-        # assign to the team
-        team.addSecret(chosen_stop)
-        # return a copy
-        return chosen_stop
+        with self.transaction():
+            all_secrets = []
+            for other_team in self.all_teams:
+                all_secrets.extend(other_team.retained_secrets)
+            # get available stops
+            available = [
+                stop for stop in zone.stops_exclude_inner if not stop in all_secrets and not stop == exclude]
+            # choose a random one
+            chosen_stop = choice(available)
+            # assign to the team
+            team.addSecret(chosen_stop)
+            # return a copy
+            return chosen_stop
 
     def dealAllSecrets(self) -> None:
-        from .zone import Zone
-        # deal secrets in first 3 zones
-        for team in self.all_teams:
-            team.clearSecrets()
-            for zone_number in range(1, 4):
-                self.dealSecret(team, Zone(zone_number, self))
+        with self.transaction():
+            # deal secrets in first 3 zones
+            for team in self.all_teams:
+                team.clearSecrets()
+                for zone_number in range(1, 4):
+                    self.dealSecret(team, self.getZoneFromNumber(zone_number))
 
     def doMulligan(self) -> None:
-        # so redo all of them that have been selected
-        for team in self.all_teams:
-            for mulliganed_secret in team.mulliganed_secrets:
-                # remove the original secret
-                team.removeSecret(mulliganed_secret)
-                # redeal but it MUST be different
-                self.dealSecret(
-                    team, mulliganed_secret.inner_zone, mulliganed_secret)
+        with self.transaction():
+            # so redo all of them that have been selected
+            for team in self.all_teams:
+                for mulliganed_secret in team.mulliganed_secrets:
+                    # remove the original secret
+                    team.removeSecret(mulliganed_secret)
+                    # redeal but it MUST be different
+                    self.dealSecret(
+                        team, mulliganed_secret.inner_zone, mulliganed_secret)
 
     def assignRewards(self) -> None:
-        # choose ALL THE STOPS according to data
-        for stop in self.all_stops:
-            stop.clearRewards()
-        placements = getRewardPlacementData()
-
-        def process(type: str, parts: list, count: int = -1):
-            # choose a random selection, if required
-            chosen_parts = sample(parts, count) if type == "choice" else parts
-            for part in chosen_parts:
-                if isinstance(part, str):
-                    self.getStopFromCode(part).addReward()
-                elif part["type"] == "special":
-                    #assign special
-                    self.getStopFromCode(part["stop"]).addSpecial(part["code"])
-                else:
-                    # recursion time!!
-                    process(part["type"], part["parts"],
-                            part["count"] if "count" in part else -1)
-        # use recursive function to process placements
-        process("all", placements)
+        with self.transaction():
+            # choose ALL THE STOPS according to data
+            for stop in self.all_stops:
+                stop.clearRewards()
+            placements = getRewardPlacementData()
+
+            def process(type: str, parts: list, count: int = -1):
+                # choose a random selection, if required
+                chosen_parts = sample(parts, count) if type == "choice" else parts
+                for part in chosen_parts:
+                    if isinstance(part, str):
+                        self.getStopFromCode(part).addReward()
+                    elif part["type"] == "special":
+                        #assign special
+                        self.getStopFromCode(part["stop"]).addSpecial(part["code"])
+                    else:
+                        # recursion time!!
+                        process(part["type"], part["parts"],
+                                part["count"] if "count" in part else -1)
+            # use recursive function to process placements
+            process("all", placements)
 
     def __eq__(self, value: object) -> bool:
         try:
@@ -234,6 +309,9 @@ class Game:
         except:
             return False
 
+    def __hash__(self) -> int:
+        return hash(self._id)
+
 
 def randomGameID() -> str:
     # generate random 4-letter code in all caps
@@ -242,21 +320,23 @@ def randomGameID() -> str:
 
 def searchStop(search_term: str) -> Stop | None:
     from .stop import Stop
-    # filter search term for just letters and spaces
-    search_term_clean = clean(search_term)
-    # convert to code
-    try:
-        stop_code = getSearchDict()[search_term_clean]
-    except:
+    from .search import getSearchIndex
+    # exact names and nicknames, or whatever it was obviously meant to be
+    stop_code = getSearchIndex().best(search_term)
+    if not stop_code:
         # does not correlate to a stop
         return None
-    # check stop exists in this gam
-    if not stop_code in getAllStopCodes():
-        return None
     # return stop object
     return Stop(stop_code)
 
 
+def searchStops(search_term: str, limit: int | None = None, codes: Iterable[str] | None = None) -> list[Stop]:
+    from .stop import Stop
+    from .search import getSearchIndex, MAX_RESULTS
+    # best matches first, only out of the given stops if there are any
+    return [Stop(code) for code in getSearchIndex().search(search_term, limit or MAX_RESULTS, codes)]
+
+
 def getAllStops() -> list[Stop]:
     from .stop import Stop
     return [Stop(code) for code in getAllStopCodes()]
@@ -1,5 +1,7 @@
 from __future__ import annotations
 from .data import getStaticLineData, getColour
+from .topology import getStopCodesOnLine
+from .claims import findClaim, SECTION_LINE
 from PIL.Image import Image
 from typing import TYPE_CHECKING
 if TYPE_CHECKING:
@@ -24,6 +26,8 @@ LINE_ORDER = {
 
 class Line:
 
+    __slots__ = ("_colour", "_game")
+
     def __init__(self, colour: str, game: Game | None = None) -> None:
         # set colour
         self._colour: str = colour
@@ -38,21 +42,24 @@ class Line:
     def colour(self) -> str:
         return self._colour
 
+    @property
+    def stops(self) -> list[Stop]:
+        from .stop import Stop
+        # every stop on the line, in map order
+        return [self._game.getStopFromCode(code) if self._game else Stop(code) for code in getStopCodesOnLine(self._colour)]
+
     @property
     def claimed(self) -> bool:
-        return any(stop.locked_line == self for stop in self._game.all_stops)
+        return len(self._game.snapshot().locked_stops(self)) > 0
 
     @property
     def owner(self) -> Team | None:
-        # find one claimed stop
-        stop = next(
-            (stop for stop in self._game.all_stops if stop.locked_line == self), None)
-        # use the owner of that stop
-        return stop.owner if stop else None
+        # use the owner of its locked stops
+        return self._game.snapshot().line_owner(self)
 
     @property
     def locked_stops(self) -> list[Stop]:
-        return [stop for stop in self._game.all_stops if stop.locked_line == self]
+        return self._game.snapshot().locked_stops(self)
 
     @property
     def rgb_colour(self) -> tuple[int, int, int]:
@@ -67,24 +74,38 @@ class Line:
         return getStaticLineData(self._colour)["emoji"]
 
     def is_claimable(self, team: Team) -> bool:
-        # check which stops fit in which zones (consider special ability)
-        return not self.claimed and enoughZonesCovered(team.free_stops_on_line(self), self.colour == "orange" and team.can_claim_orange)
+        from .matrix import getStateMatrix
+        matrix = getStateMatrix(self._game)
+        if matrix:
+            return matrix.claimable(team, self)
+        return not self.claimed and self.best_claim(team) is not None
+
+    def by_section(self, team: Team) -> bool:
+        # the special ability lets this line be claimed by section instead of zone
+        return self._colour == SECTION_LINE and team.can_claim_orange
+
+    def best_claim(self, team: Team) -> list[Stop] | None:
+        # fewest of this team's free stops that would claim this line
+        codes = findClaim(frozenset(stop.code for stop in team.free_stops_on_line(self)), self.by_section(team), self._colour)
+        return [self._game.getStopFromCode(code) for code in codes] if codes is not None else None
 
     def is_valid_claim(self, stops: list[Stop]):
         # check which zones are covered (consider special ability)
-        return enoughZonesCovered(stops,  self.colour == "orange" and stops[0].owner.can_claim_orange)
+        return enoughZonesCovered(stops, self.by_section(stops[0].owner), self._colour)
 
     def claim(self, stops: list[Stop]) -> None:
-        # lock all the stops into this line
-        for stop in stops:
-            stop.lock(self)
-        # check if game over
-        self._game.game_over
+        with self._game.transaction():
+            # lock all the stops into this line
+            for stop in stops:
+                stop.lock(self)
+            # check if game over
+            self._game.game_over
 
     def unlock(self) -> None:
-        # unlock all the stops
-        for stop in self.locked_stops:
-            stop.unlock()
+        with self._game.transaction():
+            # unlock all the stops
+            for stop in self.locked_stops:
+                stop.unlock()
 
     def image(self, observer: Team | None = None) -> Image:
         from .card_images import drawCollection, CollectionStyle
@@ -95,7 +116,10 @@ class Line:
             return False
         else:
             return self._colour == value._colour
-        
+
+    def __hash__(self) -> int:
+        return hash(self._colour)
+
     def __lt__(self, other: object) -> bool:
         if not other or not isinstance(other, Line):
             return True
@@ -103,34 +127,6 @@ class Line:
             return LINE_ORDER[self.colour] < LINE_ORDER[other.colour]
 
 
-def enoughZonesCovered(stops: list[Stop], use_sections=False) -> bool:
-    # start by ticking off the single-zone stops
-    covered_zones = []
-    available_multis = [0]*5
-    for stop in stops:
-        zone_string = str(stop.inner_zone.number) + \
-            (stop.parent.code if use_sections else "")
-        # tick off a zone if it's not on a border
-        if not stop.on_zone_border and not zone_string in covered_zones:
-            covered_zones.append(zone_string)
-        # keep track of how many border stops are available to use
-        elif stop.on_zone_border:
-            available_multis[stop.inner_zone.number] += 1
-    # check in case no multis are needed
-    if len(covered_zones) >= 3:
-        return True
-    # use cornbrook as only way to decide for sections
-    elif use_sections and "2PIC" in covered_zones and any(stop.code == "CNK" for stop in stops):
-        return True
-    # TODO: make this work for any case not just orange
-    # try and use multis now (only on uncovered zones)
-    for zone_number in [zone_number for zone_number in range(1, 5) if not zone_number in covered_zones]:
-        # try use inner zone
-        if available_multis[zone_number-1] > 0:
-            available_multis[zone_number-1] -= 1
-            covered_zones.append(zone_number)
-        # try use outer zone
-        elif available_multis[zone_number] > 0:
-            available_multis[zone_number] -= 1
-            covered_zones.append(zone_number)
-    return len(covered_zones) >= 3
+def enoughZonesCovered(stops: list[Stop], use_sections=False, colour: str | None = None) -> bool:
+    # can these stops be shared out between enough different zones (or sections)
+    return findClaim(frozenset(stop.code for stop in stops), use_sections, colour) is not None
@@ -0,0 +1,296 @@
+from __future__ import annotations
+from asyncio import Lock, Task, current_task, to_thread
+from contextlib import contextmanager
+from threading import RLock
+from pathlib import Path
+from typing import Any, Iterator
+from .backends import LiveBackend, SECTIONS
+from .deck import DeckIndex
+from .instrumentation import instrumented
+try:
+    from fcntl import flock, LOCK_EX, LOCK_UN
+except ImportError:
+    # file locks are only available on unix
+    flock = None
+
+
+class LiveState:
+
+    def __init__(self, game_id: str, backend: LiveBackend, process_lock: bool = False) -> None:
+        # game these live files belong to
+        self._game_id: str = game_id
+        # where the live files are actually stored
+        self._backend: LiveBackend = backend
+        # parsed live files, loaded on first use
+        self._sections: dict[str, dict[str, Any]] = {}
+        # what each section looked like in storage when it was loaded
+        self._versions: dict[str, Any] = {}
+        # keys changed in each section since the last flush (None if replaced entirely)
+        self._dirty: dict[str, set[str] | None] = {}
+        # piles of each zone's cards, kept up to date as the deck changes
+        self._deck_index: DeckIndex | None = None
+        # how many transactions are currently open
+        self._depth: int = 0
+        # goes up every time anything changes (used to tell if cached views are stale)
+        self._revision: int = 0
+        # only one thread may change this game at a time
+        self._thread_lock: RLock = RLock()
+        # other processes using the same storage (optional)
+        self._process_lock: ProcessLock | None = ProcessLock(backend.lockPath(game_id)) if process_lock else None
+        # shared lock for threads and coroutines
+        self._lock: GameLock = GameLock(self)
+
+    @property
+    def backend(self) -> LiveBackend:
+        return self._backend
+
+    @property
+    def lock(self) -> GameLock:
+        return self._lock
+
+    @property
+    def revision(self) -> int:
+        return self._revision
+
+    @property
+    def in_transaction(self) -> bool:
+        return self._depth > 0
+
+    @property
+    def dirty(self) -> set[str]:
+        return set(self._dirty)
+
+    @instrumented("live", "read", 1)
+    def get(self, section: str) -> dict[str, Any]:
+        # only ever read each file once
+        if section not in self._sections:
+            self._versions[section] = self._backend.version(self._game_id, section)
+            self._sections[section] = self._backend.load(self._game_id, section)
+        return self._sections[section]
+
+    def loaded(self, section: str) -> bool:
+        return section in self._sections
+
+    @instrumented("live", "write", 1)
+    def set(self, section: str, key: str, data: Any) -> None:
+        with self.transaction():
+            # change a single entry in this section
+            self.get(section)[key] = data
+            if section not in self._dirty:
+                self._dirty[section] = set()
+            if self._dirty[section] is not None:
+                self._dirty[section].add(key)
+            # move the card between piles rather than sorting the whole deck again
+            if section == "deck" and self._deck_index is not None and self._deck_index.source is self._sections[section]:
+                self._deck_index.update(key, data)
+            self._revision += 1
+
+    @instrumented("live", "write", 1)
+    def replace(self, section: str, data: dict[str, Any]) -> None:
+        with self.transaction():
+            # swap out the entire section
+            self._sections[section] = data
+            self._dirty[section] = None
+            self._revision += 1
+
+    def flush(self) -> None:
+        if not self._dirty:
+            return
+        with self._thread_lock:
+            # write each changed section exactly once
+            self._backend.save(self._game_id, {
+                section: (self._sections[section], self._dirty[section])
+                for section in SECTIONS if section in self._dirty
+            })
+            # remember our own writes so they don't look like someone else's
+            for section in self._dirty:
+                self._versions[section] = self._backend.version(self._game_id, section)
+            self._dirty.clear()
+
+    def reload(self) -> None:
+        with self._thread_lock:
+            # throw away anything unsaved and read from storage again next time
+            self._sections.clear()
+            self._versions.clear()
+            self._dirty.clear()
+            self._revision += 1
+
+    def discard(self) -> None:
+        with self._thread_lock:
+            # throw away unsaved changes (the sections are read from storage again next time)
+            for section in self._dirty:
+                self._sections.pop(section, None)
+                self._versions.pop(section, None)
+            self._dirty.clear()
+            self._revision += 1
+
+    def refresh(self) -> None:
+        # forget any section another process has changed since we loaded it
+        for section in list(self._sections):
+            if section in self._dirty:
+                continue
+            version = self._backend.version(self._game_id, section)
+            if version is None or version != self._versions.get(section):
+                del self._sections[section]
+                self._revision += 1
+
+    def acquire(self) -> None:
+        self._thread_lock.acquire()
+        self._depth += 1
+        # the first entry also has to wait for other processes
+        if self._depth == 1 and self._process_lock:
+            try:
+                self._process_lock.acquire()
+                self.refresh()
+            except:
+                self._depth -= 1
+                self._thread_lock.release()
+                raise
+
+    def release(self, failed: bool = False) -> None:
+        try:
+            # only the outermost transaction saves (and never anything left half done)
+            if self._depth == 1:
+                if failed:
+                    self.discard()
+                else:
+                    self.flush()
+        finally:
+            self._depth -= 1
+            if self._depth == 0 and self._process_lock:
+                self._process_lock.release()
+            self._thread_lock.release()
+
+    @contextmanager
+    def reading(self) -> Iterator[LiveState]:
+        # keep other threads out without starting a transaction
+        with self._thread_lock:
+            yield self
+
+    @contextmanager
+    def transaction(self) -> Iterator[LiveState]:
+        self.acquire()
+        try:
+            yield self
+        except BaseException:
+            self.release(True)
+            raise
+        self.release()
+
+    async def waitForProcesses(self) -> bool:
+        # hold the process lock from a worker thread so the event loop isn't stuck waiting for it
+        if not self._process_lock:
+            return False
+        await to_thread(self._process_lock.acquire)
+        return True
+
+    def releaseProcesses(self) -> None:
+        self._process_lock.release()
+
+    def stopCodesByOwner(self, team_id: str, locked: bool | None = None) -> list[str]:
+        # the backend index is only up to date once everything is saved
+        if self._backend.indexed and "stops" not in self._dirty:
+            return self._backend.selectStopCodesByOwner(self._game_id, team_id, locked)
+        return [code for code, data in self.get("stops").items()
+                if data.get("owner") == team_id and data.get("claimed", False)
+                and (locked is None or data.get("locked", False) == locked)]
+
+    def deckIndex(self) -> DeckIndex:
+        # sorted into piles once per load of the deck (or if it's been replaced since)
+        deck = self.get("deck")
+        if self._deck_index is None or self._deck_index.source is not deck:
+            self._deck_index = DeckIndex(deck)
+        return self._deck_index
+
+    def undealtDeckIDs(self, zone_number: int) -> list[str]:
+        # no need to load the whole deck just to look if the backend can do it
+        if self._backend.indexed and not self.loaded("deck"):
+            return self._backend.selectUndealtDeckIDs(self._game_id, zone_number)
+        index = self.deckIndex()
+        return index.ordered(index.zone(zone_number).undealt)
+
+
+class GameLock:
+
+    def __init__(self, state: LiveState) -> None:
+        self._state: LiveState = state
+        # created on first use so it belongs to the running event loop
+        self._async_lock: Lock | None = None
+        # the task holding this (so it can take it again), how many times it has, and whether it holds the process lock
+        self._owner: Task | None = None
+        self._async_depth: int = 0
+        self._waited: bool = False
+
+    # threads: hold the game while doing several things (as one transaction)
+    def __enter__(self) -> GameLock:
+        self._state.acquire()
+        return self
+
+    def __exit__(self, exc_type, *args) -> None:
+        self._state.release(exc_type is not None)
+
+    # coroutines: queue up behind other tasks without blocking the event loop
+    # (nothing is held across awaits other than this, so make changes in a "with" block without awaiting inside it)
+    async def __aenter__(self) -> GameLock:
+        task = current_task()
+        if self._owner is not task:
+            if self._async_lock is None:
+                self._async_lock = Lock()
+            await self._async_lock.acquire()
+            try:
+                # other processes are waited for off the loop, so the transaction inside doesn't have to
+                self._waited = await self._state.waitForProcesses()
+            except:
+                self._async_lock.release()
+                raise
+            self._owner = task
+        self._async_depth += 1
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        self._async_depth -= 1
+        if self._async_depth > 0:
+            return
+        self._owner = None
+        try:
+            if self._waited:
+                self._state.releaseProcesses()
+        finally:
+            self._waited = False
+            self._async_lock.release()
+
+
+class ProcessLock:
+
+    def __init__(self, path: Path) -> None:
+        if flock is None:
+            raise RuntimeError("Cross-process locking needs fcntl, which is not available here.")
+        self._path: Path = path
+        self._file = None
+        # everything in this process shares the one lock on the file
+        self._count: int = 0
+        self._guard: RLock = RLock()
+
+    def acquire(self) -> None:
+        with self._guard:
+            if self._count == 0:
+                self._file = open(self._path, 'a')
+                try:
+                    flock(self._file.fileno(), LOCK_EX)
+                except:
+                    self._file.close()
+                    self._file = None
+                    raise
+            self._count += 1
+
+    def release(self) -> None:
+        with self._guard:
+            self._count -= 1
+            if self._count > 0:
+                return
+            # closing the file also drops the lock
+            try:
+                flock(self._file.fileno(), LOCK_UN)
+            finally:
+                self._file.close()
+                self._file = None
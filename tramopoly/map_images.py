@@ -3,9 +3,10 @@ from .data import LIBRARY, LIVE, STATIC, IMAGES, ICONS
 from pathlib import Path
 from PIL import Image, ImageDraw, ImageFont
 from PIL.Image import Resampling
-from .card_images import IconType, WHITE, SLIGHT_GRAY
-from .data import getColour, getMapData, getIconData, getTeamColour, loadIcon
-from typing import TYPE_CHECKING
+from .card_images import IconType, ImageCache, ASSETS, WHITE, SLIGHT_GRAY
+from os import environ
+from .data import getColour, getMapData, getIconData, getTeamColour
+from typing import Callable, TYPE_CHECKING
 if TYPE_CHECKING:
     from .stop import Stop
     from .team import Team
@@ -19,50 +20,97 @@ BORDER_WIDTH = int(CIRCLE_RADIUS/7)
 ICON_SIZE = int(1.2*CIRCLE_RADIUS)
 DARKNESS_FACTOR = 0.8
 MAP = Image.open(LIBRARY / STATIC / IMAGES / "map.png")
+# room around the centre of each marker for the secret outline
+SPRITE_RADIUS = int(1.3*CIRCLE_RADIUS) + 1
 
-def drawMap(game: Game | None = None, observer: Team | None = None) -> Image.Image:
-    from .game import getAllStops
-    # load in base image
-    map = MAP.copy()
-    # resize to set height
-    map = map.resize((WIDTH, HEIGHT))
+# the map resized once, on first use
+_BASE_MAP: Image.Image | None = None
+# every distinct stop marker, drawn once each
+_SPRITES: dict[tuple[IconType, tuple[int, int, int], bool], Image.Image] = {}
+# finished maps for each game and observer (around 19MB each), budget in megabytes
+MAP_CACHE = ImageCache(int(environ.get("TRAMOPOLY_MAP_CACHE_MB", 96)) * 1024 * 1024)
+
+
+def getBaseMap() -> Image.Image:
+    global _BASE_MAP
+    # resize to set height (only ever once)
+    if _BASE_MAP is None:
+        _BASE_MAP = MAP.resize((WIDTH, HEIGHT))
+    return _BASE_MAP
+
+
+def getMarkerCenters() -> dict[str, tuple[int, int]]:
     # load in map data
     map_data = getMapData()
     # save original width and height
     o_width, o_height = map_data["map_size"][0], map_data["map_size"][1]
-    # now draw on every stop
+    # scale every stop placement to the resized map
+    return {code: (round(WIDTH * float(coordinates[0]) / float(o_width)),
+                   round(HEIGHT * float(coordinates[1]) / float(o_height)))
+            for code, coordinates in map_data["stop_placements"].items()}
+
+
+def drawMap(game: Game | None = None, observer: Team | None = None) -> Image.Image:
+    return prepareMap(game, observer)()
+
+
+def prepareMap(game: Game | None = None, observer: Team | None = None) -> Callable[[], Image.Image]:
+    from .game import getAllStops
+    # work out what every marker should look like
     stops = game.all_stops if game else getAllStops()
-    draw = ImageDraw.Draw(map, "RGBA")
-    for stop in stops:
-        # get coordinates
-        addStop(draw, stop, (map_data["stop_placements"][stop.code][0],
-                map_data["stop_placements"][stop.code][1]), (o_width, o_height), observer)
+    # look up the observer's secrets once rather than per stop
+    secrets = set(observer.secrets) if observer else set()
+    markers = tuple((stop.code,) + getMarkerState(stop, observer, secrets) for stop in stops)
+    # only redraw if one of the markers has changed since last time
+    key = (game.id if game else None, observer.id if observer else None)
+    # the drawing itself can happen later (in any thread)
+    return lambda: MAP_CACHE.get(key, lambda: renderMap(markers), markers)
+
+
+def renderMap(markers: tuple[tuple[str, IconType, tuple[int, int, int], bool], ...]) -> Image.Image:
+    # start from the resized map
+    map = getBaseMap().copy()
+    centers = getMarkerCenters()
+    # now stamp on every stop
+    for code, icon_type, colour, secret in markers:
+        sprite = getMarkerSprite(icon_type, colour, secret)
+        center = centers[code]
+        map.paste(sprite, (center[0] - SPRITE_RADIUS, center[1] - SPRITE_RADIUS), sprite)
     # return completed image
     return map
 
 
-def addStop(draw: ImageDraw.ImageDraw, stop: Stop, coordinates: tuple[int, int], o_size: tuple[int, int], observer: Team | None = None):
-    secret = observer and stop in observer.secrets
+def getMarkerState(stop: Stop, observer: Team | None = None, secrets: set[Stop] | None = None) -> tuple[IconType, tuple[int, int, int], bool]:
+    secret = stop in secrets if secrets is not None else bool(observer) and stop in observer.secrets
     # determine icon
     icon_type = stop.map_icon(observer)
-    # find center of main circle
-    center = (WIDTH * float(coordinates[0]) / float(o_size[0]),
-              HEIGHT * float(coordinates[1]) / float(o_size[1]))
-    # secret must always be shown
-    if secret and not icon_type == IconType.SECRET:
-        # add outline instead if no icon used
-        secret_data = getIconData(str(IconType.SECRET.value))
-        draw.circle(center, int(1.3*CIRCLE_RADIUS),
-                    getColour(secret_data["colour"]))
-    # load in icon and default colour
+    # load in default colour
     colour = WHITE
     if icon_type != IconType.NONE:
-        icon_data = getIconData(str(icon_type.value))
-        icon = loadIcon(icon_data["icon"][0]).resize((ICON_SIZE, ICON_SIZE))
-        colour = getColour(icon_data["colour"])
+        colour = getColour(getIconData(str(icon_type.value))["colour"])
     # use team colour if claimed in any way
     if icon_type in [IconType.CLAIMED_YOU, IconType.CLAIMED_OTHER, IconType.LOCKED_YOU, IconType.LOCKED_OTHER]:
         colour = getColour(getTeamColour(stop.owner.colour))
+    # secret must always be shown (outline instead if no icon used)
+    return (icon_type, colour, secret and not icon_type == IconType.SECRET)
+
+
+def getMarkerSprite(icon_type: IconType, colour: tuple[int, int, int], outline: bool) -> Image.Image:
+    key = (icon_type, colour, outline)
+    if key not in _SPRITES:
+        _SPRITES[key] = renderMarker(icon_type, colour, outline)
+    return _SPRITES[key]
+
+
+def renderMarker(icon_type: IconType, colour: tuple[int, int, int], outline: bool) -> Image.Image:
+    sprite = Image.new("RGBA", (SPRITE_RADIUS*2 + 1, SPRITE_RADIUS*2 + 1), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(sprite, "RGBA")
+    center = (SPRITE_RADIUS, SPRITE_RADIUS)
+    # add outline for secrets
+    if outline:
+        secret_data = getIconData(str(IconType.SECRET.value))
+        draw.circle(center, int(1.3*CIRCLE_RADIUS),
+                    getColour(secret_data["colour"]))
     # draw main circle
     draw.circle(center, CIRCLE_RADIUS, WHITE)
     # draw inner circle
@@ -70,11 +118,14 @@ def addStop(draw: ImageDraw.ImageDraw, stop: Stop, coordinates: tuple[int, int],
                 darken(colour), BORDER_WIDTH)
     # choose icon and COLOUR ICON to the required team colour
     if icon_type != IconType.NONE:
+        icon_data = getIconData(str(icon_type.value))
+        icon = ASSETS.icon(icon_data["icon"][0], ICON_SIZE)
         icon_white = Image.new("RGB", (ICON_SIZE, ICON_SIZE), WHITE)
-        draw._image.paste(icon_white, (
+        sprite.paste(icon_white, (
             int(center[0] - 0.5*ICON_SIZE),
             int(center[1] - 0.5*ICON_SIZE)
         ), icon)
+    return sprite
 
 
 def darken(colour: tuple[int, int, int]) -> tuple[int, int, int]:
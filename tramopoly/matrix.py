@@ -0,0 +1,184 @@
+from __future__ import annotations
+from os import environ
+from .data import getStaticData, getAllStopCodes, getAllLineColours, getAllZoneNumbers
+from .topology import getTopology
+from .snapshot import LINES_TO_WIN
+from .claims import findClaim, getClaimUnits, ZONES_TO_CLAIM, SECTION_LINE, SECTION_ABILITY
+from typing import Any, Mapping, TYPE_CHECKING
+try:
+    import numpy as np
+except ImportError:
+    # everything falls back to working it out stop by stop
+    np = None
+if TYPE_CHECKING:
+    from .game import Game
+    from .snapshot import GameSnapshot
+    from .team import Team
+    from .line import Line
+
+# can be switched off to compare against the plain version
+ENABLED = np is not None and environ.get("TRAMOPOLY_NUMPY", "1") not in ("", "0")
+
+# built from the static files on first use
+_STATIC: StaticMatrix | None = None
+# latest matrix of each game, reused until something changes
+_MATRICES: dict[str, StateMatrix] = {}
+
+
+class StaticMatrix:
+
+    def __init__(self, stops: Mapping[str, Any]) -> None:
+        # remember what this was built from so it can tell when the static data is reloaded
+        self._source: Mapping[str, Any] = stops
+        topology = getTopology()
+        self._codes: list[str] = getAllStopCodes()
+        self._colours: list[str] = getAllLineColours()
+        self._stop_index: dict[str, int] = {code: i for i, code in enumerate(self._codes)}
+        self._line_index: dict[str, int] = {colour: i for i, colour in enumerate(self._colours)}
+        # (line, stop) membership
+        self._on_line = np.zeros((len(self._colours), len(self._codes)), dtype=bool)
+        for colour, codes in topology.stops_by_line.items():
+            if colour in self._line_index:
+                self._on_line[self._line_index[colour], [self._stop_index[code] for code in codes]] = True
+        # (stop, zone) of what each stop can count as in claims.py, kept apart for stops that could be either of two
+        zones = {str(number): i for i, number in enumerate(sorted(getAllZoneNumbers()))}
+        self._single_zones = np.zeros((len(self._codes), len(zones)), dtype=np.int64)
+        self._border_zones = np.zeros((len(self._codes), len(zones)), dtype=np.int64)
+        for i, code in enumerate(self._codes):
+            units, _ = getClaimUnits(code)
+            if len(units) == 1:
+                self._single_zones[i, zones[units[0]]] = 1
+            else:
+                # a border stop, marked against the inner of its two zones
+                self._border_zones[i, zones[units[0]]] = 1
+
+    @property
+    def source(self) -> Mapping[str, Any]:
+        return self._source
+
+    @property
+    def codes(self) -> list[str]:
+        return self._codes
+
+    @property
+    def colours(self) -> list[str]:
+        return self._colours
+
+    @property
+    def stop_index(self) -> dict[str, int]:
+        return self._stop_index
+
+    @property
+    def line_index(self) -> dict[str, int]:
+        return self._line_index
+
+    @property
+    def on_line(self) -> np.ndarray:
+        return self._on_line
+
+    def coveredZones(self, free: np.ndarray) -> np.ndarray:
+        # free is (team, line, stop), answer is (team, line) - the most different zones the stops can cover
+        covered = np.einsum("tls,sz->tlz", free, self._single_zones) > 0
+        borders = np.einsum("tls,sz->tlz", free, self._border_zones)
+        # going out through the zones, fill each gap with a border stop that can't be used any further out first
+        # (the same answer as the matching in claims.py, as each border stop only joins neighbouring zones)
+        for zone in range(covered.shape[2]):
+            needed = ~covered[:, :, zone]
+            inner = needed & (borders[:, :, zone-1] > 0) if zone > 0 else np.zeros_like(needed)
+            outer = needed & ~inner & (borders[:, :, zone] > 0)
+            if zone > 0:
+                borders[:, :, zone-1] -= inner
+            borders[:, :, zone] -= outer
+            covered[:, :, zone] |= inner | outer
+        return covered.sum(axis=2)
+
+
+class StateMatrix:
+
+    def __init__(self, snapshot: GameSnapshot) -> None:
+        static = getStaticMatrix()
+        self._revision: int = snapshot.revision
+        self._team_ids: list[str] = list(snapshot.team_data)
+        self._team_index: dict[str, int] = {id: i for i, id in enumerate(self._team_ids)}
+        stops = len(static.codes)
+        # who owns each stop (-1 for nobody), and which line it's locked into (-1 for none)
+        owner = np.full(stops, -1)
+        claimed_owner = np.full(stops, -1)
+        locked_line = np.full(stops, -1)
+        stop_locked = np.zeros(stops, dtype=bool)
+        for code, data in snapshot.stop_data.items():
+            if code not in static.stop_index:
+                continue
+            i = static.stop_index[code]
+            if data.get("owner") in self._team_index:
+                owner[i] = self._team_index[data["owner"]]
+                if data.get("claimed", False):
+                    claimed_owner[i] = owner[i]
+            stop_locked[i] = data.get("locked", False)
+            if data.get("locked_line") in static.line_index:
+                locked_line[i] = static.line_index[data["locked_line"]]
+        teams = np.arange(len(self._team_ids))
+        # lines belong to whoever owns the first of their locked stops
+        locked = locked_line[None, :] == np.arange(len(static.colours))[:, None]
+        first = locked.argmax(axis=1)
+        line_owners = np.where(locked.any(axis=1), owner[first], -1)
+        # (team, line, stop) of stops each team could use towards each line
+        free = (claimed_owner[None, None, :] == teams[:, None, None]) & ~stop_locked[None, None, :] \
+            & static.on_line[None, :, :]
+        # every team and line at once by zone
+        claimable = static.coveredZones(free) >= ZONES_TO_CLAIM
+        # the special ability lets some teams claim the orange line by section instead, which is left to claims.py
+        if SECTION_LINE in static.line_index:
+            line = static.line_index[SECTION_LINE]
+            for i, id in enumerate(self._team_ids):
+                if SECTION_ABILITY in snapshot.team_data[id].get("special_abilities", ()):
+                    codes = frozenset(static.codes[stop] for stop in np.flatnonzero(free[i, line]))
+                    claimable[i, line] = findClaim(codes, True, SECTION_LINE) is not None
+        self._claimable = claimable & ~locked.any(axis=1)[None, :]
+        # won with every secret and enough lines
+        lines_owned = (line_owners[None, :] == teams[:, None]).sum(axis=1)
+        secrets_owned = np.array([
+            all(code in static.stop_index and owner[static.stop_index[code]] == i
+                for code in (secret["code"] for secret in snapshot.team_data[id].get("secrets", ())))
+            for i, id in enumerate(self._team_ids)], dtype=bool)
+        self._won = secrets_owned & (lines_owned >= LINES_TO_WIN)
+
+    @property
+    def revision(self) -> int:
+        return self._revision
+
+    def claimable(self, team: Team, line: Line) -> bool:
+        return bool(self._claimable[self._team_index[team.id], getStaticMatrix().line_index[line.colour]])
+
+    def claimable_colours(self, team: Team) -> list[str]:
+        row = self._claimable[self._team_index[team.id]]
+        return [colour for colour, claimable in zip(getStaticMatrix().colours, row) if claimable]
+
+    def has_won(self, team: Team) -> bool:
+        return bool(self._won[self._team_index[team.id]])
+
+
+def getStaticMatrix() -> StaticMatrix:
+    global _STATIC
+    # rebuild if the static data has been reloaded since
+    stops = getStaticData("stops")
+    if _STATIC is None or _STATIC.source is not stops:
+        _STATIC = StaticMatrix(stops)
+    return _STATIC
+
+
+def getStateMatrix(game: Game) -> StateMatrix | None:
+    # nothing to use without numpy
+    if not ENABLED:
+        return None
+    # only rebuild if the game has changed since last time
+    snapshot = game.snapshot()
+    matrix = _MATRICES.get(game.id)
+    if matrix is None or matrix.revision != snapshot.revision:
+        matrix = StateMatrix(snapshot)
+        _MATRICES[game.id] = matrix
+    return matrix
+
+
+def forgetStateMatrix(game_id: str) -> None:
+    _MATRICES.pop(game_id, None)
@@ -0,0 +1,12 @@
+from __future__ import annotations
+from argparse import ArgumentParser
+from pathlib import Path
+from .backends import migrateJSONToSQLite
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Convert tramopoly live games from json to sqlite.")
+    parser.add_argument("directories", nargs="+", type=Path, help="live/<id>/data folders to convert")
+    arguments = parser.parse_args()
+    for directory in arguments.directories:
+        print(f"Migrated {directory} to {migrateJSONToSQLite(directory)}")
@@ -0,0 +1,87 @@
+from __future__ import annotations
+from concurrent.futures import Future, ProcessPoolExecutor
+from os import environ
+from PIL import Image
+from .card_images import CARD_CACHE, CollectionStyle, getCardKey, renderCard, composeCollection, composeLineCollection
+from typing import Callable, TYPE_CHECKING
+if TYPE_CHECKING:
+    from .card import Card
+    from .line import Line
+    from .team import Team
+
+# processes used to draw cards (none unless asked for, everything is drawn in this process instead)
+WORKERS = int(environ.get("TRAMOPOLY_RENDER_WORKERS", 0))
+
+# started on first use
+_POOL: ProcessPoolExecutor | None = None
+
+
+def getRenderPool() -> ProcessPoolExecutor | None:
+    global _POOL
+    if _POOL is None and WORKERS > 0:
+        _POOL = ProcessPoolExecutor(WORKERS)
+    return _POOL
+
+
+def startRenderPool() -> None:
+    # get the worker processes going now (best before any other threads start)
+    pool = getRenderPool()
+    if pool:
+        pool.submit(int).result()
+
+
+def stopRenderPool() -> None:
+    global _POOL
+    if _POOL:
+        _POOL.shutdown()
+        _POOL = None
+
+
+def submitCards(keys: list[tuple]) -> list[Image.Image | Future]:
+    # reuse anything already drawn, and send the rest off to be drawn in parallel
+    pool = getRenderPool()
+    results: list[Image.Image | Future] = []
+    pending: dict[tuple, Future] = {}
+    for key in keys:
+        image = CARD_CACHE.lookup(key)
+        if image is not None:
+            results.append(image)
+        elif not pool:
+            results.append(CARD_CACHE.get(key, lambda: renderCard(key)))
+        else:
+            # the same card twice only needs drawing once
+            if key not in pending:
+                pending[key] = pool.submit(renderCard, key)
+                pending[key].add_done_callback(lambda future, key=key: cacheCard(key, future))
+            results.append(pending[key])
+    return results
+
+
+def cacheCard(key: tuple, future: Future) -> None:
+    if not future.cancelled() and future.exception() is None:
+        CARD_CACHE.put(key, future.result())
+
+
+def renderCards(keys: list[tuple]) -> list[Image.Image]:
+    # wait for every card
+    return [result.result().copy() if isinstance(result, Future) else result
+            for result in submitCards(keys)]
+
+
+def prepareCollection(cards: list[Card], style: CollectionStyle, observer: Team | None = None) -> Callable[[], Image.Image]:
+    # work out what each card looks like now, the drawing can happen later (in any thread)
+    keys = [getCardKey(card, observer) for card in cards]
+    return lambda: composeCollection(renderCards(keys), style)
+
+
+def prepareLineCollection(lines: list[Line], observer: Team | None = None) -> Callable[[], Image.Image]:
+    columns = [[getCardKey(stop, observer) for stop in sorted(line.locked_stops)] for line in lines]
+    return lambda: composeLineColumns(columns)
+
+
+def composeLineColumns(columns: list[list[tuple]]) -> Image.Image:
+    # draw every stop from every line together
+    images = iter(renderCards([key for column in columns for key in column]))
+    if len(columns) == 1:
+        return composeCollection([next(images) for _ in columns[0]], CollectionStyle.STACKED)
+    return composeLineCollection([[next(images) for _ in column] for column in columns])
@@ -0,0 +1,174 @@
+from __future__ import annotations
+from .data import getStaticData, getSearchDict, clean
+from typing import Any, Iterable, Mapping
+
+# discord won't show any more autocomplete choices than this
+MAX_RESULTS = 25
+# how alike (0 to 1) a misspelling has to be to count as a match
+MIN_SIMILARITY = 0.4
+# and how alike it has to be to be taken as the stop that was meant
+BEST_SIMILARITY = 0.6
+
+# built from the static files on first use
+_INDEX: SearchIndex | None = None
+
+
+class TrieNode:
+
+    __slots__ = ("children", "codes")
+
+    def __init__(self) -> None:
+        self.children: dict[str, TrieNode] = {}
+        # best stops for this prefix (filled in once everything is added)
+        self.codes: list[str] = []
+
+
+class SearchIndex:
+
+    def __init__(self, stops: Mapping[str, Any], search: Mapping[str, str]) -> None:
+        # remember what this was built from so it can tell when the static data is reloaded
+        self._source: Mapping[str, Any] = stops
+        # map order is used to break ties
+        self._order: dict[str, int] = {code: i for i, code in enumerate(stops)}
+        # every cleaned name, code and nickname
+        aliases: dict[str, str] = {}
+        for code, data in stops.items():
+            aliases[clean(data["name"])] = code
+            aliases[code.lower()] = code
+        for alias, code in search.items():
+            if code in stops:
+                aliases.setdefault(clean(alias), code)
+        self._aliases: dict[str, str] = aliases
+        self._by_code: dict[str, list[str]] = {}
+        for alias, code in aliases.items():
+            self._by_code.setdefault(code, []).append(alias)
+        # prefixes of each alias (and of each word within it)
+        self._trie: TrieNode = TrieNode()
+        ranked: dict[int, list[tuple[int, int, str]]] = {}
+        for alias, code in aliases.items():
+            words = alias.split()
+            for i in range(len(words)):
+                node = self._trie
+                # later words rank below the start of the alias
+                for character in " ".join(words[i:]):
+                    node = node.children.setdefault(character, TrieNode())
+                    ranked.setdefault(id(node), []).append((i, len(alias), code))
+        self.fill(self._trie, ranked)
+        # trigrams of every alias, for anything misspelt
+        self._trigrams: dict[str, set[str]] = {}
+        self._alias_trigrams: dict[str, set[str]] = {}
+        for alias, code in aliases.items():
+            grams = trigrams(alias)
+            self._alias_trigrams[alias] = grams
+            for gram in grams:
+                self._trigrams.setdefault(gram, set()).add(alias)
+
+    def fill(self, root: TrieNode, ranked: dict[int, list[tuple[int, int, str]]]) -> None:
+        # keep just the best few stops at each node (walked without recursion, the trie is deep)
+        nodes = [root]
+        while nodes:
+            node = nodes.pop()
+            seen = set()
+            for _, _, code in sorted(ranked.get(id(node), ()), key=lambda item: (item[0], item[1], self._order[item[2]])):
+                if code not in seen:
+                    seen.add(code)
+                    node.codes.append(code)
+                    if len(node.codes) == MAX_RESULTS:
+                        break
+            nodes.extend(node.children.values())
+
+    @property
+    def source(self) -> Mapping[str, Any]:
+        return self._source
+
+    @property
+    def aliases(self) -> dict[str, str]:
+        return self._aliases
+
+    def exact(self, term: str) -> str | None:
+        return self._aliases.get(clean(term).strip())
+
+    def prefixed(self, term: str) -> list[str]:
+        node = self._trie
+        for character in term:
+            if character not in node.children:
+                return []
+            node = node.children[character]
+        return node.codes
+
+    def similar(self, term: str) -> list[tuple[float, str]]:
+        # (similarity, code) of aliases sharing enough trigrams, best first
+        grams = trigrams(term)
+        counts: dict[str, int] = {}
+        for gram in grams:
+            for alias in self._trigrams.get(gram, ()):
+                counts[alias] = counts.get(alias, 0) + 1
+        scores: dict[str, float] = {}
+        for alias, shared in counts.items():
+            # dice coefficient
+            score = 2 * shared / (len(grams) + len(self._alias_trigrams[alias]))
+            code = self._aliases[alias]
+            if score >= MIN_SIMILARITY and score > scores.get(code, 0):
+                scores[code] = score
+        return sorted(((score, code) for code, score in scores.items()),
+                      key=lambda item: (-item[0], self._order[item[1]]))
+
+    def search(self, term: str, limit: int = MAX_RESULTS, codes: Iterable[str] | None = None) -> list[str]:
+        term = " ".join(clean(term).split())
+        allowed = set(codes) if codes is not None else None
+        # nothing typed yet, so just go in map order
+        if not term:
+            return [code for code in self._order if allowed is None or code in allowed][:limit]
+        results: list[str] = []
+        # exact matches, then prefixes, then anything that looks alike
+        exact = self._aliases.get(term)
+        prefixed = self.prefixed(term)
+        candidates = ([exact] if exact else []) + prefixed
+        # the trie only keeps the best few, so look further if some might be filtered out
+        if allowed is not None and len(prefixed) == MAX_RESULTS:
+            candidates += [code for code in self._order if code in allowed
+                           and any(alias.startswith(term) or f" {term}" in alias for alias in self.aliasesOf(code))]
+        # only bother with misspellings if there's room left for them
+        if len(set(candidates)) < limit:
+            candidates += [code for _, code in self.similar(term)]
+        for code in candidates:
+            if code not in results and (allowed is None or code in allowed):
+                results.append(code)
+                if len(results) == limit:
+                    break
+        return results
+
+    def aliasesOf(self, code: str) -> list[str]:
+        return self._by_code.get(code, [])
+
+    def best(self, term: str) -> str | None:
+        # exact names and nicknames first
+        code = self.exact(term)
+        if code:
+            return code
+        # otherwise only if it's clear which stop was meant
+        term = " ".join(clean(term).split())
+        if not term:
+            return None
+        prefixed = self.prefixed(term)
+        if len(prefixed) == 1:
+            return prefixed[0]
+        similar = self.similar(term)
+        if similar and similar[0][0] >= BEST_SIMILARITY:
+            return similar[0][1]
+        return None
+
+
+def trigrams(term: str) -> set[str]:
+    # padded so short words and word starts still count
+    padded = f"  {term} "
+    return {padded[i:i+3] for i in range(len(padded) - 2)}
+
+
+def getSearchIndex() -> SearchIndex:
+    global _INDEX
+    # rebuild if the static data has been reloaded since
+    stops = getStaticData("stops")
+    if _INDEX is None or _INDEX.source is not stops:
+        _INDEX = SearchIndex(stops, getSearchDict())
+    return _INDEX
@@ -0,0 +1,693 @@
+from __future__ import annotations
+from argparse import ArgumentParser
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from enum import Enum
+from heapq import heappush, heappop
+from json import dump
+from os import cpu_count
+from pathlib import Path
+from random import Random
+from statistics import mean, median
+from time import perf_counter
+from typing import Any, Iterator
+import random
+from .data import getStaticData, getLiveState, getLiveTeamData, setLiveTeamData
+from .backends import LiveBackend, MemoryBackend
+from .game import Game
+from .team import Team
+from .stop import Stop, Challenge
+from .line import Line
+from .action import Action, ActionType, TicketInspection, Interchange, Railroaded, Derailment
+from .special import Special
+
+# simulated minutes each part of the game takes (ranges are picked from at random)
+TRAVEL_MINUTES = (5, 20)
+CHALLENGE_MINUTES = (5, 25)
+CLEAR_MINUTES = (5, 15)
+CARD_MINUTES = 2
+# how long a team with nothing to do waits before looking again
+WAIT_MINUTES = 5
+
+# give up on games that go on for longer than this
+MAX_TURNS = 2000
+
+
+class MoveType(Enum):
+    START = "start"
+    COMPLETE = "complete"
+    VETO = "veto"
+    RESUME = "resume"
+    PLAY = "play"
+    COUNTER = "counter"
+    CLAIM_LINE = "claim_line"
+    CLEAR_CURSE = "clear_curse"
+    SPECIAL = "special"
+
+
+class Move:
+
+    __slots__ = ("_type", "_team", "_card", "_targets")
+
+    def __init__(self, type: MoveType, team: Team, card: Action | Challenge | Line | None = None,
+                 targets: tuple[Any, ...] = ()) -> None:
+        self._type: MoveType = type
+        self._team: Team = team
+        # the action card played, challenge started or line claimed
+        self._card: Action | Challenge | Line | None = card
+        # whatever the card is played against (teams or stops)
+        self._targets: tuple[Any, ...] = targets
+
+    @property
+    def type(self) -> MoveType:
+        return self._type
+
+    @property
+    def team(self) -> Team:
+        return self._team
+
+    @property
+    def card(self) -> Action | Challenge | Line | None:
+        return self._card
+
+    @property
+    def targets(self) -> tuple[Any, ...]:
+        return self._targets
+
+    @property
+    def victim(self) -> Team | None:
+        # stop cards are played against whoever owns the stop
+        if not self._targets:
+            return None
+        target = self._targets[0]
+        return target.owner if isinstance(target, Stop) else target
+
+
+class Policy:
+
+    name = "policy"
+
+    def __init__(self, rng: Random, success_rate: float = 0.8) -> None:
+        self._rng: Random = rng
+        # chance of completing a challenge rather than vetoing it
+        self._success_rate: float = success_rate
+
+    def chooseMove(self, team: Team, moves: list[Move]) -> Move | None:
+        raise NotImplementedError
+
+    def chooseCounter(self, team: Team, card: Action, options: list[Action]) -> Action | None:
+        raise NotImplementedError
+
+    def valueOf(self, team: Team, stop: Stop) -> float:
+        raise NotImplementedError
+
+    def chooseChallenge(self, team: Team, stop: Stop) -> Challenge:
+        return self._rng.choice(stop.challenges)
+
+    def completes(self, team: Team, challenge: Challenge) -> bool:
+        return self._rng.random() < self._success_rate
+
+    def chooseReward(self, team: Team, options: list[Action]) -> Action:
+        return self._rng.choice(options)
+
+    def chooseSecrets(self, team: Team, count: int) -> list[Stop]:
+        # give away (or drop) the secrets worth least
+        secrets = sorted(team.secrets, key=lambda stop: self.valueOf(team, stop))
+        return secrets[:count]
+
+
+class RandomPolicy(Policy):
+
+    name = "random"
+
+    def chooseMove(self, team: Team, moves: list[Move]) -> Move | None:
+        # anyone would claim a line given the chance, everything else is left to luck
+        claims = [move for move in moves if move.type == MoveType.CLAIM_LINE]
+        return self._rng.choice(claims or moves) if moves else None
+
+    def chooseCounter(self, team: Team, card: Action, options: list[Action]) -> Action | None:
+        return self._rng.choice(options + [None])
+
+    def valueOf(self, team: Team, stop: Stop) -> float:
+        return self._rng.random()
+
+
+class GreedyPolicy(Policy):
+
+    name = "greedy"
+
+    def __init__(self, rng: Random, success_rate: float = 0.8) -> None:
+        super().__init__(rng, success_rate)
+        # what this team is working towards, worked out once per game revision
+        self._plans: dict[str, tuple[int, set[str], dict[str, int]]] = {}
+
+    def plan(self, team: Team) -> tuple[set[str], dict[str, int]]:
+        revision = getLiveState(team.game.id).revision
+        if team.id not in self._plans or self._plans[team.id][0] != revision:
+            # secrets still to get, and how many free stops it has on each unclaimed line
+            secrets = {stop.code for stop in team.secrets if stop.owner != team}
+            lines: dict[str, int] = {}
+            for stop in team.claimed_unlocked_stops:
+                for line in stop.lines:
+                    if not line.claimed:
+                        lines[line.colour] = lines.get(line.colour, 0) + 1
+            self._plans[team.id] = (revision, secrets, lines)
+        return self._plans[team.id][1:]
+
+    def valueOf(self, team: Team, stop: Stop) -> float:
+        secrets, lines = self.plan(team)
+        value = 10 if stop.code in secrets else 0
+        # help towards lines it has already started
+        value += sum(1 + lines.get(line.colour, 0) for line in stop.lines)
+        if stop.has_reward:
+            value += 2
+        if stop.special:
+            value += 3
+        return value
+
+    def threat(self, team: Team) -> float:
+        # how close a team is to winning
+        return 3 * len(team.claimed_lines) + sum(stop.owner == team for stop in team.secrets)
+
+    def score(self, move: Move) -> float:
+        team = move.team
+        if move.type == MoveType.CLAIM_LINE:
+            return 1000
+        elif move.type in (MoveType.CLEAR_CURSE, MoveType.RESUME):
+            return 500
+        elif move.type == MoveType.START:
+            return self.valueOf(team, move.targets[0])
+        card = move.card
+        if isinstance(card, Interchange):
+            return self.valueOf(team, move.targets[0]) - self.valueOf(team, move.targets[1])
+        elif isinstance(card, Railroaded):
+            return self.valueOf(team, move.targets[0])
+        elif isinstance(card, Derailment):
+            return 2 + 5 * move.targets[0].locked + self.threat(move.victim)
+        elif card.type == ActionType.CURSE:
+            return 2 + self.threat(move.victim)
+        # spying never changes the game
+        return 0.5
+
+    def chooseMove(self, team: Team, moves: list[Move]) -> Move | None:
+        if not moves:
+            return None
+        # best move (ties broken at random)
+        scores = [(self.score(move), self._rng.random(), i) for i, move in enumerate(moves)]
+        return moves[max(scores)[2]]
+
+    def chooseCounter(self, team: Team, card: Action, options: list[Action]) -> Action | None:
+        # always stop it if possible (using the weakest card that can)
+        return min(options, key=lambda option: option.zone) if options else None
+
+    def chooseReward(self, team: Team, options: list[Action]) -> Action:
+        # cards from further out are stronger
+        return max(options, key=lambda option: option.zone)
+
+
+POLICIES: dict[str, type[Policy]] = {
+    RandomPolicy.name: RandomPolicy,
+    GreedyPolicy.name: GreedyPolicy
+}
+# plays well enough that most games end with a winner
+DEFAULT_POLICIES = [GreedyPolicy.name]
+
+
+class LatencyHistogram:
+
+    # buckets double in size from 1 microsecond up to about a minute
+    BOUNDS = tuple(2 ** i / 1_000_000 for i in range(27))
+
+    def __init__(self) -> None:
+        self._counts: list[int] = [0] * (len(self.BOUNDS) + 1)
+        self._total: float = 0
+        self._max: float = 0
+
+    @property
+    def count(self) -> int:
+        return sum(self._counts)
+
+    @property
+    def mean(self) -> float:
+        return self._total / self.count if self.count else 0
+
+    @property
+    def max(self) -> float:
+        return self._max
+
+    def record(self, seconds: float) -> None:
+        self._counts[bisect_left(self.BOUNDS, seconds)] += 1
+        self._total += seconds
+        self._max = max(self._max, seconds)
+
+    def merge(self, other: LatencyHistogram) -> None:
+        self._counts = [a + b for a, b in zip(self._counts, other._counts)]
+        self._total += other._total
+        self._max = max(self._max, other._max)
+
+    def percentile(self, fraction: float) -> float:
+        # upper edge of the bucket it falls in
+        target = fraction * self.count
+        seen = 0
+        for bound, count in zip(self.BOUNDS + (self._max,), self._counts):
+            seen += count
+            if count and seen >= target:
+                return min(bound, self._max)
+        return self._max
+
+    def toDict(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "mean_seconds": self.mean,
+            "p50_seconds": self.percentile(0.5),
+            "p90_seconds": self.percentile(0.9),
+            "p99_seconds": self.percentile(0.99),
+            "max_seconds": self._max,
+            "buckets": {f"<={bound*1_000_000:g}us": count
+                        for bound, count in zip(self.BOUNDS + (float("inf"),), self._counts) if count}
+        }
+
+
+class GameResult:
+
+    def __init__(self, seed: int, policies: list[str]) -> None:
+        self._seed: int = seed
+        # policy of each team, in seat order
+        self._policies: list[str] = policies
+        self._winner: int | None = None
+        self._turns: int = 0
+        self._minutes: float = 0
+        self._seconds: float = 0
+        self._stalled: bool = False
+        self._timed_out: bool = False
+        self._error: str | None = None
+        self._latencies: dict[MoveType, LatencyHistogram] = {}
+
+    @property
+    def seed(self) -> int:
+        return self._seed
+
+    @property
+    def policies(self) -> list[str]:
+        return self._policies
+
+    @property
+    def winner(self) -> int | None:
+        return self._winner
+
+    @property
+    def finished(self) -> bool:
+        return self._winner is not None
+
+    @property
+    def turns(self) -> int:
+        return self._turns
+
+    @property
+    def minutes(self) -> float:
+        return self._minutes
+
+    @property
+    def seconds(self) -> float:
+        return self._seconds
+
+    @property
+    def stalled(self) -> bool:
+        return self._stalled
+
+    @property
+    def timed_out(self) -> bool:
+        return self._timed_out
+
+    @property
+    def error(self) -> str | None:
+        return self._error
+
+    @property
+    def latencies(self) -> dict[MoveType, LatencyHistogram]:
+        return self._latencies
+
+
+class Simulation:
+
+    def __init__(self, teams: int, policies: list[str], seed: int = 0, max_turns: int = MAX_TURNS,
+                 success_rate: float = 0.8, backend: LiveBackend | None = None) -> None:
+        self._seed: int = seed
+        # simulated games never need saving
+        self._backend: LiveBackend = backend or MemoryBackend()
+        self._rng: Random = Random(seed)
+        self._max_turns: int = max_turns
+        # seat i plays policy i (going round again if there are more teams than policies)
+        names = [policies[i % len(policies)] for i in range(teams)]
+        self._policies: list[Policy] = [POLICIES[name](self._rng, success_rate) for name in names]
+        self._result: GameResult = GameResult(seed, names)
+        self._game: Game | None = None
+        self._teams: list[Team] = []
+        self._minutes: float = 0
+
+    @property
+    def result(self) -> GameResult:
+        return self._result
+
+    def policy(self, team: Team) -> Policy:
+        return self._policies[self._teams.index(team)]
+
+    @contextmanager
+    def timed(self, type: MoveType) -> Iterator[None]:
+        # wall time of each change to the game
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self._result._latencies.setdefault(type, LatencyHistogram()).record(perf_counter() - start)
+
+    def run(self) -> GameResult:
+        start = perf_counter()
+        # everything random in the game itself comes from here too
+        random.seed(self._seed)
+        try:
+            self.setUp()
+            self.play()
+        except Exception as error:
+            self._result._error = f"{type(error).__name__}: {error}"
+        finally:
+            self._result._seconds = perf_counter() - start
+            self._result._minutes = self._minutes
+            if self._game:
+                self._game.delete()
+        return self._result
+
+    def setUp(self) -> None:
+        # same as the bot, with nobody taking a mulligan
+        self._game = Game(backend=self._backend)
+        with self._game.transaction():
+            for colour in list(getStaticData("team_colours"))[:len(self._policies)]:
+                self._game.addTeam(f"{colour.replace('_', ' ').title()} Team", colour)
+            self._game.assignRewards()
+            self._game.dealAllSecrets()
+            self._game.start()
+        self._teams = self._game.all_teams
+
+    def play(self) -> None:
+        # (simulated minute, tie breaker, seat) of when each team next does something
+        queue = [(0, i, i) for i in range(len(self._teams))]
+        idle = 0
+        while self._result._turns < self._max_turns:
+            self._minutes, order, seat = heappop(queue)
+            team = self._teams[seat]
+            minutes = self.turn(team)
+            if self._game.game_over:
+                self._result._winner = self._teams.index(self._game.winner)
+                return
+            # nobody has had anything to do for a whole round
+            idle = idle + 1 if minutes is None else 0
+            if idle > len(self._teams):
+                self._result._stalled = True
+                return
+            heappush(queue, (self._minutes + (minutes or WAIT_MINUTES), order + len(self._teams), seat))
+        # still going when the turns ran out
+        self._result._timed_out = True
+
+    def turn(self, team: Team) -> float | None:
+        policy = self.policy(team)
+        live_data = getLiveTeamData(team.id, self._game.id)
+        # veto periods run on real time, so end them once the simulated time is up
+        if live_data.get("in_veto"):
+            self.endVeto(team)
+        # challenges are resolved once the time to do them has passed
+        if team.in_challenge:
+            self._result._turns += 1
+            challenge = team.current_challenge
+            if policy.completes(team, challenge):
+                with self.timed(MoveType.COMPLETE):
+                    self.completeChallenge(team, policy)
+                return CARD_MINUTES
+            with self.timed(MoveType.VETO):
+                team.vetoChallenge()
+            return challenge.veto_period.total_seconds() / 60
+        move = policy.chooseMove(team, self.getMoves(team))
+        if move is None:
+            return None
+        self._result._turns += 1
+        with self.timed(move.type):
+            return self.apply(move)
+
+    def getMoves(self, team: Team) -> list[Move]:
+        # curses have to be cleared before anything else
+        if not team.may_progress:
+            return [Move(MoveType.CLEAR_CURSE, team, curse) for curse in team.uncleared_curses]
+        moves = [Move(MoveType.CLAIM_LINE, team, line) for line in team.claimable_lines]
+        paused = team.paused_challenge
+        if paused and not paused.location.claimed:
+            moves.append(Move(MoveType.RESUME, team, paused))
+        else:
+            moves.extend(Move(MoveType.START, team, None, (stop,)) for stop in self._game.unclaimed_stops)
+        for card in team.available_starting_actions:
+            moves.extend(Move(MoveType.PLAY, team, card, targets) for targets in self.getTargets(team, card))
+        return moves
+
+    def getTargets(self, team: Team, card: Action) -> list[tuple[Any, ...]]:
+        victims = [victim for victim in team.other_teams if card.playableTeam(victim)]
+        if isinstance(card, (Interchange, Railroaded)):
+            stops = [stop for victim in victims for stop in victim.claimed_unlocked_stops]
+            if isinstance(card, Railroaded):
+                return [(stop,) for stop in stops]
+            # always swap away whichever stop this team cares about least
+            own = team.claimed_unlocked_stops
+            if not own:
+                return []
+            give = min(own, key=lambda stop: self.policy(team).valueOf(team, stop))
+            return [(stop, give) for stop in stops]
+        elif isinstance(card, Derailment):
+            return [(stop,) for victim in victims for stop in victim.claimed_stops]
+        return [(victim,) for victim in victims]
+
+    def apply(self, move: Move) -> float:
+        team = move.team
+        if move.type == MoveType.START:
+            stop = move.targets[0]
+            team.startChallenge(self.policy(team).chooseChallenge(team, stop))
+            return self._rng.uniform(*TRAVEL_MINUTES) + self._rng.uniform(*CHALLENGE_MINUTES)
+        elif move.type == MoveType.RESUME:
+            team.resumeChallenge()
+            return self._rng.uniform(*CHALLENGE_MINUTES)
+        elif move.type == MoveType.CLEAR_CURSE:
+            team.clearCurse(move.card)
+            return self._rng.uniform(*CLEAR_MINUTES)
+        elif move.type == MoveType.CLAIM_LINE:
+            move.card.claim(move.card.best_claim(team))
+            return CARD_MINUTES
+        self.playCard(move)
+        return CARD_MINUTES
+
+    def playCard(self, move: Move) -> None:
+        card = move.card
+        victim = move.victim
+        # the victim gets a chance to counter it first, like in the bot
+        if not card.play(*move.targets):
+            if self.tryCounter(card, victim):
+                return
+            card.play(*move.targets)
+        # anything the bot does by hand once a card has gone through
+        if isinstance(card, TicketInspection):
+            victim.revealSecret()
+
+    def tryCounter(self, card: Action, victim: Team) -> bool:
+        # returns whether the card was countered
+        counter = self.policy(victim).chooseCounter(victim, card, victim.counter_options(card))
+        if counter is None:
+            card.expireCounter()
+            return False
+        with self.timed(MoveType.COUNTER):
+            if counter.play(card):
+                return True
+        # the counter can be countered too
+        if self.tryCounter(counter, card.owner):
+            return False
+        with self.timed(MoveType.COUNTER):
+            counter.play(card)
+        return True
+
+    def completeChallenge(self, team: Team, policy: Policy) -> None:
+        result = team.completeChallenge()
+        # reward choice
+        if isinstance(result, list):
+            team.chooseAction(policy.chooseReward(team, result))
+        elif isinstance(result, Special):
+            with self.timed(MoveType.SPECIAL):
+                self.useSpecial(team, policy, result)
+
+    def useSpecial(self, team: Team, policy: Policy, special: Special) -> None:
+        others = len(team.other_teams)
+        if special.code == "DONATION" and len(team.secrets) >= others:
+            team.doDonation(policy.chooseSecrets(team, others))
+        elif special.code == "DROPSECRETS":
+            team.doDropSecrets(policy.chooseSecrets(team, 2))
+        elif special.code == "ADDSECRETS":
+            team.doAddSecrets()
+
+    def endVeto(self, team: Team) -> None:
+        with self._game.transaction():
+            live_data = getLiveTeamData(team.id, self._game.id)
+            # pretend it ended in the past, Team.in_veto does the rest
+            live_data["veto_end"] = 0
+            setLiveTeamData(team.id, live_data, self._game.id)
+
+
+class SimulationReport:
+
+    def __init__(self, results: list[GameResult], seconds: float, processes: int) -> None:
+        self._results: list[GameResult] = results
+        self._seconds: float = seconds
+        self._processes: int = processes
+
+    @property
+    def results(self) -> list[GameResult]:
+        return self._results
+
+    @property
+    def games_per_second(self) -> float:
+        return len(self._results) / self._seconds if self._seconds else 0
+
+    @property
+    def finished(self) -> list[GameResult]:
+        return [result for result in self._results if result.finished]
+
+    @property
+    def stalled(self) -> list[GameResult]:
+        return [result for result in self._results if result.stalled]
+
+    @property
+    def timed_out(self) -> list[GameResult]:
+        return [result for result in self._results if result.timed_out]
+
+    @property
+    def errors(self) -> list[GameResult]:
+        return [result for result in self._results if result.error]
+
+    @property
+    def latencies(self) -> dict[MoveType, LatencyHistogram]:
+        # every game's histograms added together
+        totals: dict[MoveType, LatencyHistogram] = {}
+        for result in self._results:
+            for type, histogram in result.latencies.items():
+                totals.setdefault(type, LatencyHistogram()).merge(histogram)
+        return totals
+
+    def lengths(self, turns: bool = False, results: list[GameResult] | None = None) -> dict[str, float]:
+        # finished games unless told otherwise
+        values = [result.turns if turns else result.minutes for result in (self.finished if results is None else results)]
+        if not values:
+            return {}
+        values.sort()
+        return {"mean": mean(values), "median": median(values),
+                "p90": values[int(0.9 * (len(values) - 1))], "max": values[-1]}
+
+    def win_rates(self) -> dict[str, dict[str, float]]:
+        # share of finished games won by each policy and by each seat
+        finished = self.finished
+        by_policy: dict[str, list[int]] = {}
+        by_seat: dict[str, list[int]] = {}
+        for result in self._results:
+            for seat, name in enumerate(result.policies):
+                by_policy.setdefault(name, [0, 0])[1] += result.finished
+                by_seat.setdefault(str(seat), [0, 0])[1] += result.finished
+        for result in finished:
+            by_policy[result.policies[result.winner]][0] += 1
+            by_seat[str(result.winner)][0] += 1
+        return {
+            "policy": {name: wins / played if played else 0 for name, (wins, played) in by_policy.items()},
+            "seat": {seat: wins / played if played else 0 for seat, (wins, played) in by_seat.items()}
+        }
+
+    def toDict(self) -> dict[str, Any]:
+        return {
+            "games": len(self._results),
+            "finished": len(self.finished),
+            "stalled": len(self.stalled),
+            "timed_out": len(self.timed_out),
+            "errors": [{"seed": result.seed, "error": result.error} for result in self.errors],
+            "processes": self._processes,
+            "seconds": self._seconds,
+            "games_per_second": self.games_per_second,
+            "game_minutes": self.lengths(),
+            "game_turns": self.lengths(turns=True),
+            "stalled_minutes": self.lengths(results=self.stalled),
+            "stalled_turns": self.lengths(turns=True, results=self.stalled),
+            "win_rates": self.win_rates(),
+            "latencies": {type.value: histogram.toDict() for type, histogram in self.latencies.items()}
+        }
+
+    def summary(self) -> str:
+        lines = [f"{len(self._results)} games in {self._seconds:.1f}s on {self._processes} process(es) "
+                 f"({self.games_per_second:.1f} games/sec)",
+                 f"{len(self.finished)} finished, {len(self.stalled)} stalled (nobody had a move left), "
+                 f"{len(self.timed_out)} hit the turn cap, {len(self.errors)} errors"]
+        minutes, turns = self.lengths(), self.lengths(turns=True)
+        if minutes:
+            lines.append(f"length: {minutes['median']:.0f} minutes median ({minutes['p90']:.0f} p90), "
+                         f"{turns['median']:.0f} turns median ({turns['p90']:.0f} p90)")
+        else:
+            lines.append("length: no games finished")
+        minutes, turns = self.lengths(results=self.stalled), self.lengths(turns=True, results=self.stalled)
+        if minutes:
+            lines.append(f"stalled after: {minutes['median']:.0f} minutes median, {turns['median']:.0f} turns median")
+        rates = self.win_rates()
+        lines.append("win rate by policy: " + ", ".join(f"{name} {rate:.1%}" for name, rate in rates["policy"].items()))
+        lines.append("win rate by seat: " + ", ".join(f"{seat} {rate:.1%}" for seat, rate in rates["seat"].items()))
+        for type, histogram in sorted(self.latencies.items(), key=lambda item: item[0].value):
+            lines.append(f"{type.value:<12} {histogram.count:>8}  {histogram.percentile(0.5)*1000:8.3f}ms p50  "
+                         f"{histogram.percentile(0.99)*1000:8.3f}ms p99  {histogram.max*1000:8.3f}ms max")
+        for result in self.errors[:5]:
+            lines.append(f"seed {result.seed}: {result.error}")
+        return "\n".join(lines)
+
+
+def runGames(seeds: list[int], teams: int, policies: list[str], max_turns: int = MAX_TURNS,
+             success_rate: float = 0.8) -> list[GameResult]:
+    # every game in this batch is kept in the same (otherwise empty) store
+    backend = MemoryBackend()
+    results = []
+    for seed in seeds:
+        # move the policies round a seat each game so nobody always goes first
+        shift = seed % len(policies)
+        rotated = policies[shift:] + policies[:shift]
+        results.append(Simulation(teams, rotated, seed, max_turns, success_rate, backend).run())
+    return results
+
+
+def simulate(games: int, teams: int = 4, policies: list[str] | None = None, processes: int | None = None,
+             seed: int = 0, max_turns: int = MAX_TURNS, success_rate: float = 0.8, batch: int = 20) -> SimulationReport:
+    policies = policies or DEFAULT_POLICIES
+    processes = processes or cpu_count() or 1
+    seeds = list(range(seed, seed + games))
+    batches = [seeds[i:i+batch] for i in range(0, games, batch)]
+    start = perf_counter()
+    if processes == 1:
+        results = [result for seeds in batches for result in runGames(seeds, teams, policies, max_turns, success_rate)]
+    else:
+        with ProcessPoolExecutor(processes) as executor:
+            futures = [executor.submit(runGames, seeds, teams, policies, max_turns, success_rate) for seeds in batches]
+            results = [result for future in futures for result in future.result()]
+    return SimulationReport(results, perf_counter() - start, processes)
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Play lots of games with no Discord involved.")
+    parser.add_argument("--games", type=int, default=100, help="how many games to play")
+    parser.add_argument("--teams", type=int, default=4, help="teams in each game")
+    parser.add_argument("--policies", nargs="+", choices=list(POLICIES), default=DEFAULT_POLICIES,
+                        help="how teams choose their moves (shared out between the seats)")
+    parser.add_argument("--processes", type=int, help="worker processes (defaults to one per cpu)")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first game")
+    parser.add_argument("--max-turns", type=int, default=MAX_TURNS, help="give up on a game after this many moves")
+    parser.add_argument("--success-rate", type=float, default=0.8, help="chance of completing each challenge")
+    parser.add_argument("--output", type=Path, help="write the full report here as json")
+    arguments = parser.parse_args()
+    report = simulate(arguments.games, arguments.teams, arguments.policies, arguments.processes,
+                      arguments.seed, arguments.max_turns, arguments.success_rate)
+    print(report.summary())
+    if arguments.output:
+        with open(arguments.output, "w") as file:
+            dump(report.toDict(), file, indent=4)
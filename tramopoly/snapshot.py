@@ -0,0 +1,160 @@
+from __future__ import annotations
+from .data import getLiveState, getAllStopCodes, getAllLineColours, getAllZoneNumbers, freeze
+from copy import copy
+from typing import Any, Mapping, TYPE_CHECKING
+if TYPE_CHECKING:
+    from .game import Game
+    from .stop import Stop
+    from .line import Line
+    from .team import Team
+    from .zone import Zone
+    from .action import Action
+
+# lines needed (alongside all secrets) to win
+LINES_TO_WIN = 3
+
+# latest snapshot of each game, reused until something changes
+_SNAPSHOTS: dict[str, GameSnapshot] = {}
+
+
+class GameSnapshot:
+
+    def __init__(self, game: Game) -> None:
+        # set game reference
+        self._game: Game = game
+        state = getLiveState(game.id)
+        # copy every live file once, all at the same moment
+        with state.reading():
+            self._revision: int = state.revision
+            self._stop_data: Mapping[str, Any] = freeze(state.get("stops"))
+            self._team_data: Mapping[str, Any] = freeze(state.get("teams"))
+            self._action_data: Mapping[str, Any] = freeze(state.get("deck"))
+            self._counter_data: Mapping[str, Any] = freeze(state.get("counters"))
+            self._game_data: Mapping[str, Any] = freeze(state.get("game"))
+        # index stops by who owns them and which line they're locked into (in map order)
+        stops_by_owner: dict[str, list[str]] = {id: [] for id in self._team_data}
+        locked_by_line: dict[str, list[str]] = {colour: [] for colour in getAllLineColours()}
+        for code in getAllStopCodes():
+            data = self._stop_data.get(code, {})
+            if "owner" in data:
+                stops_by_owner.setdefault(data["owner"], []).append(code)
+            if "locked_line" in data:
+                locked_by_line[data["locked_line"]].append(code)
+        # a line belongs to whoever owns its locked stops
+        line_owners: dict[str, str] = {}
+        lines_by_owner: dict[str, list[str]] = {id: [] for id in self._team_data}
+        for colour, codes in locked_by_line.items():
+            owner = self._stop_data[codes[0]].get("owner") if codes else None
+            if owner is not None:
+                line_owners[colour] = owner
+                lines_by_owner.setdefault(owner, []).append(colour)
+        # index action cards by hand and by zone deck
+        hands: dict[str, list[str]] = {id: [] for id in self._team_data}
+        reserved: dict[str, list[str]] = {id: [] for id in self._team_data}
+        decks: dict[int, list[str]] = {number: [] for number in getAllZoneNumbers()}
+        for id, data in self._action_data.items():
+            if data.get("dealt", False) and not data.get("used", False) and "owner" in data:
+                hands.setdefault(data["owner"], []).append(id)
+            if data.get("reserved", False) and "owner" in data:
+                reserved.setdefault(data["owner"], []).append(id)
+            if not data.get("dealt", False) and not data.get("reserved", False):
+                decks.setdefault(data["zone"], []).append(id)
+        # secrets of each team
+        secrets = {id: tuple(secret["code"] for secret in data.get("secrets", ()))
+                   for id, data in self._team_data.items()}
+        # store everything read-only
+        self._stops_by_owner = freeze(stops_by_owner)
+        self._locked_by_line = freeze(locked_by_line)
+        self._line_owners = freeze(line_owners)
+        self._lines_by_owner = freeze(lines_by_owner)
+        self._hands = freeze(hands)
+        self._reserved = freeze(reserved)
+        self._decks = freeze(decks)
+        self._secrets = freeze(secrets)
+        # work out who has won straight away
+        self._winners: tuple[str, ...] = tuple(
+            id for id in self._team_data
+            if all(self._stop_data.get(code, {}).get("owner") == id for code in self._secrets[id])
+            and len(self._lines_by_owner.get(id, ())) >= LINES_TO_WIN)
+
+    @property
+    def game(self) -> Game:
+        return self._game
+
+    @property
+    def revision(self) -> int:
+        return self._revision
+
+    @property
+    def stop_data(self) -> Mapping[str, Any]:
+        return self._stop_data
+
+    @property
+    def team_data(self) -> Mapping[str, Any]:
+        return self._team_data
+
+    @property
+    def action_data(self) -> Mapping[str, Any]:
+        return self._action_data
+
+    @property
+    def counter_data(self) -> Mapping[str, Any]:
+        return self._counter_data
+
+    @property
+    def game_data(self) -> Mapping[str, Any]:
+        return self._game_data
+
+    @property
+    def winner(self) -> Team | None:
+        return self._game.getTeamFromID(self._winners[0]) if self._winners else None
+
+    @property
+    def game_over(self) -> bool:
+        return len(self._winners) > 0
+
+    def secrets(self, team: Team) -> list[Stop]:
+        return [self._game.getStopFromCode(code) for code in self._secrets.get(team.id, ())]
+
+    def claimed_stops(self, team: Team) -> list[Stop]:
+        return [self._game.getStopFromCode(code) for code in self._stops_by_owner.get(team.id, ())]
+
+    def claimed_lines(self, team: Team) -> list[Line]:
+        return [self._game.getLineFromColour(colour) for colour in self._lines_by_owner.get(team.id, ())]
+
+    def line_owner(self, line: Line) -> Team | None:
+        owner = self._line_owners.get(line.colour)
+        return self._game.getTeamFromID(owner) if owner is not None else None
+
+    def locked_stops(self, line: Line) -> list[Stop]:
+        return [self._game.getStopFromCode(code) for code in self._locked_by_line.get(line.colour, ())]
+
+    def has_won(self, team: Team) -> bool:
+        return team.id in self._winners
+
+    def available_actions(self, team: Team) -> list[Action]:
+        return [self._game.getActionFromDeckID(id) for id in self._hands.get(team.id, ())]
+
+    def reserved_actions(self, team: Team) -> list[Action]:
+        return [self._game.getActionFromDeckID(id) for id in self._reserved.get(team.id, ())]
+
+    def deck(self, zone: Zone) -> list[Action]:
+        return [self._game.getActionFromDeckID(id) for id in self._decks.get(zone.number, ())]
+
+
+def getSnapshot(game: Game) -> GameSnapshot:
+    # only rebuild if the game has changed since last time
+    revision = getLiveState(game.id).revision
+    snapshot = _SNAPSHOTS.get(game.id)
+    if snapshot is None or snapshot.revision != revision:
+        snapshot = GameSnapshot(game)
+        _SNAPSHOTS[game.id] = snapshot
+    elif snapshot.game is not game:
+        # share the indexes but hand out this game object's stops/teams/etc.
+        snapshot = copy(snapshot)
+        snapshot._game = game
+    return snapshot
+
+
+def forgetSnapshot(game_id: str) -> None:
+    _SNAPSHOTS.pop(game_id, None)
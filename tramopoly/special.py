@@ -9,6 +9,8 @@ if TYPE_CHECKING:
 
 class Special(Card):
 
+    __slots__ = ("_code", "_game")
+
     def __init__(self, code:str, game: Game | None = None) -> None:
         # set colour
         self._code: str = code
@@ -44,4 +46,7 @@ class Special(Card):
         if not value or not isinstance(value, Special):
             return False
         else:
-            return self._code == value._code
\ No newline at end of file
+            return self._code == value._code
+
+    def __hash__(self) -> int:
+        return hash(self._code)
\ No newline at end of file
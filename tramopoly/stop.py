@@ -1,6 +1,7 @@
 
 from __future__ import annotations
 from .data import getLiveStopData, getStaticStopData, getChallengeData, setLiveStopData, clean
+from .topology import isBorderStop, getParentCode, getChallengeStopCode
 from .card import Card
 from datetime import timedelta
 from pathlib import Path
@@ -9,7 +10,7 @@ from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from .line import Line
     from .zone import Zone
-    from .game import Game, getAllStops
+    from .game import Game
     from .team import Team
     from .action import Action
     from .special import Special
@@ -20,6 +21,8 @@ STANDARD_VETO = 10
 
 class Stop(Card):
 
+    __slots__ = ("_code", "_game")
+
     def __init__(self, code: str, game: Game | None = None) -> None:
         # set code
         self._code: str = code
@@ -36,12 +39,9 @@ class Stop(Card):
 
     @property
     def parent(self) -> Stop:
-        # all zone 1 stops have st peters square as parent
-        if self.inner_zone.number == 1 and not self.on_zone_border:
-            return self._game.getStopFromCode("SPS")
-        else:
-            # load data
-            return Stop(getStaticStopData(self._code)["parent"], self._game)
+        # all zone 1 stops have st peters square as parent (worked out in advance)
+        code = getParentCode(self._code)
+        return self._game.getStopFromCode(code) if self._game else Stop(code)
 
     @property
     def name(self) -> str:
@@ -50,16 +50,18 @@ class Stop(Card):
     @property
     def lines(self) -> list[Line]:
         from .line import Line
-        return [Line(colour, self._game) for colour in getStaticStopData(self._code)["lines"]]
+        colours = getStaticStopData(self._code)["lines"]
+        return [self._game.getLineFromColour(colour) if self._game else Line(colour) for colour in colours]
 
     @property
     def inner_zone(self) -> Zone:
         from .zone import Zone
-        return Zone(getStaticStopData(self._code)["inner_zone"], self._game)
+        number = getStaticStopData(self._code)["inner_zone"]
+        return self._game.getZoneFromNumber(number) if self._game else Zone(number)
 
     @property
     def on_zone_border(self) -> bool:
-        return getStaticStopData(self._code)["on_zone_border"]
+        return isBorderStop(self._code)
 
     @property
     def zone_string(self) -> str:
@@ -77,13 +79,12 @@ class Stop(Card):
 
     @property
     def owner(self) -> Team | None:
-        from .team import Team
         # load data
         live_data = getLiveStopData(self._code, self._game._id)
         # use default value of no owner
         if "owner" in live_data:
-            # create team object
-            return Team(live_data["owner"], self._game)
+            # use the game's team object
+            return self._game.getTeamFromID(live_data["owner"])
         else:
             return None
 
@@ -99,13 +100,12 @@ class Stop(Card):
 
     @property
     def locked_line(self) -> Line | None:
-        from .line import Line
         # load data
         live_data = getLiveStopData(self._code, self._game._id)
         # use default value of no locked line
         if "locked_line" in live_data:
-            # create line object
-            return Line(live_data["locked_line"], self._game)
+            # use the game's line object
+            return self._game.getLineFromColour(live_data["locked_line"])
         else:
             return None
 
@@ -121,11 +121,10 @@ class Stop(Card):
 
     @property
     def special(self) -> Special | None:
-        from .special import Special
         # load static data
         live_data = getLiveStopData(self._code, self._game._id)
         if "special" in live_data and not self.special_used:
-            return Special(live_data["special"], self._game)
+            return self._game.getSpecialFromCode(live_data["special"])
 
     @property
     def special_used(self) -> bool:
@@ -141,7 +140,8 @@ class Stop(Card):
 
     @property
     def challenges(self) -> list[Challenge]:
-        return [Challenge(id, self._game) for id in getStaticStopData(self._code)["challenges"]]
+        ids = getStaticStopData(self._code)["challenges"]
+        return [self._game.getChallengeFromID(id) if self._game else Challenge(id, None) for id in ids]
 
     def map_icon(self, observer: Team | None = None) -> IconType:
         from .map_images import IconType
@@ -170,102 +170,113 @@ class Stop(Card):
                      if clean(challenge.title) == search_term_clean), None)
 
     def claim(self, team: Team) -> list[Action] | Action | Special | None:
-        # load data
-        live_data = getLiveStopData(self._code, self._game._id)
-        # set new owner
-        live_data["claimed"] = True
-        live_data["owner"] = team.id
-        result = None
-        # check for rewards and special abilities
-        if "has_reward" in live_data and live_data["has_reward"]:
-            # deal out reward and return a copy
-            live_data["has_reward"] = False
-            result = self.inner_zone.dealAction(team)
-        elif self.special:
-            team.addSpecialAbility(self.special)
-            result = self.special
-            live_data["special_used"] = True
-        # save data
-        setLiveStopData(self._code, live_data, self._game._id)
-        # kick any other teams out...
-        for other_team in team.other_teams:
-            if other_team.current_challenge_location == self and not other_team.in_veto:
-                # remove without consequence
-                other_team.clearChallenge()
-        # check if game over
-        self._game.game_over
-        return result
+        with self._game.transaction():
+            # load data
+            live_data = getLiveStopData(self._code, self._game._id)
+            # set new owner
+            live_data["claimed"] = True
+            live_data["owner"] = team.id
+            result = None
+            # check for rewards and special abilities
+            if "has_reward" in live_data and live_data["has_reward"]:
+                # deal out reward and return a copy
+                live_data["has_reward"] = False
+                result = self.inner_zone.dealAction(team)
+            elif self.special:
+                team.addSpecialAbility(self.special)
+                result = self.special
+                live_data["special_used"] = True
+            # save data
+            setLiveStopData(self._code, live_data, self._game._id)
+            # kick any other teams out...
+            for other_team in team.other_teams:
+                if other_team.current_challenge_location == self and not other_team.in_veto:
+                    # remove without consequence
+                    other_team.clearChallenge()
+            # check if game over
+            self._game.game_over
+            return result
 
     def unclaim(self) -> None:
-        # load data
-        live_data = getLiveStopData(self._code, self._game._id)
-        # remove claim
-        live_data["claimed"] = False
-        del live_data["owner"]
-        # save data
-        setLiveStopData(self._code, live_data, self._game._id)
-        # make sure it isn't locked
-        if "locked" in live_data and live_data["locked"]:
-            self.locked_line.unlock()
+        with self._game.transaction():
+            # load data
+            live_data = getLiveStopData(self._code, self._game._id)
+            # remove claim
+            live_data["claimed"] = False
+            del live_data["owner"]
+            # save data
+            setLiveStopData(self._code, live_data, self._game._id)
+            # make sure it isn't locked
+            if "locked" in live_data and live_data["locked"]:
+                self.locked_line.unlock()
 
     def lock(self, line: Line) -> None:
-        # load data
-        live_data = getLiveStopData(self._code, self._game._id)
-        # set new locked line
-        live_data["locked"] = True
-        live_data["locked_line"] = line.colour
-        # save data
-        setLiveStopData(self._code, live_data, self._game._id)
+        with self._game.transaction():
+            # load data
+            live_data = getLiveStopData(self._code, self._game._id)
+            # set new locked line
+            live_data["locked"] = True
+            live_data["locked_line"] = line.colour
+            # save data
+            setLiveStopData(self._code, live_data, self._game._id)
 
     def unlock(self) -> None:
-        # load data
-        live_data = getLiveStopData(self._code, self._game._id)
-        # remove locked line
-        live_data["locked"] = False
-        del live_data["locked_line"]
-        # save data
-        setLiveStopData(self._code, live_data, self._game._id)
+        with self._game.transaction():
+            # load data
+            live_data = getLiveStopData(self._code, self._game._id)
+            # remove locked line
+            live_data["locked"] = False
+            del live_data["locked_line"]
+            # save data
+            setLiveStopData(self._code, live_data, self._game._id)
 
     def addReward(self) -> None:
-        # load data
-        live_data = getLiveStopData(self._code, self._game._id)
-        # add reward flag
-        live_data["has_reward"] = True
-        # save data
-        setLiveStopData(self._code, live_data, self._game._id)
+        with self._game.transaction():
+            # load data
+            live_data = getLiveStopData(self._code, self._game._id)
+            # add reward flag
+            live_data["has_reward"] = True
+            # save data
+            setLiveStopData(self._code, live_data, self._game._id)
 
     def addSpecial(self, code: str) -> None:
-        # load data
-        live_data = getLiveStopData(self._code, self._game._id)
-        # add special ability
-        live_data["special"] = code
-        # save data
-        setLiveStopData(self._code, live_data, self._game._id)
+        with self._game.transaction():
+            # load data
+            live_data = getLiveStopData(self._code, self._game._id)
+            # add special ability
+            live_data["special"] = code
+            # save data
+            setLiveStopData(self._code, live_data, self._game._id)
 
     def clearRewards(self) -> None:
-        # load data
-        live_data = getLiveStopData(self._code, self._game._id)
-        # remove reward flag
-        if "has_reward" in live_data:
-            del live_data["has_reward"]
-        elif "special" in live_data:
-            del live_data["special"]
-            if "special_used" in live_data:
-                del live_data["special_used"]
-        # save data
-        setLiveStopData(self._code, live_data, self._game._id)
+        with self._game.transaction():
+            # load data
+            live_data = getLiveStopData(self._code, self._game._id)
+            # remove reward flag
+            if "has_reward" in live_data:
+                del live_data["has_reward"]
+            elif "special" in live_data:
+                del live_data["special"]
+                if "special_used" in live_data:
+                    del live_data["special_used"]
+            # save data
+            setLiveStopData(self._code, live_data, self._game._id)
 
     def image(self, observer: Team | None = None) -> Image:
         from .card_images import drawStop
         return drawStop(self, observer)
 
-    def full_image(self, observer: Team | None = None) -> Image:
+    @property
+    def full_cards(self) -> list[Card]:
         # include special ability
         if self._game and self.special and not self.special_used:
-            from .card_images import drawCollection, CollectionStyle
-            return drawCollection([self, self.special], CollectionStyle.HORIZONTAL, observer)
+            return [self, self.special]
         else:
-            return self.image(observer)
+            return [self]
+
+    def full_image(self, observer: Team | None = None) -> Image:
+        from .card_images import drawCollection, CollectionStyle
+        return drawCollection(self.full_cards, CollectionStyle.HORIZONTAL, observer)
 
     def __eq__(self, value: object) -> bool:
         if not value or not isinstance(value, Stop):
@@ -273,6 +284,9 @@ class Stop(Card):
         else:
             return self._code == value._code
 
+    def __hash__(self) -> int:
+        return hash(self._code)
+
     def __lt__(self, other: object) -> bool:
         if not other or not isinstance(other, Stop):
             return super().__lt__(other)
@@ -289,6 +303,8 @@ class Stop(Card):
 
 class Challenge:
 
+    __slots__ = ("_id", "_game")
+
     def __init__(self, id: str, game: Game) -> None:
         # set id
         self._id = id
@@ -305,12 +321,9 @@ class Challenge:
 
     @ property
     def location(self) -> Stop:
-        # work this out from stops
-        if self._game:
-            return next(stop for stop in self._game.all_stops if self in stop.challenges)
-        else:
-            from .game import getAllStops
-            return next(stop for stop in getAllStops() if self in stop.challenges)
+        # look up which stop this challenge belongs to
+        code = getChallengeStopCode(self._id)
+        return self._game.getStopFromCode(code) if self._game else Stop(code)
 
     @ property
     def title(self) -> str:
@@ -338,3 +351,6 @@ class Challenge:
 
     def __eq__(self, value: object) -> bool:
         return self._id == value._id
+
+    def __hash__(self) -> int:
+        return hash(self._id)
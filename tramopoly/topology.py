@@ -0,0 +1,123 @@
+from __future__ import annotations
+from .data import getStaticData, freeze
+from typing import Any, Mapping
+
+# every zone 1 stop (apart from those on the border) hangs off st peters square
+CENTRE = "SPS"
+
+# built from the static files on first use
+_TOPOLOGY: Topology | None = None
+
+
+class Topology:
+
+    def __init__(self, stops: Mapping[str, Any], lines: Mapping[str, Any], challenges: Mapping[str, Any]) -> None:
+        # remember what this was built from so it can tell when the static data is reloaded
+        self._source: Mapping[str, Any] = stops
+        # everything below keeps map order (the order of stops.json)
+        stops_by_zone: dict[int, list[str]] = {}
+        stops_by_line: dict[str, list[str]] = {colour: [] for colour in lines}
+        border_stops: list[str] = []
+        parents: dict[str, str] = {}
+        junctions: dict[str, tuple[str, str]] = {}
+        children: dict[str, list[str]] = {code: [] for code in stops}
+        challenge_stops: dict[str, str] = {}
+        for code, data in stops.items():
+            # zones (by inner zone) and borders
+            stops_by_zone.setdefault(data["inner_zone"], []).append(code)
+            if data["on_zone_border"]:
+                border_stops.append(code)
+            # lines
+            for colour in data["lines"]:
+                stops_by_line.setdefault(colour, []).append(code)
+            # parent tree
+            if data["inner_zone"] == 1 and not data["on_zone_border"]:
+                parents[code] = CENTRE
+            else:
+                parents[code] = data["parent"]
+            children.setdefault(parents[code], []).append(code)
+            # border stops that start their own section count as both sections at once
+            # (the one they'd be in without the border on the inside, their own on the outside)
+            if data["on_zone_border"] and data.get("parent") == code:
+                inner = CENTRE if data["inner_zone"] == 1 else code
+                junctions[code] = (str(data["inner_zone"]) + inner, str(data["inner_zone"] + 1) + code)
+            # challenges only ever belong to one stop
+            for id in data["challenges"]:
+                if id in challenges:
+                    challenge_stops[id] = code
+        # store everything read-only
+        self._stops_by_zone: Mapping[int, tuple[str, ...]] = freeze(stops_by_zone)
+        self._stops_by_line: Mapping[str, tuple[str, ...]] = freeze(stops_by_line)
+        self._border_stops: frozenset[str] = frozenset(border_stops)
+        self._parents: Mapping[str, str] = freeze(parents)
+        self._junctions: Mapping[str, tuple[str, ...]] = freeze(junctions)
+        self._children: Mapping[str, tuple[str, ...]] = freeze(children)
+        self._challenge_stops: Mapping[str, str] = freeze(challenge_stops)
+
+    @property
+    def source(self) -> Mapping[str, Any]:
+        return self._source
+
+    @property
+    def stops_by_zone(self) -> Mapping[int, tuple[str, ...]]:
+        return self._stops_by_zone
+
+    @property
+    def stops_by_line(self) -> Mapping[str, tuple[str, ...]]:
+        return self._stops_by_line
+
+    @property
+    def border_stops(self) -> frozenset[str]:
+        return self._border_stops
+
+    @property
+    def parents(self) -> Mapping[str, str]:
+        return self._parents
+
+    @property
+    def junctions(self) -> Mapping[str, tuple[str, ...]]:
+        return self._junctions
+
+    @property
+    def children(self) -> Mapping[str, tuple[str, ...]]:
+        return self._children
+
+    @property
+    def challenge_stops(self) -> Mapping[str, str]:
+        return self._challenge_stops
+
+
+def getTopology() -> Topology:
+    global _TOPOLOGY
+    # rebuild if the static data has been reloaded since
+    stops = getStaticData("stops")
+    if _TOPOLOGY is None or _TOPOLOGY.source is not stops:
+        _TOPOLOGY = Topology(stops, getStaticData("lines"), getStaticData("challenges"))
+    return _TOPOLOGY
+
+
+def getStopCodesInZone(number: int) -> tuple[str, ...]:
+    # stops whose inner zone is this one
+    return getTopology().stops_by_zone.get(number, ())
+
+
+def getStopCodesOnLine(colour: str) -> tuple[str, ...]:
+    # stops on this line, in map order
+    return getTopology().stops_by_line.get(colour, ())
+
+
+def isBorderStop(code: str) -> bool:
+    return code in getTopology().border_stops
+
+
+def getParentCode(code: str) -> str:
+    return getTopology().parents[code]
+
+
+def getChildCodes(code: str) -> tuple[str, ...]:
+    return getTopology().children.get(code, ())
+
+
+def getChallengeStopCode(id: str) -> str:
+    # find which stop a challenge is at
+    return getTopology().challenge_stops[id]
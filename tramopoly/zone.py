@@ -1,6 +1,6 @@
 from __future__ import annotations
-from random import choice, sample
-from .data import getStartDeckData, getLiveDeckData, setLiveDeckData
+from .data import getStartDeckData, getLiveDeckData, setLiveDeckData, getUndealtDeckIDs, getZoneDeck
+from .topology import getStopCodesInZone
 from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from .game import Game
@@ -10,6 +10,8 @@ if TYPE_CHECKING:
 
 class Zone:
 
+    __slots__ = ("_number", "_game")
+
     def __init__(self, number: int,  game: Game | None = None) -> None:
         # set number
         self._number: int = number
@@ -26,15 +28,13 @@ class Zone:
 
     @property
     def stops_exclude_inner(self):
-        return [stop for stop in self._game.all_stops if stop.inner_zone == self]
+        from .stop import Stop
+        return [self._game.getStopFromCode(code) if self._game else Stop(code) for code in getStopCodesInZone(self._number)]
 
     @property
     def deck(self) -> list[Action]:
-        from .action import Action
-        # load in live file
-        live_deck = getLiveDeckData(self._game._id)
-        actions: list[Action]= [Action.loadLive(id, self._game) for id in live_deck if live_deck[id]["zone"] == self._number]
-        return [action for action in actions if not action.reserved and not action.dealt]
+        # only cards nobody holds yet
+        return [self._game.getActionFromDeckID(id) for id in getUndealtDeckIDs(self._number, self._game._id)]
 
     @property
     def start_deck(self) -> list[Action]:
@@ -43,43 +43,47 @@ class Zone:
         return [Action.load(code, self.number) for code in getStartDeckData(self._number)]
 
     def createDeck(self) -> None:
-        # use the start deck list
-        start_deck = getStartDeckData(self._number)
-        # load in live file
-        live_deck = getLiveDeckData(self._game._id)
-        # create unique ids for each and add their info into the start deck
-        counts = {}
-        for action in start_deck:
-            if (action + "-" + str(self.number)) in counts:
-                counts[action + "-" + str(self.number)] += 1
-            else:
-                counts[action + "-" + str(self.number)] = 1
-            # add it to the deck with this id
-            live_deck |= {
-                # will store if dealt within deck (and to who)
-                action + "-" + str(self.number) + "-" + str(counts[action + "-" + str(self.number)]): {
-                    "type": action,
-                    "zone": self.number
+        with self._game.transaction():
+            # use the start deck list
+            start_deck = getStartDeckData(self._number)
+            # load in live file
+            live_deck = getLiveDeckData(self._game._id)
+            # create unique ids for each and add their info into the start deck
+            counts = {}
+            for action in start_deck:
+                if (action + "-" + str(self.number)) in counts:
+                    counts[action + "-" + str(self.number)] += 1
+                else:
+                    counts[action + "-" + str(self.number)] = 1
+                # add it to the deck with this id
+                live_deck |= {
+                    # will store if dealt within deck (and to who)
+                    action + "-" + str(self.number) + "-" + str(counts[action + "-" + str(self.number)]): {
+                        "type": action,
+                        "zone": self.number
+                    }
                 }
-            }
-        # save the deck
-        setLiveDeckData(live_deck, self._game._id)
+            # save the deck
+            setLiveDeckData(live_deck, self._game._id)
 
     def dealAction(self, team: Team) -> list[Action] | Action:
-        # choose the correct number of action cards
-        if team.has_reward_choice:
-            options = sample(self.deck, 2)
-            # deal it out to that team (but as a choice)
-            for option in options:
-                option.reserve(team)
-            # return all options
-            return options
-        else:
-            # deal out a single action card
-            chosen_action = choice(self.deck)
-            chosen_action.deal(team)
-            # return a copy
-            return chosen_action
+        with self._game.transaction():
+            # draw straight from the undealt pile
+            undealt = getZoneDeck(self._number, self._game._id).undealt
+            # choose the correct number of action cards
+            if team.has_reward_choice:
+                options = [self._game.getActionFromDeckID(id) for id in undealt.sample(2)]
+                # deal it out to that team (but as a choice)
+                for option in options:
+                    option.reserve(team)
+                # return all options
+                return options
+            else:
+                # deal out a single action card
+                chosen_action = self._game.getActionFromDeckID(undealt.choice())
+                chosen_action.deal(team)
+                # return a copy
+                return chosen_action
 
     def __eq__(self, value: object) -> bool:
         try: